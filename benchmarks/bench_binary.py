@@ -0,0 +1,57 @@
+"""Save/load timings for the binary grid formats, with a round-trip check.
+
+Run from the repository root:
+
+    python benchmarks/bench_binary.py
+
+Each format is written as a multi-frame file, memory-mapped back, decoded
+and re-encoded; the re-encoded file must match the original byte for byte.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+import binary_format
+
+FRAMES = 1000
+ROWS, COLS = 64, 128
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    on = rng.random((FRAMES, ROWS, COLS)) < 0.5
+    colors = rng.integers(0, 256, (FRAMES, ROWS, COLS, 3), dtype=np.uint8)
+    print(f"{FRAMES} frames of {ROWS}x{COLS}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in binary_format.FORMATS:
+            first = os.path.join(tmp, f"{fmt}.bin")
+            second = os.path.join(tmp, f"{fmt}-again.bin")
+            _, save_ms = timed(lambda: binary_format.save(first, on, colors, fmt))
+            grid, open_ms = timed(lambda: binary_format.load(first))
+            _, frame_ms = timed(lambda: grid.frame(FRAMES // 2))
+            (on2, colors2), read_ms = timed(grid.read)
+            binary_format.save(second, on2, colors2, fmt)
+            with open(first, "rb") as a, open(second, "rb") as b:
+                identical = a.read() == b.read()
+            del grid
+            size_kb = os.path.getsize(first) / 1024
+            print(f"{fmt:>7}: {size_kb:8.0f} KiB  save {save_ms:7.1f} ms  open {open_ms:5.2f} ms  "
+                  f"one frame {frame_ms:5.2f} ms  all frames {read_ms:7.1f} ms  "
+                  f"round-trip {'identical' if identical else 'DIFFERS'}")
+            if not identical:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
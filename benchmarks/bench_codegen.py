@@ -0,0 +1,35 @@
+"""Code generation timings for a long animation.
+
+Run from the repository root:
+
+    python benchmarks/bench_codegen.py
+
+Generates each language for 1000 frames of a 32x64 grid at every word size.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+import codegen
+
+FRAMES = 1000
+ROWS, COLS = 32, 64
+
+
+def main():
+    lit = np.random.default_rng(0).random((FRAMES, ROWS, COLS)) < 0.5
+    print(f"{FRAMES} frames of {ROWS}x{COLS}")
+    for language in codegen.LANGUAGES:
+        for word_bits in codegen.WORD_BITS:
+            start = time.perf_counter()
+            text = "".join(codegen.iter_code(lit, language, "anim", word_bits))
+            elapsed = time.perf_counter() - start
+            print(f"{language:>11} {word_bits:2d}-bit: {len(text) / 1e6:5.1f} MB in {elapsed * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Effects at 60 fps on a 64x128 wall: render cost and scheduled frame rate.
+
+Run from the repository root:
+
+    python benchmarks/bench_effects.py [seconds]
+
+For every effect prints the render time per frame at each detail step
+against the 16.7 ms budget, then runs it under a ``FrameScheduler`` at
+60 fps for ``seconds`` (default 3) and reports the frame rate reached,
+frames skipped and the detail step it settled on.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from effects import EFFECTS, STEPS, FrameScheduler
+
+ROWS, COLS = 64, 128
+FPS = 60
+REPEATS = 300
+
+
+def render_time(effect, step):
+    effect.set_step(step)
+    start = time.perf_counter()
+    for index in range(REPEATS):
+        effect.frame(index / FPS, 1 / FPS)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    budget = 1 / FPS
+    print(f"{ROWS}x{COLS} at {FPS} fps: {budget * 1000:.1f} ms budget per frame")
+    print(f"{'effect':<14}" + "".join(f"  step {step} ms" for step in STEPS) + "   scheduled fps  skipped  step  holds")
+    for name, effect_class in EFFECTS.items():
+        effect = effect_class(ROWS, COLS, seed=0)
+        costs = "".join(f"  {render_time(effect, step) * 1000:9.3f}" for step in STEPS)
+        effect = effect_class(ROWS, COLS, seed=0)
+        scheduler = FrameScheduler(effect, FPS)
+        end = time.perf_counter() + seconds
+        scheduler.run(lambda colors: None, lambda: time.perf_counter() < end)
+        fps = scheduler.frames_rendered / seconds
+        holds = "yes" if scheduler.frames_skipped == 0 and effect.step == 1 else "no"
+        print(f"{name:<14}{costs}   {fps:13.1f}  {scheduler.frames_skipped:7d}  {effect.step:4d}  {holds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""HUB75 refresh simulation: timing and colour depth vs refresh trade-offs.
+
+Run from the repository root:
+
+    python benchmarks/bench_hub75.py
+
+Prints the refresh rate and brightness each colour depth reaches on a
+1/16-scan 64-column chain at a 20 MHz shift clock, then times the
+perceived-color simulation of a 64x128 frame.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from hub75 import Hub75Simulator
+
+TARGETS = (120, 240, 480, 960, 1920)
+REPEATS = 200
+
+
+def main():
+    print("target  " + "  ".join(f"{target:>10} Hz" for target in TARGETS))
+    for depth in range(1, 9):
+        cells = []
+        for target in TARGETS:
+            sim = Hub75Simulator(64, 16, depth, target)
+            cells.append(f"{sim.refresh:5.0f} Hz {sim.efficiency:4.0%}")
+        print(f"{depth:>2} bit  " + "  ".join(cells))
+
+    colors = np.random.default_rng(0).integers(0, 256, (64, 128, 3), dtype=np.uint8)
+    sim = Hub75Simulator(128, 16, 8, 240)
+    for label, exposure in (("eye", None), ("1 ms camera", 0.001)):
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            sim.display_colors(colors, exposure=exposure)
+        elapsed = (time.perf_counter() - start) / REPEATS
+        print(f"64x128 {label}: {elapsed * 1000:.2f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Import timings for multi-frame text export files.
+
+Run from the repository root:
+
+    python benchmarks/bench_parser.py
+
+Writes 1000 frames of a 32x64 grid in each text format (each frame with
+its own ``#export_format`` header, as the exporter writes them) and times
+parsing all frames.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from exporter import EXPORT_MODES, iter_export
+from grid_parser import parse_frames
+
+FRAMES = 1000
+ROWS, COLS = 32, 64
+REPEAT = 3
+
+
+def build_text(mode, rng):
+    chunks = []
+    for _ in range(FRAMES):
+        on = rng.random((ROWS, COLS)) < 0.4
+        colors = rng.integers(0, 8, (ROWS, COLS, 3), dtype=np.uint8) * 32
+        colors[~on] = 0
+        chunks.extend(iter_export(on & colors.any(axis=-1), colors, mode))
+    return "".join(chunks)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{FRAMES} frames of {ROWS}x{COLS}")
+    for mode in EXPORT_MODES:
+        text = build_text(mode, rng)
+        best = None
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            frames = parse_frames(text)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        assert len(frames) == FRAMES and frames[-1].shape == (ROWS, COLS)
+        print(f"{mode:>9}: {len(text) / 1e6:6.1f} MB  parse {best * 1000:7.1f} ms "
+              f"({best * 1e6 / FRAMES:.0f} us/frame)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Virtual display receive rate for each transport and protocol.
+
+Run from the repository root:
+
+    python benchmarks/bench_receiver.py
+
+Sends 64x128 frames as fast as the local sender can to a ``FrameReceiver``
+over UDP, TCP and a Unix socket, raw and as DDP packets, and prints the
+frames per second the receive thread completes.  The GUI only copies the
+newest of these frames at display rate, so anything well above 200 fps
+leaves headroom for firmware that bursts.
+"""
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from receiver import FrameReceiver
+from streaming import SERIAL_SYNC, changed_spans, ddp_packets
+
+ROWS, COLS = 64, 128
+FRAMES = 2000
+UDP_RATE = 2000  # Frames per second; a faster burst only overflows the socket buffer.
+
+
+def payloads(protocol, frames, stream):
+    """The bytes to send for each frame."""
+    if protocol == "Raw":
+        return [[frame.tobytes()] for frame in frames]
+    result = []
+    sequence = 1
+    for frame in frames:
+        packets, sequence = ddp_packets(frame, changed_spans(None, frame), sequence)
+        result.append([SERIAL_SYNC + packet for packet in packets] if stream else packets)
+    return result
+
+
+def run(transport, protocol, frames):
+    path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    address = path if transport == "Unix" else ("127.0.0.1", 0)
+    receiver = FrameReceiver(ROWS, COLS, transport, address, protocol)
+    if transport == "UDP":
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        send = lambda data: sender.sendto(data, receiver.address)
+    else:
+        sender = socket.socket(socket.AF_UNIX if transport == "Unix" else socket.AF_INET)
+        sender.connect(receiver.address)
+        send = sender.sendall
+    data = payloads(protocol, frames, transport != "UDP")
+    start = time.perf_counter()
+    for index, packets in enumerate(data):
+        for packet in packets:
+            send(packet)
+        if transport == "UDP":
+            while time.perf_counter() - start < (index + 1) / UDP_RATE:
+                pass
+    deadline = time.perf_counter() + 5
+    while receiver.frames_received < FRAMES and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    received = receiver.frames_received
+    sender.close()
+    receiver.close()
+    return received, received / elapsed
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (ROWS, COLS, 3), dtype=np.uint8) for _ in range(16)] * (FRAMES // 16)
+    print(f"{ROWS}x{COLS} frames ({ROWS * COLS * 3} bytes), {FRAMES} sent")
+    for transport in ("UDP", "TCP", "Unix"):
+        for protocol in ("Raw", "DDP"):
+            received, fps = run(transport, protocol, frames)
+            note = f" (UDP paced at {UDP_RATE} fps)" if transport == "UDP" else ""
+            print(f"{transport:<5} {protocol:<4} {received:>5} received  {fps:>8.0f} fps{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Startup and grid-resize timings for the main window.
+
+Run from the repository root:
+
+    python benchmarks/bench_resize.py
+
+Uses the offscreen Qt platform unless QT_QPA_PLATFORM is already set.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from main import MainWindow
+
+SIZES = [(64, 128), (128, 256), (16, 32)]
+REPEAT = 5
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    app = QApplication(sys.argv)
+
+    def startup():
+        window = MainWindow()
+        window.show()
+        window.canvas.repaint()
+        return window
+
+    startup_ms = []
+    window = None
+    for _ in range(REPEAT):
+        if window is not None:
+            window.close()
+        start = time.perf_counter()
+        window = startup()
+        app.processEvents()
+        startup_ms.append((time.perf_counter() - start) * 1000)
+    print(f"startup 32x64: {min(startup_ms):8.2f} ms")
+
+    rng = np.random.default_rng(0)
+    window.model.assign(rng.random(window.model.shape) < 0.3,
+                        rng.integers(0, 256, window.model.shape + (3,), dtype=np.uint8))
+    window.refresh_cells()
+    for rows, cols in SIZES:
+        for anchor in ("top-left", "center"):
+            resize_ms = timed(lambda: window.resize_grid(rows, cols, anchor))
+            paint_ms = timed(window.canvas.repaint)
+            app.processEvents()
+            print(f"resize to {rows}x{cols} ({anchor}): {resize_ms:8.2f} ms, full repaint {paint_ms:8.2f} ms")
+            window.undo()
+            app.processEvents()
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
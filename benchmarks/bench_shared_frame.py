@@ -0,0 +1,118 @@
+"""Frame latency: shared-memory frame buffer vs a UDP virtual display.
+
+Run from the repository root:
+
+    python benchmarks/bench_shared_frame.py
+
+A writer process stamps ``time.monotonic_ns()`` into the first pixels of
+each 64x128 frame and publishes it at 500 fps, either through a
+``SharedFrameBuffer`` or as a raw UDP datagram to a ``FrameReceiver``.
+This process polls ``copy_to`` every ``POLL`` seconds and prints how
+long after the write a complete copy of each frame was in hand.  The GUI
+polls every 4 ms (16 ms for sockets), which adds up to that interval on
+top.
+"""
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from receiver import FrameReceiver
+from shared_frame import SharedFrameBuffer
+
+ROWS, COLS = 64, 128
+FRAMES = 2000
+FPS = 500
+POLL = 0.0002
+
+
+def pace(start, index):
+    delay = start + (index + 1) / FPS - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def stamp(frame):
+    frame.reshape(-1)[:8] = np.frombuffer(np.int64(time.monotonic_ns()).tobytes(), dtype=np.uint8)
+
+
+def stamped(colors):
+    return int(colors.reshape(-1)[:8].view(np.int64)[0])
+
+
+def shm_writer(path, ready):
+    buffer = SharedFrameBuffer(path, ROWS, COLS)
+    ready.wait()
+    start = time.perf_counter()
+    for index in range(FRAMES):
+        buffer.begin_write()
+        buffer.frame[...] = index % 256
+        stamp(buffer.frame)
+        buffer.end_write()
+        pace(start, index)
+    buffer.close()
+
+
+def udp_writer(address, ready):
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    frame = np.zeros((ROWS, COLS, 3), dtype=np.uint8)
+    ready.wait()
+    start = time.perf_counter()
+    for index in range(FRAMES):
+        frame[...] = index % 256
+        stamp(frame)
+        sender.sendto(frame.tobytes(), address)
+        pace(start, index)
+
+
+def measure(source, writer, argument):
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=writer, args=(argument, ready))
+    process.start()
+    colors = np.zeros((ROWS, COLS, 3), dtype=np.uint8)
+    latencies = []
+    last = source.copy_to(colors)
+    ready.set()
+    while process.is_alive():
+        sequence = source.copy_to(colors)
+        if sequence != last:
+            latencies.append(time.monotonic_ns() - stamped(colors))
+            last = sequence
+        time.sleep(POLL)
+    process.join()
+    return np.array(latencies) / 1000
+
+
+def report(name, latencies):
+    print(f"{name:<14} {len(latencies):>5} frames seen  median {np.median(latencies):7.1f} us  "
+          f"p99 {np.percentile(latencies, 99):7.1f} us  max {latencies.max():8.1f} us")
+
+
+def main():
+    print(f"{ROWS}x{COLS} frames at {FPS} fps, {FRAMES} written")
+    path = os.path.join(tempfile.mkdtemp(), "bench-frame")
+    buffer = SharedFrameBuffer(path, ROWS, COLS, create=True)
+    report("shared memory", measure(buffer, shm_writer, path))
+    buffer.close()
+    os.unlink(path)
+
+    receiver = FrameReceiver(ROWS, COLS, "UDP", ("127.0.0.1", 0))
+    report("UDP", measure(receiver, udp_writer, receiver.address))
+    receiver.close()
+
+    colors = np.zeros((ROWS, COLS, 3), dtype=np.uint8)
+    frame = np.ones_like(colors)
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        np.copyto(colors, frame)
+    print(f"copying one frame out of the buffer: {(time.perf_counter() - start) / FRAMES * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
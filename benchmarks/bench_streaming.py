@@ -0,0 +1,81 @@
+"""Live output traffic: changed-span diffs vs full frames over UDP and UART.
+
+Run from the repository root:
+
+    python benchmarks/bench_streaming.py
+
+Replays a few kinds of animation on a 32x64 grid, prints the bytes each
+frame costs as DDP packets (with serial sync bytes) when diffed against
+the previous frame and when sent whole, the frame rate a 115200/921600
+baud UART sustains for each, and the time spent building packets.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from streaming import SERIAL_SYNC, changed_spans, ddp_packets
+
+ROWS, COLS = 32, 64
+FRAMES = 200
+BAUDS = (115200, 921600)
+
+
+def cursor(rng):
+    frame = np.zeros((ROWS, COLS, 3), np.uint8)
+    for i in range(FRAMES):
+        frame = frame.copy()
+        frame[rng.integers(ROWS), rng.integers(COLS)] = rng.integers(0, 256, 3)
+        yield frame
+
+
+def scroll(rng):
+    strip = rng.integers(0, 2, (ROWS, COLS * 4, 1), dtype=np.uint8) * np.array([255, 160, 0], np.uint8)
+    for i in range(FRAMES):
+        yield np.roll(strip, -i, axis=1)[:, :COLS]
+
+
+def sprite(rng):
+    for i in range(FRAMES):
+        frame = np.zeros((ROWS, COLS, 3), np.uint8)
+        x = i % (COLS - 8)
+        frame[12:20, x:x + 8] = (0, 255, 0)
+        yield frame
+
+
+def noise(rng):
+    for i in range(FRAMES):
+        yield rng.integers(0, 256, (ROWS, COLS, 3), dtype=np.uint8)
+
+
+def traffic(frames, diff):
+    total = 0
+    previous = None
+    sequence = 1
+    for frame in frames:
+        spans = changed_spans(previous if diff else None, frame)
+        packets, sequence = ddp_packets(frame, spans, sequence)
+        total += sum(len(SERIAL_SYNC) + len(packet) for packet in packets)
+        previous = frame
+    return total / FRAMES
+
+
+def main():
+    header = "animation   mode   bytes/frame" + "".join(f"  {baud:>7} baud" for baud in BAUDS) + "   build"
+    print(header)
+    for name, source in (("cursor", cursor), ("sprite", sprite), ("scroll", scroll), ("noise", noise)):
+        frames = list(source(np.random.default_rng(0)))
+        for mode, diff in (("diff", True), ("full", False)):
+            start = time.perf_counter()
+            per_frame = traffic(frames, diff)
+            build = (time.perf_counter() - start) / FRAMES
+            # 8N1 framing: 10 bits on the wire per byte.
+            rates = "".join(f"  {baud / 10 / per_frame:>8.1f} fps" for baud in BAUDS)
+            print(f"{name:<10}  {mode:<4}  {per_frame:>11.0f}{rates}  {build * 1e6:>5.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Timeline memory and access timings for a long animation.
+
+Run from the repository root:
+
+    python benchmarks/bench_timeline.py
+
+Stores 5000 frames of a 32x64 grid where each frame changes a few cells
+and compares the memory used against keeping every frame as a snapshot.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from timeline import Timeline
+
+FRAMES = 5000
+ROWS, COLS = 32, 64
+CHANGED = 16
+
+
+def frames(rng):
+    on = rng.random((ROWS, COLS)) < 0.3
+    colors = rng.integers(0, 256, (ROWS, COLS, 3), dtype=np.uint8)
+    for _ in range(FRAMES):
+        rows = rng.integers(0, ROWS, CHANGED)
+        cols = rng.integers(0, COLS, CHANGED)
+        on[rows, cols] = ~on[rows, cols]
+        colors[rows, cols] = rng.integers(0, 256, (CHANGED, 3), dtype=np.uint8)
+        yield on.copy(), colors.copy()
+
+
+def main():
+    rng = np.random.default_rng(0)
+    timeline = Timeline(ROWS, COLS)
+    start = time.perf_counter()
+    timeline.extend(frames(rng))
+    elapsed = time.perf_counter() - start
+    print(f"{FRAMES} frames of {ROWS}x{COLS}, {CHANGED} cells changed per frame")
+    print(f"extend: {elapsed * 1000:.0f} ms")
+    print(f"memory: {timeline.nbytes / 1e6:.1f} MB (snapshots: {timeline.snapshot_nbytes / 1e6:.1f} MB)")
+
+    indices = rng.integers(0, FRAMES, 1000)
+    start = time.perf_counter()
+    for index in indices:
+        timeline.frame(int(index))
+    print(f"random frame: {(time.perf_counter() - start) * 1e6 / len(indices):.1f} us")
+
+    start = time.perf_counter()
+    timeline.set_frame(FRAMES // 2, *timeline.frame(0))
+    print(f"edit frame: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    timeline.stack()
+    print(f"stack: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
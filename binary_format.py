@@ -0,0 +1,196 @@
+"""Binary grid files in the layouts the firmware reads directly.
+
+A file is a 16-byte little-endian header followed by the frames, stored
+back to back with the same size each::
+
+    magic  "LEDG"
+    u8     version (1)
+    u8     format code (see FORMATS)
+    u16    rows
+    u16    cols
+    u16    reserved (0)
+    u32    frame count
+
+Per-frame payloads, rows top to bottom:
+
+``mono``    1 bit per cell (lit = 1), MSB first, each row padded to a byte.
+``pal3``    3-bit palette index per cell, MSB first, each row padded to a byte.
+``rgb565``  one little-endian ``uint16`` per cell, ``RRRRRGGGGGGBBBBB``.
+``rgb888``  three bytes per cell, R, G, B.
+
+Loading memory-maps the payload, so opening a long animation costs nothing
+until a frame is read.
+"""
+import os
+import struct
+
+import numpy as np
+
+from palette import FIRMWARE_PALETTE, as_palette
+
+MAGIC = b"LEDG"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHHHI")
+
+FORMATS = {"mono": 1, "pal3": 2, "rgb565": 3, "rgb888": 4}
+FORMAT_NAMES = {code: name for name, code in FORMATS.items()}
+
+DEFAULT_COLOR = (0, 128, 0)
+
+
+def frame_size(fmt, rows, cols):
+    """Bytes used by one frame of ``rows`` x ``cols`` cells."""
+    if fmt == "mono":
+        return rows * ((cols + 7) // 8)
+    if fmt == "pal3":
+        return rows * ((cols * 3 + 7) // 8)
+    if fmt == "rgb565":
+        return rows * cols * 2
+    if fmt == "rgb888":
+        return rows * cols * 3
+    raise ValueError(f"Unknown binary format: {fmt}")
+
+
+def _check_size(rows, cols):
+    """Reject grid sizes a header cannot describe."""
+    if not (1 <= rows <= 0xFFFF and 1 <= cols <= 0xFFFF):
+        raise ValueError(f"Grid size must be 1-65535 x 1-65535 cells, got {rows}x{cols}")
+
+
+def _as_frames(on, colors):
+    on = np.asarray(on, dtype=bool)
+    colors = np.asarray(colors, dtype=np.uint8)
+    if on.ndim == 2:
+        on, colors = on[None], colors[None]
+    return on, np.where(on[..., None], colors, np.uint8(0))
+
+
+def encode_frames(on, colors, fmt, palette=FIRMWARE_PALETTE):
+    """Encode ``bool[F, H, W]``/``uint8[F, H, W, 3]`` frames (or one frame) to payload bytes."""
+    on, colors = _as_frames(on, colors)
+    if fmt == "mono":
+        data = np.packbits(on & colors.any(axis=-1), axis=-1)
+    elif fmt == "pal3":
+        palette = as_palette(palette)
+        if len(palette) > 8:
+            raise ValueError(f"pal3 needs a palette of at most 8 colors, got {len(palette)}")
+        index = palette.index(colors).astype(np.uint8)
+        bits = np.unpackbits(index[..., None], axis=-1)[..., 5:]
+        data = np.packbits(bits.reshape(*index.shape[:2], -1), axis=-1)
+    elif fmt == "rgb565":
+        c = colors.astype(np.uint16)
+        data = ((c[..., 0] >> 3) << 11) | ((c[..., 1] >> 2) << 5) | (c[..., 2] >> 3)
+        data = data.astype("<u2")
+    elif fmt == "rgb888":
+        data = colors
+    else:
+        raise ValueError(f"Unknown binary format: {fmt}")
+    return np.ascontiguousarray(data).tobytes()
+
+
+def decode_frames(data, fmt, rows, cols, palette=FIRMWARE_PALETTE, default_rgb=DEFAULT_COLOR):
+    """Decode a ``uint8`` payload array holding whole frames into ``(on, colors)`` stacks.
+
+    ``mono`` frames carry no color, so lit cells get ``default_rgb``.
+    """
+    _check_size(rows, cols)
+    data = np.asarray(data, dtype=np.uint8)
+    frames, extra = divmod(data.size, frame_size(fmt, rows, cols))
+    if extra:
+        raise ValueError(f"{data.size} bytes is not a whole number of {rows}x{cols} {fmt} frames")
+    if fmt == "mono":
+        packed = data.reshape(frames, rows, -1)
+        on = np.unpackbits(packed, axis=-1, count=cols).astype(bool)
+        colors = np.zeros(on.shape + (3,), dtype=np.uint8)
+        colors[on] = default_rgb
+        return on, colors
+    if fmt == "pal3":
+        bits = np.unpackbits(data.reshape(frames, rows, -1), axis=-1, count=cols * 3)
+        bits = bits.reshape(frames, rows, cols, 3)
+        index = (bits[..., 0] << 2) | (bits[..., 1] << 1) | bits[..., 2]
+        table = np.zeros((8, 3), dtype=np.uint8)
+        array = as_palette(palette).array
+        table[:len(array)] = array[:8]
+        colors = table[index]
+    elif fmt == "rgb565":
+        value = data.view("<u2").reshape(frames, rows, cols).astype(np.uint16)
+        r, g, b = value >> 11, (value >> 5) & 0x3F, value & 0x1F
+        colors = np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1)
+        colors = colors.astype(np.uint8)
+    elif fmt == "rgb888":
+        colors = np.array(data.reshape(frames, rows, cols, 3))
+    else:
+        raise ValueError(f"Unknown binary format: {fmt}")
+    return colors.any(axis=-1), colors
+
+
+def save(filename, on, colors, fmt, palette=FIRMWARE_PALETTE):
+    """Write one frame or a stack of frames to ``filename``."""
+    on, colors = _as_frames(on, colors)
+    frames, rows, cols = on.shape
+    _check_size(rows, cols)
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, FORMATS[fmt], rows, cols, 0, frames))
+        f.write(encode_frames(on, colors, fmt, palette))
+
+
+class BinaryGrid:
+    """A memory-mapped binary grid file; frames are decoded on access."""
+
+    def __init__(self, filename, palette=FIRMWARE_PALETTE, default_rgb=DEFAULT_COLOR):
+        with open(filename, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{filename}: file too short for a header")
+        magic, version, code, rows, cols, _, frames = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{filename}: not a binary grid file")
+        if version != VERSION:
+            raise ValueError(f"{filename}: unsupported version {version}")
+        if code not in FORMAT_NAMES:
+            raise ValueError(f"{filename}: unknown format code {code}")
+        if not rows or not cols:
+            raise ValueError(f"{filename}: header describes an empty {rows}x{cols} grid")
+        self.filename = filename
+        self.format = FORMAT_NAMES[code]
+        self.rows = rows
+        self.cols = cols
+        self.frames = frames
+        self.frame_bytes = frame_size(self.format, rows, cols)
+        self.palette = palette
+        self.default_rgb = default_rgb
+        size = self.frame_bytes * frames
+        available = os.path.getsize(filename) - HEADER.size
+        if available < size:
+            raise ValueError(f"{filename}: truncated, {frames} frames need {size} bytes but "
+                             f"{available} follow the header")
+        if size:
+            self.data = np.memmap(filename, dtype=np.uint8, mode="r", offset=HEADER.size, shape=(size,))
+        else:
+            self.data = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return self.frames
+
+    def raw(self, start=0, stop=None):
+        """Payload bytes of frames ``start..stop`` as a memory-mapped ``uint8`` view."""
+        stop = self.frames if stop is None else stop
+        return self.data[start * self.frame_bytes:stop * self.frame_bytes]
+
+    def read(self, start=0, stop=None):
+        """Decode frames ``start..stop`` into ``bool[F, H, W]``/``uint8[F, H, W, 3]``."""
+        return decode_frames(self.raw(start, stop), self.format, self.rows, self.cols,
+                             self.palette, self.default_rgb)
+
+    def frame(self, index):
+        """Decode a single frame into ``(on, colors)``."""
+        on, colors = self.read(index, index + 1)
+        return on[0], colors[0]
+
+    def __iter__(self):
+        for index in range(self.frames):
+            yield self.frame(index)
+
+
+def load(filename, palette=FIRMWARE_PALETTE, default_rgb=DEFAULT_COLOR):
+    return BinaryGrid(filename, palette, default_rgb)
@@ -0,0 +1,178 @@
+"""Source-code literals of the lit mask for firmware: C, Rust and MicroPython.
+
+The mask is packed with ``np.packbits`` into 8-, 16- or 32-bit words, one
+line of words per grid row (row-major) or column (column-major), with the
+first cell in the most or least significant bit.  Several frames become one
+array with a leading frame dimension, so a whole animation is generated in
+a single pass.  Words are formatted once per distinct value and the
+per-language boilerplate is built once per option set.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from exporter import CHUNK_CELLS, token_rows
+
+LANGUAGES = ("C", "Rust", "MicroPython")
+WORD_BITS = (8, 16, 32)
+ORDERS = ("row", "column")
+BIT_ORDERS = ("msb", "lsb")
+
+# File extension used when writing each language to disk.
+EXTENSIONS = {"C": ".h", "Rust": ".rs", "MicroPython": ".py"}
+
+_C_TYPES = {8: "uint8_t", 16: "uint16_t", 32: "uint32_t"}
+_RUST_TYPES = {8: "u8", 16: "u16", 32: "u32"}
+_ARRAY_CODES = {8: "B", 16: "H", 32: "L"}
+
+
+def pack_bits(lit, word_bits=8, order="row", bit_order="msb"):
+    """Pack ``bool[H, W]`` or ``bool[F, H, W]`` into ``uint[F, lines, words]``.
+
+    A line is a row (``order="row"``) or a column, padded with zeros to a
+    whole number of words.  ``bit_order="msb"`` puts the first cell of each
+    word in its most significant bit.
+    """
+    if word_bits not in WORD_BITS:
+        raise ValueError(f"Unsupported word size: {word_bits}")
+    if order not in ORDERS:
+        raise ValueError(f"Unknown order: {order}")
+    if bit_order not in BIT_ORDERS:
+        raise ValueError(f"Unknown bit order: {bit_order}")
+    lit = np.asarray(lit, dtype=bool)
+    if lit.ndim == 2:
+        lit = lit[None]
+    if order == "column":
+        lit = lit.transpose(0, 2, 1)
+    frames, lines, cells = lit.shape
+    pad = -cells % word_bits
+    if pad:
+        lit = np.concatenate((lit, np.zeros((frames, lines, pad), dtype=bool)), axis=-1)
+    big = bit_order == "msb"
+    packed = np.packbits(lit, axis=-1, bitorder="big" if big else "little")
+    word = np.dtype(f"u{word_bits // 8}").newbyteorder(">" if big else "<")
+    return np.ascontiguousarray(packed).view(word).astype(word.newbyteorder("="))
+
+
+def c_identifier(name):
+    """``name`` made a valid C/Rust/Python identifier."""
+    name = re.sub(r"\W", "_", name) or "grid"
+    return "_" + name if name[0].isdigit() else name
+
+
+@lru_cache(maxsize=8)
+def _hex_text(word_bits):
+    digits = word_bits // 4
+    return lambda value: f"0x{value:0{digits}X}"
+
+
+@lru_cache(maxsize=64)
+def _template(language, word_bits, frames, lines, words, progmem):
+    """Return ``(head, frame_open, row, frame_close, tail)`` format pieces.
+
+    ``row`` takes the comma-joined words of one line; the rest are final.
+    ``frames`` is ``None`` for a single frame, which drops the frame level.
+    """
+    nested = frames is not None
+    if language == "C":
+        dims = (f"[{frames}]" if nested else "") + f"[{lines}][{words}]"
+        storage = " PROGMEM" if progmem else ""
+        include = "#include <avr/pgmspace.h>\n" if progmem else ""
+        head = (f"#include <stdint.h>\n{include}\n"
+                f"const {_C_TYPES[word_bits]} {{name}}{dims}{storage} = {{{{\n")
+        indent = "    " if nested else "  "
+        return head, "  {\n", indent + "{{{}}},\n", "  },\n", "};\n"
+    if language == "Rust":
+        kind = f"[[{_RUST_TYPES[word_bits]}; {words}]; {lines}]"
+        if nested:
+            kind = f"[{kind}; {frames}]"
+        indent = "        " if nested else "    "
+        return f"pub static {{name}}: {kind} = [\n", "    [\n", indent + "[{}],\n", "    ],\n", "];\n"
+    if language == "MicroPython":
+        array = f'array("{_ARRAY_CODES[word_bits]}", ('
+        if nested:
+            return ("from array import array\n\n{name} = (\n", f"    {array}\n", "        {},\n",
+                    "    )),\n", ")\n")
+        return f"from array import array\n\n{{name}} = {array}\n", "", "    {},\n", "", "))\n"
+    raise ValueError(f"Unknown language: {language}")
+
+
+def iter_code(lit, language="C", name="grid", word_bits=8, order="row", bit_order="msb",
+              progmem=True, chunk_cells=CHUNK_CELLS):
+    """Yield source code declaring ``lit`` (one frame or a stack) as an array.
+
+    C gets a ``const uintN_t`` array (in ``PROGMEM`` unless ``progmem`` is
+    false), Rust a ``pub static`` and MicroPython an ``array`` per frame.
+    Rust and MicroPython names are upper-cased, as constants usually are.
+    """
+    lit = np.asarray(lit, dtype=bool)
+    frame_count = 1 if lit.ndim == 2 else lit.shape[0]
+    rows, cols = lit.shape[-2:]
+    words = pack_bits(lit, word_bits, order, bit_order)
+    _, lines, per_line = words.shape
+    nested = lit.ndim == 3
+    head, frame_open, row, frame_close, tail = _template(
+        language, word_bits, frame_count if nested else None, lines, per_line, progmem and language == "C")
+    name = c_identifier(name)
+    if language != "C":
+        name = name.upper()
+    comment = "//" if language in ("C", "Rust") else "#"
+    frames_text = f"{frame_count} frames" if nested else "1 frame"
+    yield (f"{comment} {rows}x{cols} grid, {frames_text}, {order}-major, {bit_order.upper()} first, "
+           f"{per_line} x {word_bits}-bit words per {order}\n")
+    yield head.format(name=name)
+
+    flat = words.reshape(-1, per_line)
+    step = max(1, chunk_cells // max(1, per_line * word_bits))
+    for start in range(0, len(flat), step):
+        parts = []
+        for offset, values in enumerate(token_rows(flat[start:start + step], _hex_text(word_bits))):
+            line = start + offset
+            if nested and line % lines == 0:
+                parts.append(frame_open)
+            parts.append(row.format(", ".join(values)))
+            if nested and line % lines == lines - 1:
+                parts.append(frame_close)
+        yield "".join(parts)
+    if nested and not lines:
+        yield (frame_open + frame_close) * frame_count
+    yield tail
+
+
+def iter_table(values, language="C", name="table", progmem=True, includes=True):
+    """Yield source code declaring a one-dimensional table of unsigned ``values``.
+
+    The word size is the smallest that holds the largest value.  Pass
+    ``includes=False`` when appending to a file that already has the
+    ``#include``/``import`` lines.
+    """
+    values = np.asarray(values).ravel()
+    largest = int(values.max()) if len(values) else 0
+    word_bits = next((bits for bits in WORD_BITS if largest < 1 << bits), None)
+    if word_bits is None or (len(values) and values.min() < 0):
+        raise ValueError(f"Table values must fit in 0..{(1 << WORD_BITS[-1]) - 1}")
+    name = c_identifier(name)
+    text = ", ".join(values.astype(str))
+    if language == "C":
+        head = "#include <stdint.h>\n" + ("#include <avr/pgmspace.h>\n" if progmem else "") + "\n"
+        storage = " PROGMEM" if progmem else ""
+        body = f"const {_C_TYPES[word_bits]} {name}[{len(values)}]{storage} = {{{text}}};\n"
+    elif language == "Rust":
+        head = ""
+        body = f"pub static {name.upper()}: [{_RUST_TYPES[word_bits]}; {len(values)}] = [{text}];\n"
+    elif language == "MicroPython":
+        head = "from array import array\n\n"
+        body = f'{name.upper()} = array("{_ARRAY_CODES[word_bits]}", ({text}{"," if len(values) == 1 else ""}))\n'
+    else:
+        raise ValueError(f"Unknown language: {language}")
+    if includes:
+        yield head
+    yield body
+
+
+def write_code(writer, lit, language="C", name="grid", word_bits=8, order="row", bit_order="msb",
+               progmem=True):
+    """Stream the generated code to anything with a ``write(str)`` method."""
+    for chunk in iter_code(lit, language, name, word_bits, order, bit_order, progmem):
+        writer.write(chunk)
@@ -0,0 +1,41 @@
+"""Gamma, brightness and white-balance correction through lookup tables.
+
+Colors are picked on a gamma-encoded, sRGB-like scale, but LEDs give off
+light roughly in proportion to their PWM duty, so uncorrected mid-tones
+look far too bright on a panel.  ``ColorCorrection`` folds a gamma curve,
+a global brightness and per-channel white-balance gains into one
+``uint8[3, 256]`` table computed once.  Correcting a frame is then a table
+lookup per channel, cheap enough for every repaint and for baking into
+exported colors so firmware can send them to the panel unchanged.
+"""
+import numpy as np
+
+
+class ColorCorrection:
+    """Per-channel ``value -> (value / 255) ** gamma * brightness * gain`` tables."""
+
+    def __init__(self, gamma=2.2, brightness=1.0, white_balance=(1.0, 1.0, 1.0)):
+        if gamma <= 0:
+            raise ValueError(f"Gamma must be positive, got {gamma}")
+        if len(white_balance) != 3:
+            raise ValueError("White balance needs one gain per channel")
+        if brightness < 0 or min(white_balance) < 0:
+            raise ValueError("Brightness and white-balance gains cannot be negative")
+        self.gamma = float(gamma)
+        self.brightness = float(brightness)
+        self.white_balance = tuple(float(gain) for gain in white_balance)
+        levels = (np.arange(256) / 255.0) ** self.gamma
+        gains = self.brightness * np.array(self.white_balance)[:, None]
+        self.table = np.rint(np.clip(levels * gains, 0.0, 1.0) * 255).astype(np.uint8)
+
+    @property
+    def is_identity(self):
+        return bool(np.all(self.table == np.arange(256, dtype=np.uint8)))
+
+    def apply(self, colors):
+        """Return corrected ``uint8[..., 3]`` colors as a new array."""
+        colors = np.asarray(colors, dtype=np.uint8)
+        corrected = np.empty_like(colors)
+        for channel in range(3):
+            corrected[..., channel] = self.table[channel][colors[..., channel]]
+        return corrected
@@ -0,0 +1,335 @@
+"""Procedural animations rendered as whole-frame NumPy operations.
+
+Each effect is an ``Effect`` subclass with a ``PARAMETERS`` table and a
+``render(t, dt)`` that returns ``uint8[h, w, 3]`` colors for its working
+shape; no effect loops over cells in Python.  ``frame`` renders at
+1/``step`` of the grid resolution and scales the result up with
+``np.repeat``, which is how ``FrameScheduler`` trades detail for time
+when a frame goes over budget.  ``record`` renders a fixed number of
+frames at full detail for the timeline and exports.
+"""
+import time
+
+import numpy as np
+
+# Resolution divisors, finest first, the scheduler can fall back to.
+STEPS = (1, 2, 4)
+
+
+def _gradient(stops):
+    """256-entry ``uint8[256, 3]`` palette through ``(position, (r, g, b))`` stops."""
+    positions = [position for position, _ in stops]
+    colors = np.array([rgb for _, rgb in stops], dtype=float)
+    x = np.linspace(0.0, 1.0, 256)
+    return np.rint(np.stack([np.interp(x, positions, colors[:, c]) for c in range(3)], axis=1)).astype(np.uint8)
+
+
+def _resample(array, shape):
+    """Nearest-neighbour resize of the first two axes of ``array``."""
+    rows = np.arange(shape[0]) * array.shape[0] // shape[0]
+    cols = np.arange(shape[1]) * array.shape[1] // shape[1]
+    return array[rows[:, None], cols]
+
+
+def _lookup(palette, values):
+    """Colors of ``values`` in 0..1 through a 256-entry palette."""
+    return palette[(np.clip(values, 0.0, 1.0) * 255).astype(np.uint8)]
+
+
+RAINBOW = _gradient([(0.0, (255, 0, 0)), (1 / 6, (255, 255, 0)), (2 / 6, (0, 255, 0)), (3 / 6, (0, 255, 255)),
+                     (4 / 6, (0, 0, 255)), (5 / 6, (255, 0, 255)), (1.0, (255, 0, 0))])
+FIRE = _gradient([(0.0, (0, 0, 0)), (0.1, (0, 0, 0)), (0.3, (160, 0, 0)), (0.55, (255, 80, 0)),
+                  (0.8, (255, 200, 0)), (1.0, (255, 255, 200))])
+RAIN = _gradient([(0.0, (0, 0, 0)), (0.5, (0, 120, 20)), (1.0, (60, 255, 80))])
+BARS = _gradient([(0.0, (0, 255, 0)), (0.6, (255, 255, 0)), (1.0, (255, 0, 0))])
+
+
+class Effect:
+    """A generated animation for a ``rows`` x ``cols`` grid.
+
+    ``PARAMETERS`` maps each parameter to ``(default, minimum, maximum)``;
+    values are clamped to that range and take the default's type.
+    ``seed`` makes the random parts repeatable.
+    """
+
+    PARAMETERS = {}
+
+    def __init__(self, rows=32, cols=64, seed=None, **params):
+        unknown = sorted(set(params) - set(self.PARAMETERS))
+        if unknown:
+            raise ValueError(f"Unknown {type(self).__name__} parameter: {', '.join(unknown)}")
+        self.rows, self.cols = rows, cols
+        self.params = {}
+        for name, (default, low, high) in self.PARAMETERS.items():
+            self.params[name] = type(default)(min(max(params.get(name, default), low), high))
+        self.rng = np.random.default_rng(seed)
+        self.step = 1
+        self.reset()
+
+    @property
+    def shape(self):
+        """Working ``(rows, cols)`` at the current step."""
+        return (-(-self.rows // self.step), -(-self.cols // self.step))
+
+    def set_step(self, step):
+        if step != self.step:
+            self.step = step
+            self.reset()
+
+    def reset(self):
+        """Set up state for ``shape``; effects keep what they can across steps."""
+
+    def render(self, t, dt):
+        """``uint8[*shape, 3]`` colors at ``t`` seconds, ``dt`` after the previous frame."""
+        raise NotImplementedError
+
+    def frame(self, t, dt):
+        """Grid-sized ``uint8[rows, cols, 3]`` colors at ``t`` seconds."""
+        colors = self.render(t, dt)
+        if self.step > 1:
+            colors = colors.repeat(self.step, axis=0).repeat(self.step, axis=1)[:self.rows, :self.cols]
+        return colors
+
+
+class Plasma(Effect):
+    """Interfering sine waves mapped through a cycling rainbow."""
+
+    PARAMETERS = {"speed": (1.0, 0.1, 5.0), "zoom": (1.0, 0.25, 4.0)}
+
+    def reset(self):
+        h, w = self.shape
+        # Coordinates in grid cells, so the pattern keeps its size at any step.
+        scale = self.step / (6.0 * self.params["zoom"])
+        self.x = np.arange(w, dtype=np.float32) * scale
+        self.y = np.arange(h, dtype=np.float32)[:, None] * scale
+        self.radius = np.hypot(self.x - self.x[-1] / 2, self.y - self.y[-1] / 2)
+
+    def render(self, t, dt):
+        t = t * self.params["speed"]
+        v = np.sin(self.x + t) + np.sin(self.y * 0.8 - t * 1.3)
+        v += np.sin((self.x + self.y) * 0.5 + t * 0.7)
+        v += np.sin(self.radius * 1.5 - t * 2.0)
+        return _lookup(RAINBOW, (v / 8 + 0.5 + t / 10) % 1.0)
+
+
+class Fire(Effect):
+    """Heat rising from a flickering bottom row and cooling as it goes.
+
+    Each frame every cell takes the average heat of the three cells below
+    it and the one below those, then cools by a random amount that on
+    average leaves 5% of the heat at ``height`` of the grid; the uneven
+    cooling is what breaks the flames into tongues.
+    """
+
+    PARAMETERS = {"height": (0.6, 0.1, 1.0), "intensity": (1.0, 0.1, 1.0)}
+
+    def reset(self):
+        h, w = self.shape
+        # Two hidden source rows below the visible grid.
+        previous = getattr(self, "heat", None)
+        self.heat = np.zeros((h + 2, w), dtype=np.float32)
+        if previous is not None:
+            self.heat[:] = _resample(previous, self.heat.shape)
+
+    def render(self, t, dt):
+        h, w = self.shape
+        heat = self.heat
+        sparks = self.rng.random((2, w), dtype=np.float32)
+        heat[-2:] = np.where(sparks > 0.4, self.params["intensity"], sparks * 0.5)
+        below = heat[1:-1]
+        spread = (below + np.roll(below, 1, axis=1) + np.roll(below, -1, axis=1) + heat[2:]) * 0.25
+        cooling = self.rng.uniform(0.0, 2.0, spread.shape).astype(np.float32)
+        heat[:-2] = spread * (0.05 ** (self.step / (self.params["height"] * self.rows))) ** cooling
+        return _lookup(FIRE, heat[:h])
+
+
+class MatrixRain(Effect):
+    """Falling green drops, one per column, that leave fading trails."""
+
+    PARAMETERS = {"speed": (20.0, 2.0, 60.0), "density": (0.5, 0.05, 1.0), "trail": (12.0, 1.0, 32.0)}
+
+    def reset(self):
+        h, w = self.shape
+        previous = getattr(self, "trail", None)
+        if previous is None:
+            self.trail = np.zeros((h, w), dtype=np.float32)
+            # Start mid-fall so the screen is not empty at first.
+            self.heads = self.rng.uniform(-self.rows, self.rows, w)
+            self.speeds = self.rng.uniform(0.5, 1.5, w)
+        else:
+            cols = np.arange(w) * previous.shape[1] // w
+            self.trail = _resample(previous, (h, w))
+            self.heads, self.speeds = self.heads[cols], self.speeds[cols]
+
+    def render(self, t, dt):
+        h, w = self.shape
+        speed, trail = self.params["speed"], self.params["trail"]
+        # Trails fade to 5% after ``trail`` cells of fall.
+        self.trail *= 0.05 ** (speed * dt / trail)
+        self.heads += self.speeds * speed * dt
+        rows = (self.heads / self.step).astype(int)
+        visible = (rows >= 0) & (rows < h)
+        cols = np.flatnonzero(visible)
+        self.trail[rows[visible], cols] = 1.0
+        colors = _lookup(RAIN, self.trail)
+        colors[rows[visible], cols] = (200, 255, 200)
+        # Drops whose trail has left the grid wait a random time for their next run.
+        done = np.flatnonzero(self.heads > self.rows + trail)
+        wait = self.rows * (1.0 / self.params["density"] - 1.0)
+        self.heads[done] = -self.rng.uniform(0, wait + 1, done.size)
+        self.speeds[done] = self.rng.uniform(0.5, 1.5, done.size)
+        return colors
+
+
+class Starfield(Effect):
+    """Stars flying towards the viewer, brighter as they come closer."""
+
+    PARAMETERS = {"count": (200, 10, 2000), "speed": (0.5, 0.05, 3.0)}
+
+    def reset(self):
+        # Positions live in normalized space, so they survive a change of step.
+        if not hasattr(self, "z"):
+            count = self.params["count"]
+            self.xy = self.rng.uniform(-1, 1, (2, count))
+            self.z = self.rng.uniform(0.05, 1, count)
+
+    def render(self, t, dt):
+        h, w = self.shape
+        self.z -= self.params["speed"] * dt
+        size = max(h, w) / 2
+        px = (w / 2 + self.xy[0] / self.z * size).astype(int)
+        py = (h / 2 + self.xy[1] / self.z * size).astype(int)
+        gone = (self.z <= 0.05) | (px < 0) | (px >= w) | (py < 0) | (py >= h)
+        respawn = np.flatnonzero(gone)
+        self.xy[:, respawn] = self.rng.uniform(-1, 1, (2, respawn.size))
+        self.z[respawn] = 1.0
+        # Far stars first, so a nearer star on the same cell wins.
+        keep = np.flatnonzero(~gone)
+        keep = keep[np.argsort(-self.z[keep])]
+        light = np.zeros((h, w), dtype=np.float32)
+        light[py[keep], px[keep]] = 1.0 - self.z[keep]
+        return (light[..., None] * np.array([230, 230, 255], dtype=np.float32)).astype(np.uint8)
+
+
+class SpectrumBars(Effect):
+    """An audio-analyser style bar graph with falling peak markers.
+
+    There is no audio input; each band follows a few slow sine waves plus
+    noise, rising at once and falling back gradually like a real meter.
+    """
+
+    PARAMETERS = {"bars": (16, 4, 64), "speed": (1.0, 0.1, 4.0)}
+
+    def reset(self):
+        if not hasattr(self, "levels"):
+            bars = self.params["bars"]
+            self.levels = np.zeros(bars)
+            self.peaks = np.zeros(bars)
+            self.frequencies = self.rng.uniform(0.5, 3.0, (3, bars))
+            self.phases = self.rng.uniform(0, 2 * np.pi, (3, bars))
+            # Bass bands run hotter, like most music.
+            self.envelope = np.linspace(1.0, 0.55, bars)
+
+    def render(self, t, dt):
+        h, w = self.shape
+        bars = self.params["bars"]
+        t = t * self.params["speed"]
+        wave = np.sin(self.frequencies * t + self.phases).mean(axis=0) * 0.5 + 0.5
+        target = np.clip(wave * self.envelope + self.rng.normal(0, 0.05, bars), 0.0, 1.0)
+        self.levels = np.maximum(target, self.levels - 1.5 * dt)
+        self.peaks = np.maximum(self.levels, self.peaks - 0.4 * dt)
+
+        band = np.arange(w) * bars // w
+        # Leave the last column of each band dark when bands are wide enough.
+        gap = np.append(band[1:] != band[:-1], True) & (w // bars >= 3)
+        height = np.where(gap, 0, np.rint(self.levels[band] * h)).astype(int)
+        level = np.arange(h - 1, -1, -1)[:, None]
+        rows = BARS[np.arange(h - 1, -1, -1) * 255 // max(h - 1, 1)]
+        colors = np.where((level < height)[..., None], rows[:, None, :], np.uint8(0))
+        peak = np.minimum(np.rint(self.peaks[band] * h).astype(int), h - 1)
+        cols = np.flatnonzero(~gap & (self.peaks[band] > 0.02))
+        colors[h - 1 - peak[cols], cols] = (255, 255, 255)
+        return colors
+
+
+EFFECTS = {
+    "Plasma": Plasma,
+    "Fire": Fire,
+    "Matrix Rain": MatrixRain,
+    "Starfield": Starfield,
+    "Spectrum Bars": SpectrumBars,
+}
+
+
+def record(effect, count, fps=30):
+    """``count`` frames of ``effect`` at full detail, ``1 / fps`` seconds apart."""
+    effect.set_step(1)
+    return [effect.frame(index / fps, 1.0 / fps) for index in range(count)]
+
+
+class FrameScheduler:
+    """Runs an effect at a target frame rate within each frame's time budget.
+
+    Frame ``i`` shows time ``i / fps``.  When rendering falls a whole frame
+    or more behind, the missed frames are skipped, so the animation keeps
+    its speed and only gets choppier.  With ``adaptive`` set, an average
+    render time above ``high`` of the budget moves the effect to the next
+    coarser step in ``STEPS``.  It moves back once the average has stayed
+    under a quarter of ``low`` of the budget for a whole second, since the
+    finer step renders about four times the cells.  ``frames_rendered``,
+    ``frames_skipped`` and ``render_time`` (a moving average in seconds)
+    report how it is going.
+    """
+
+    def __init__(self, effect, fps=60, adaptive=True, high=0.8, low=0.2):
+        self.effect = effect
+        self.interval = 1.0 / fps
+        self.adaptive = adaptive
+        self.high, self.low = high, low
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        self.render_time = 0.0
+        self._low_since = None
+
+    def _adapt(self, elapsed, now):
+        self.render_time += (elapsed - self.render_time) * (0.2 if self.frames_rendered else 1.0)
+        if not self.adaptive:
+            return
+        level = STEPS.index(self.effect.step) if self.effect.step in STEPS else 0
+        if self.render_time > self.high * self.interval and level + 1 < len(STEPS):
+            self.effect.set_step(STEPS[level + 1])
+            # A coarser step renders about a quarter of the cells.
+            self.render_time /= 4
+            self._low_since = None
+        elif self.render_time < self.low * self.interval / 4 and level > 0:
+            if self._low_since is None:
+                self._low_since = now
+            elif now - self._low_since >= 1.0:
+                self.effect.set_step(STEPS[level - 1])
+                self.render_time *= 4
+                self._low_since = None
+        else:
+            self._low_since = None
+
+    def run(self, emit, running):
+        """Render frames and pass each to ``emit`` until ``running()`` is false."""
+        start = time.perf_counter()
+        index = 0
+        previous = 0.0
+        while running():
+            late = time.perf_counter() - (start + index * self.interval)
+            if late < 0:
+                time.sleep(-late)
+            elif late >= self.interval:
+                skipped = int(late / self.interval)
+                index += skipped
+                self.frames_skipped += skipped
+            t = index * self.interval
+            began = time.perf_counter()
+            colors = self.effect.frame(t, t - previous)
+            now = time.perf_counter()
+            self._adapt(now - began, now)
+            self.frames_rendered += 1
+            previous = t
+            index += 1
+            emit(colors)
@@ -0,0 +1,86 @@
+"""Streaming encoder for the Plain/Formatted/Colored text export formats.
+
+The encoder works straight on the ``lit``/``colors`` arrays and yields the
+text a block of rows at a time, so the full export never has to exist as
+one string unless the caller asks for it.
+"""
+import numpy as np
+
+from palette import FIRMWARE_PALETTE, as_palette
+
+EXPORT_MODES = ("Plain", "Formatted", "Colored")
+
+# Rows per yielded chunk are chosen so a chunk covers about this many cells.
+CHUNK_CELLS = 1 << 16
+
+_ZERO = ord("0")
+
+
+def token_rows(values, to_text):
+    """Turn a 2-D array of small-cardinality keys into rows of strings.
+
+    Each distinct key is formatted once with ``to_text`` and the rows are
+    filled by a gather instead of formatting every cell.
+    """
+    keys, inverse = np.unique(values, return_inverse=True)
+    text = np.array([to_text(int(k)) for k in keys], dtype=object)
+    return text[inverse.reshape(values.shape)].tolist()
+
+
+def _rgb_text(packed):
+    return f"{packed >> 16},{(packed >> 8) & 0xFF},{packed & 0xFF}"
+
+
+def _bit_lines(lit, mode):
+    chars = (lit.astype(np.uint8) + _ZERO).tobytes().decode("ascii")
+    cols = lit.shape[1]
+    lines = []
+    for r in range(lit.shape[0]):
+        row = chars[r * cols:(r + 1) * cols]
+        if mode == "Plain":
+            lines.append(" ".join(row))
+        else:
+            lines.append(", ".join("0b" + row[i:i + 8] for i in range(0, cols, 8)) + ",")
+    return lines
+
+
+def iter_export(lit, colors, mode="Formatted", header=True, color_section=True,
+                palette=FIRMWARE_PALETTE, chunk_cells=CHUNK_CELLS):
+    """Yield the export text for ``lit``/``colors`` in row blocks.
+
+    ``lit`` is the ``bool[H, W]`` mask of cells written as "1" and
+    ``colors`` the matching ``uint8[H, W, 3]`` plane; pass slices to export
+    a row range.  Colored exports store indices into ``palette``.
+    """
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode: {mode}")
+    rows, cols = lit.shape
+    palette = as_palette(palette)
+    step = max(1, chunk_cells // max(1, cols))
+    if header:
+        yield f"#export_format:{mode}\n"
+    for start in range(0, rows, step):
+        block = slice(start, start + step)
+        if mode == "Colored":
+            index = palette.index(colors[block])
+            lines = [",".join(row) for row in token_rows(index, str)]
+        else:
+            lines = _bit_lines(lit[block], mode)
+        if lines:
+            yield "\n".join(lines) + "\n"
+    if mode == "Colored" or not color_section:
+        return
+    yield "\n#colors\n"
+    for start in range(0, rows, step):
+        block = colors[start:start + step].astype(np.uint32)
+        packed = (block[..., 0] << 16) | (block[..., 1] << 8) | block[..., 2]
+        lines = [" ".join(row) for row in token_rows(packed, _rgb_text)]
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+
+def write_export(writer, lit, colors, mode="Formatted", header=True, color_section=True,
+                 palette=FIRMWARE_PALETTE):
+    """Stream the export to anything with a ``write(str)`` method."""
+    for chunk in iter_export(lit, colors, mode, header, color_section, palette):
+        writer.write(chunk)
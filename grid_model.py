@@ -0,0 +1,266 @@
+import numpy as np
+
+
+BLACK = (0, 0, 0)
+
+# Where existing content lands when the grid is resized, as (row, col)
+# multiples of half the size difference.
+RESIZE_ANCHORS = {
+    "top-left": (0, 0),
+    "center": (1, 1),
+}
+
+
+# How a merged layer combines with the grid, cell by cell:
+#   or        lit in either; the layer's color wins where it is lit
+#   and       lit in both; keeps the grid's color
+#   xor       lit in exactly one, with that one's color
+#   subtract  lit in the grid but not in the layer
+#   under     the layer only fills cells that are off in the grid
+MERGE_MODES = ("or", "and", "xor", "subtract", "under")
+
+
+def merge_planes(on, colors, layer_on, layer_colors, mode="or"):
+    """Combine a layer with same-shaped planes; returns the new ``(on, colors)``."""
+    if mode == "or":
+        new_on, take = on | layer_on, layer_on
+    elif mode == "and":
+        new_on, take = on & layer_on, None
+    elif mode == "xor":
+        new_on, take = on ^ layer_on, layer_on & ~on
+    elif mode == "subtract":
+        new_on, take = on & ~layer_on, None
+    elif mode == "under":
+        new_on, take = on | layer_on, layer_on & ~on
+    else:
+        raise ValueError(f"Unknown merge mode: {mode}")
+    if take is not None:
+        colors = np.where(take[..., None], layer_colors, colors)
+    return new_on, colors
+
+
+class GridModel:
+    """Cell state of the LED grid held as NumPy planes.
+
+    ``colors`` is a ``uint8[H, W, 3]`` RGB plane and ``on`` a ``bool[H, W]``
+    mask.  Cells that are off always carry black in ``colors``.  The model has
+    no Qt dependency so it can be used headless; widgets only render it.
+
+    Every mutating method only writes the cells whose value actually changes
+    and ORs them into ``dirty``; views collect it with ``take_dirty()``.
+    """
+
+    def __init__(self, rows=32, cols=64):
+        self.on = np.zeros((rows, cols), dtype=bool)
+        self.colors = np.zeros((rows, cols, 3), dtype=np.uint8)
+        self.dirty = np.zeros((rows, cols), dtype=bool)
+
+    @property
+    def rows(self):
+        return self.on.shape[0]
+
+    @property
+    def cols(self):
+        return self.on.shape[1]
+
+    @property
+    def shape(self):
+        return self.on.shape
+
+    @classmethod
+    def from_arrays(cls, on, colors):
+        model = cls(0, 0)
+        model.on = np.array(on, dtype=bool)
+        model.colors = np.array(colors, dtype=np.uint8)
+        model.colors[~model.on] = 0
+        model.dirty = np.ones(model.shape, dtype=bool)
+        return model
+
+    @classmethod
+    def from_state(cls, state):
+        """Build a model from the legacy ``[[(colored, (r, g, b)), ...], ...]`` list."""
+        rows = len(state)
+        cols = len(state[0]) if rows else 0
+        model = cls(rows, cols)
+        model.load_state(state)
+        return model
+
+    def copy(self):
+        return GridModel.from_arrays(self.on, self.colors)
+
+    def snapshot(self):
+        return self.on.copy(), self.colors.copy()
+
+    def restore(self, snapshot):
+        self.assign(*snapshot)
+
+    def mark_dirty(self, mask=None):
+        if mask is None:
+            self.dirty[:] = True
+        else:
+            self.dirty |= mask
+
+    def take_dirty(self):
+        """Return the cells changed since the last call and reset the mask."""
+        dirty = self.dirty
+        self.dirty = np.zeros(self.shape, dtype=bool)
+        return dirty
+
+    def diff(self, on, colors):
+        """Mask of cells whose state differs from the given planes."""
+        return (self.on != on) | np.any(self.colors != colors, axis=-1)
+
+    def assign(self, on, colors):
+        """Replace the whole grid, writing only the cells that change.
+
+        A differently shaped grid replaces the planes outright.  Returns the
+        mask of changed cells.
+        """
+        on = np.asarray(on, dtype=bool)
+        colors = np.where(on[..., None], np.asarray(colors, dtype=np.uint8), np.uint8(0))
+        if on.shape != self.shape:
+            self.on = on.copy()
+            self.colors = colors
+            self.dirty = np.ones(self.shape, dtype=bool)
+            return self.dirty.copy()
+        changed = self.diff(on, colors)
+        self.on[changed] = on[changed]
+        self.colors[changed] = colors[changed]
+        self.dirty |= changed
+        return changed
+
+    def resize(self, rows, cols, anchor="top-left"):
+        """Change the grid size, keeping the overlapping content at ``anchor``."""
+        ky, kx = RESIZE_ANCHORS[anchor]
+        dy = (rows - self.rows) * ky // 2
+        dx = (cols - self.cols) * kx // 2
+        src_y, dst_y = max(0, -dy), max(0, dy)
+        src_x, dst_x = max(0, -dx), max(0, dx)
+        h = max(0, min(self.rows - src_y, rows - dst_y))
+        w = max(0, min(self.cols - src_x, cols - dst_x))
+        on = np.zeros((rows, cols), dtype=bool)
+        colors = np.zeros((rows, cols, 3), dtype=np.uint8)
+        on[dst_y:dst_y + h, dst_x:dst_x + w] = self.on[src_y:src_y + h, src_x:src_x + w]
+        colors[dst_y:dst_y + h, dst_x:dst_x + w] = self.colors[src_y:src_y + h, src_x:src_x + w]
+        self.on = on
+        self.colors = colors
+        self.dirty = np.ones((rows, cols), dtype=bool)
+
+    def to_state(self):
+        """Return the legacy list-of-tuples representation."""
+        state = []
+        for on_row, color_row in zip(self.on.tolist(), self.colors.tolist()):
+            state.append([(True, tuple(rgb)) if on else (False, BLACK)
+                          for on, rgb in zip(on_row, color_row)])
+        return state
+
+    def load_state(self, state):
+        """Write a legacy list-of-tuples state; cells outside the grid are ignored."""
+        on = self.on.copy()
+        colors = self.colors.copy()
+        rows = min(len(state), self.rows)
+        for r in range(rows):
+            row = state[r][:self.cols]
+            if not row:
+                continue
+            on[r, :len(row)] = np.fromiter((cell[0] for cell in row), dtype=bool, count=len(row))
+            colors[r, :len(row)] = np.array([cell[1] for cell in row], dtype=np.uint8).reshape(len(row), 3)
+        return self.assign(on, colors)
+
+    def get_cell(self, r, c):
+        if self.on[r, c]:
+            return True, tuple(int(v) for v in self.colors[r, c])
+        return False, BLACK
+
+    def set_cell(self, r, c, on, rgb=BLACK):
+        rgb = tuple(rgb) if on else BLACK
+        if self.get_cell(r, c) == (bool(on), rgb):
+            return
+        self.on[r, c] = on
+        self.colors[r, c] = rgb
+        self.dirty[r, c] = True
+
+    def clear(self):
+        self.dirty |= self.on
+        self.on[:] = False
+        self.colors[:] = 0
+
+    def paste(self, on, colors, top=0, left=0):
+        """Overwrite a region with the given planes, clipped to the grid."""
+        h = max(0, min(on.shape[0], self.rows - top))
+        w = max(0, min(on.shape[1], self.cols - left))
+        new_on = self.on.copy()
+        new_colors = self.colors.copy()
+        new_on[top:top + h, left:left + w] = on[:h, :w]
+        new_colors[top:top + h, left:left + w] = colors[:h, :w]
+        return self.assign(new_on, new_colors)
+
+    def merge(self, layers, mode="or"):
+        """Merge ``(on, colors)`` layers in order, each placed at the top-left.
+
+        A layer counts as off outside its own area, so ``and`` clears the
+        rest of the grid.  All layers are combined before the grid is
+        written once; returns the changed-cell mask.
+        """
+        on = self.on.copy()
+        colors = self.colors.copy()
+        layer_on = np.zeros_like(on)
+        layer_colors = np.zeros_like(colors)
+        for src_on, src_colors in layers:
+            h = min(src_on.shape[0], self.rows)
+            w = min(src_on.shape[1], self.cols)
+            layer_on[:] = False
+            layer_on[:h, :w] = src_on[:h, :w]
+            layer_colors[:h, :w] = src_colors[:h, :w]
+            on, colors = merge_planes(on, colors, layer_on, layer_colors, mode)
+        return self.assign(on, colors)
+
+    def shift(self, direction):
+        """Move every lit cell one step; cells pushed past the edge are dropped."""
+        on = np.zeros_like(self.on)
+        colors = np.zeros_like(self.colors)
+        if direction == "left":
+            on[:, :-1], colors[:, :-1] = self.on[:, 1:], self.colors[:, 1:]
+        elif direction == "right":
+            on[:, 1:], colors[:, 1:] = self.on[:, :-1], self.colors[:, :-1]
+        elif direction == "up":
+            on[:-1], colors[:-1] = self.on[1:], self.colors[1:]
+        elif direction == "down":
+            on[1:], colors[1:] = self.on[:-1], self.colors[:-1]
+        else:
+            raise ValueError(f"Unknown shift direction: {direction}")
+        return self.assign(on, colors)
+
+    def roll(self, shift, axis, rows=None, cols=None):
+        """Cyclically roll the sub-grid picked by ``rows`` x ``cols`` along ``axis``.
+
+        ``rows``/``cols`` are index sequences; ``None`` selects the whole axis.
+        """
+        rows = np.arange(self.rows) if rows is None else np.asarray(sorted(rows), dtype=np.intp)
+        cols = np.arange(self.cols) if cols is None else np.asarray(sorted(cols), dtype=np.intp)
+        if rows.size == 0 or cols.size == 0:
+            return np.zeros(self.shape, dtype=bool)
+        idx = np.ix_(rows, cols)
+        on = self.on.copy()
+        colors = self.colors.copy()
+        on[idx] = np.roll(self.on[idx], shift, axis=axis)
+        colors[idx] = np.roll(self.colors[idx], shift, axis=axis)
+        return self.assign(on, colors)
+
+    def color_mask(self, rgb):
+        """Mask of lit cells whose color equals ``rgb``."""
+        return self.on & np.all(self.colors == np.asarray(rgb, dtype=np.uint8), axis=-1)
+
+    def lit_mask(self):
+        """Mask of cells exported as "1": lit and not black."""
+        return self.on & self.colors.any(axis=-1)
+
+    def recolor(self, mask, rgb):
+        colors = self.colors.copy()
+        colors[mask & self.on] = rgb
+        return self.assign(self.on, colors)
+
+    def turn_off(self, mask):
+        self.dirty |= mask & self.on
+        self.on[mask] = False
+        self.colors[mask] = 0
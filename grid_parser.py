@@ -0,0 +1,465 @@
+"""Parser for the Plain/Formatted/Colored text export formats.
+
+The whole file is scanned as one ``uint8`` array: characters are
+classified, validated and turned into bits and numbers with array
+operations, and frames that share a mode and a full rectangular shape, as
+the exporter writes them, are built as one stack.  No Python loop runs
+over lines or cells.  Malformed input raises ``ParseError`` with the
+1-based line number.
+
+The format of each frame is detected from its first data row; the
+``#export_format`` header only settles the one ambiguous case, a
+single-column file of bare numbers.  A file may hold several frames: every
+``#export_format:`` line after the first starts a new one.
+"""
+import numpy as np
+
+from palette import FIRMWARE_PALETTE, as_palette
+
+DEFAULT_COLOR = (0, 128, 0)
+
+HEADER_PREFIX = "#export_format:"
+COLORS_MARKER = "#colors"
+
+# Per-line kinds.  SKIP covers headers, markers, blank lines outside a frame
+# and the colors section of Colored frames, which older files may carry.
+SKIP, PLAIN, FORMATTED, COLORED, COLORS = range(5)
+MODE_KINDS = {"Plain": PLAIN, "Formatted": FORMATTED, "Colored": COLORED}
+
+_NL, _CR, _SPACE, _TAB = 10, 13, 32, 9
+_COMMA, _ZERO, _ONE, _B, _HASH = ord(","), ord("0"), ord("1"), ord("b"), ord("#")
+_MAX_DIGITS = 9
+
+
+# Character classes, looked up for the whole file with ``bytes.translate``:
+# bit ``k`` is set when line kind ``k`` may contain the byte, plus two flags.
+_BLANK_FLAG, _DIGIT_FLAG = 1 << 5, 1 << 6
+
+
+def _class_table():
+    blanks = [_NL, _CR, _SPACE, _TAB]
+    digits = list(range(_ZERO, _ZERO + 10))
+    allowed = {
+        PLAIN: blanks + [_ZERO, _ONE],
+        FORMATTED: blanks + [_ZERO, _ONE, _B, _COMMA],
+        COLORED: blanks + digits + [_COMMA],
+        COLORS: blanks + digits + [_COMMA],
+    }
+    table = np.full(256, 1 << SKIP, dtype=np.uint8)
+    for kind, chars in allowed.items():
+        table[chars] |= 1 << kind
+    table[blanks] |= _BLANK_FLAG
+    table[digits] |= _DIGIT_FLAG
+    return table.tobytes()
+
+
+_CLASS = _class_table()
+
+
+class ParseError(ValueError):
+    """Malformed export text; ``line`` is the 1-based line number."""
+
+    def __init__(self, line, message):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+class ParsedGrid:
+    """Result of parsing one frame of an export file.
+
+    ``defined`` marks the cells the file has data for, ``on``/``colors`` the
+    cells it lights up and their colors.  All three share the file's shape.
+    """
+
+    def __init__(self, mode, on, colors, defined):
+        self.mode = mode
+        self.on = on
+        self.colors = colors
+        self.defined = defined
+
+    @property
+    def shape(self):
+        return self.on.shape
+
+
+def detect_format(line, header=None):
+    """Export mode of a data ``line``; ``header`` breaks the tie for a lone number."""
+    line = line.strip()
+    if "0b" in line:
+        return "Formatted"
+    if "," in line:
+        return "Colored"
+    if header == "Colored" and line.isdigit():
+        return "Colored"
+    return "Plain"
+
+
+class _Frame:
+    __slots__ = ("header", "data", "colors", "mode")
+
+    def __init__(self, header, start, end):
+        self.header = header
+        self.data = [start, end]
+        self.colors = None
+        self.mode = None
+
+
+class _Scan:
+    """Character classes and per-line tables for one export text."""
+
+    def __init__(self, text):
+        self.raw = text.encode("utf-8")
+        buf = np.frombuffer(self.raw, dtype=np.uint8)
+        self.buf = buf
+        newlines = np.flatnonzero(buf == _NL)
+        self.starts = np.concatenate(([0], newlines + 1))
+        self.ends = np.concatenate((newlines, [buf.size]))
+        if self.starts[-1] == buf.size:
+            self.starts, self.ends = self.starts[:-1], self.ends[:-1]
+        self.lines = len(self.starts)
+        # Line lengths including the newline, for spreading per-line values over characters.
+        self.spans = np.diff(np.append(self.starts, buf.size))
+        self.classes = np.frombuffer(self.raw.translate(_CLASS), dtype=np.uint8)
+        self.blank = (self.classes & _BLANK_FLAG).astype(bool)
+        if self.lines:
+            self.nonblank = np.logical_or.reduceat(~self.blank, self.starts)
+        else:
+            self.nonblank = np.zeros(0, dtype=bool)
+        self.is_digit = (self.classes & _DIGIT_FLAG).astype(bool)
+
+    def line_text(self, index):
+        return self.raw[self.starts[index]:self.ends[index]].decode("utf-8", "replace").rstrip("\r")
+
+    def line_of(self, positions):
+        """Line index of each character position."""
+        return np.searchsorted(self.starts, positions, side="right") - 1
+
+    def per_char(self, per_line):
+        return np.repeat(per_line, self.spans)
+
+    def line_counts(self, positions):
+        """Number of ``positions`` (sorted character indices) falling on each line."""
+        return np.diff(np.searchsorted(positions, np.append(self.starts, self.buf.size)))
+
+    def error(self, char_index, message):
+        raise ParseError(int(self.line_of(char_index)) + 1, message)
+
+
+def _split_frames(scan):
+    """Find headers and ``#colors`` markers and cut the lines into frames."""
+    buf, starts = scan.buf, scan.starts
+    if not scan.lines:
+        return [_Frame(None, 0, 0)]
+    hashes = np.flatnonzero((scan.ends > starts) & (buf[np.minimum(starts, buf.size - 1)] == _HASH))
+    frames = []
+    for index in hashes.tolist():
+        line = scan.line_text(index)
+        if line.startswith(HEADER_PREFIX):
+            if not frames and index > 0:
+                frames.append(_Frame(None, 0, index))
+            frames.append(_Frame(line[len(HEADER_PREFIX):].strip(), index + 1, None))
+        elif line.strip() == COLORS_MARKER:
+            if not frames:
+                frames.append(_Frame(None, 0, None))
+            frame = frames[-1]
+            if frame.colors is not None:
+                raise ParseError(index + 1, "second #colors section in one frame")
+            frame.data[1] = index
+            frame.colors = [index + 1, None]
+        else:
+            raise ParseError(index + 1, f"unexpected line {line[:40]!r}")
+    if not frames:
+        frames.append(_Frame(None, 0, None))
+    for k, frame in enumerate(frames):
+        end = frames[k + 1].data[0] - 1 if k + 1 < len(frames) else scan.lines
+        if frame.data[1] is None:
+            frame.data[1] = end
+        if frame.colors is not None:
+            frame.colors[1] = end
+    first = frames[0]
+    if len(frames) > 1 and first.header is None and first.colors is None \
+            and not scan.nonblank[first.data[0]:first.data[1]].any():
+        # Blank lines before the first header do not make a frame.
+        frames.pop(0)
+    return frames
+
+
+def _line_kinds(scan, frames):
+    kind = np.zeros(scan.lines, dtype=np.int8)
+    for frame in frames:
+        start, end = frame.data
+        found = np.flatnonzero(scan.nonblank[start:end])
+        if found.size:
+            frame.mode = detect_format(scan.line_text(start + int(found[0])), frame.header)
+        else:
+            frame.mode = frame.header if frame.header in MODE_KINDS else "Plain"
+        kind[start:end] = MODE_KINDS[frame.mode]
+        if frame.colors is not None and frame.mode != "Colored":
+            kind[frame.colors[0]:frame.colors[1]] = COLORS
+    return kind
+
+
+def _shifted(array, step, fill):
+    """``array`` moved ``step`` places right (positive) or left, padded with ``fill``."""
+    pad = np.full(abs(step), fill, dtype=array.dtype)
+    if step > 0:
+        return np.concatenate((pad, array[:-step]))
+    return np.concatenate((array[-step:], pad))
+
+
+def _parse_bits(scan, char_kind):
+    # Work on the Plain and Formatted lines only, newlines included, so
+    # neighbouring characters are the same as in the whole text.
+    chars = np.flatnonzero((char_kind == PLAIN) | (char_kind == FORMATTED))
+    buf, is_digit = scan.buf[chars], scan.is_digit[chars]
+    prev = _shifted(buf, 1, 0)
+    prev_digit = _shifted(is_digit, 1, False)
+    plain = char_kind[chars] == PLAIN
+    formatted = ~plain
+
+    crowded = np.flatnonzero(plain & is_digit & prev_digit)
+    if crowded.size:
+        scan.error(chars[crowded[0]], "Plain values must be separated by spaces")
+    prefix = formatted & is_digit & (_shifted(buf, -1, 0) == _B)
+    bad = np.flatnonzero((formatted & (buf == _B) & (prev != _ZERO)) | (prefix & prev_digit))
+    if bad.size:
+        scan.error(chars[bad[0]], "malformed 0b prefix")
+    bit = is_digit & ~prefix
+    stray = np.flatnonzero(formatted & bit & ~_shifted(bit, 1, False) & (prev != _B))
+    if stray.size:
+        scan.error(chars[stray[0]], "Formatted bits must follow a 0b prefix")
+
+    found = np.flatnonzero(bit)
+    return buf[found] == _ONE, scan.line_counts(chars[found])
+
+
+def _number_values(buf, token_end, digits):
+    """Values of the decimal numbers of ``digits`` digits ending before ``token_end``."""
+    values = buf[token_end - 1].astype(np.int32) - _ZERO
+    scale = 10
+    for place in range(1, int(digits.max(initial=0))):
+        # One pass per further digit, over the numbers that have it.
+        longer = np.flatnonzero(digits > place)
+        values[longer] += (buf[token_end[longer] - 1 - place].astype(np.int32) - _ZERO) * scale
+        scale *= 10
+    return values
+
+
+def _parse_numbers(scan, char_kind, kind):
+    buf = scan.buf
+    number = scan.is_digit & (char_kind >= COLORED)
+    padded = np.zeros(number.size + 2, dtype=bool)
+    padded[1:-1] = number
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    token_start, token_end = edges[::2], edges[1::2]
+    digits = token_end - token_start
+    longest = int(digits.max(initial=0))
+    if longest > _MAX_DIGITS:
+        scan.error(token_start[np.argmax(digits)], "number too long")
+    values = _number_values(buf, token_end, digits)
+    counts = scan.line_counts(token_start)
+
+    # Numbers joined by single commas form runs (an r,g,b color or a whole
+    # Colored row); any other comma is loose.
+    comma = buf == _COMMA
+    joining = comma & _shifted(number, 1, False) & _shifted(number, -1, False)
+    loose_commas = np.flatnonzero(comma & ~joining & (char_kind >= COLORED))
+    # ``joining[-1]`` is always False, so a number at offset 0 starts a run.
+    run_first = np.flatnonzero(~joining[token_start - 1])
+    run_start = token_start[run_first]
+    run_length = np.diff(np.append(run_first, token_start.size))
+    run_counts = scan.line_counts(run_start)
+    loose_counts = scan.line_counts(loose_commas)
+
+    # Colored rows: one run of indices, plus an optional trailing comma.
+    colored = kind == COLORED
+    bad = colored & scan.nonblank & ((run_counts != 1) | (loose_counts > 1))
+    trailing = np.flatnonzero(colored & (loose_counts == 1))
+    if trailing.size:
+        last_comma = loose_commas[np.searchsorted(loose_commas, scan.ends[trailing]) - 1]
+        last_number = token_end[np.searchsorted(token_end, scan.ends[trailing], side="right") - 1]
+        bad[trailing] |= last_comma < last_number
+    bad = np.flatnonzero(bad)
+    if bad.size:
+        raise ParseError(int(bad[0]) + 1, "expected comma-separated palette indices (Colored format)")
+
+    # Color rows: space-separated r,g,b triples.
+    color_runs = char_kind[run_start] == COLORS
+    bad_lines = scan.line_of(run_start[color_runs & (run_length != 3)][:1]).tolist()
+    bad_lines += np.flatnonzero((kind == COLORS) & (loose_counts != 0))[:1].tolist()
+    if bad_lines:
+        raise ParseError(min(bad_lines) + 1, "expected r,g,b colors separated by spaces")
+    too_big = np.flatnonzero(values > 255)
+    too_big = too_big[char_kind[token_start[too_big]] == COLORS]
+    if too_big.size:
+        scan.error(token_start[too_big[0]], "color component above 255")
+    return values, counts
+
+
+def _fill(lengths, values, width):
+    """Spread ``values`` (row-major, ``lengths[r]`` per row) over a ``width``-wide grid."""
+    lengths = np.asarray(lengths, dtype=np.intp)
+    if values.shape[0] == lengths.size * width:
+        # Rectangular block, the usual case: no masking needed.
+        return values.reshape((lengths.size, width) + values.shape[1:]), np.ones((lengths.size, width), dtype=bool)
+    defined = np.arange(width) < lengths[:, None]
+    grid = np.zeros(defined.shape + values.shape[1:], dtype=values.dtype)
+    grid[defined] = values
+    return grid, defined
+
+
+class _Values:
+    """Parsed bits and numbers with per-line offsets, sliced per frame."""
+
+    def __init__(self, bits, bit_counts, numbers, number_counts):
+        self.bits = bits
+        self.bit_counts = bit_counts
+        self.bit_offsets = np.concatenate(([0], np.cumsum(bit_counts)))
+        self.numbers = numbers
+        self.number_counts = number_counts
+        self.number_offsets = np.concatenate(([0], np.cumsum(number_counts)))
+
+    def bit_rows(self, start, end):
+        return self.bits[self.bit_offsets[start]:self.bit_offsets[end]], self.bit_counts[start:end]
+
+    def number_rows(self, start, end):
+        return self.numbers[self.number_offsets[start]:self.number_offsets[end]], self.number_counts[start:end]
+
+
+def _packed(rgb):
+    """``r, g, b`` components (last axis) as one ``uint32`` per cell."""
+    rgb = np.asarray(rgb).astype(np.uint32)
+    return rgb[..., 0] | (rgb[..., 1] << 8) | (rgb[..., 2] << 16)
+
+
+def _unpacked(packed):
+    return np.ascontiguousarray(packed.astype("<u4").view(np.uint8).reshape(packed.shape + (4,))[..., :3])
+
+
+def _build_frame(frame, scan, parsed, default_rgb, palette):
+    # Colors are handled packed into one uint32 per cell, which keeps the
+    # per-frame work on 2-D arrays; only the result is split into channels.
+    start, end = frame.data
+    rows = scan.nonblank[start:end]
+    if frame.mode == "Colored":
+        values, lengths = parsed.number_rows(start, end)
+    else:
+        values, lengths = parsed.bit_rows(start, end)
+    lengths = lengths[rows]
+    color_lengths = np.zeros(0, dtype=np.intp)
+    color_values = np.zeros(0, dtype=np.uint32)
+    if frame.colors is not None and frame.mode != "Colored":
+        color_values, color_lengths = parsed.number_rows(*frame.colors)
+        color_values = _packed(color_values.reshape(-1, 3))
+        color_lengths = color_lengths // 3
+
+    n = len(lengths)
+    height = max(n, len(color_lengths) if frame.mode == "Formatted" else 0)
+    width = int(max(lengths.max(initial=0), color_lengths.max(initial=0)))
+    on = np.zeros((height, width), dtype=bool)
+    defined = np.zeros((height, width), dtype=bool)
+    grid, row_defined = _fill(lengths, values, width)
+    defined[:n] = row_defined
+    default = _packed(default_rgb)
+    if frame.mode == "Colored":
+        table = np.append(_packed(palette.array), default)
+        on[:n] = row_defined
+        packed = np.where(row_defined, table[np.minimum(grid, len(palette))], np.uint32(0))
+        return ParsedGrid(frame.mode, on, _unpacked(packed), defined)
+
+    on[:n] = grid
+    packed = np.where(on, default, np.uint32(0))
+    if len(color_lengths):
+        color_grid, color_defined = _fill(color_lengths, color_values, width)
+        h = len(color_lengths)
+        if frame.mode == "Formatted":
+            # Every color entry lights its cell, matching what older exports expect.
+            on[:h] |= color_defined
+            defined[:h] |= color_defined
+            take = color_defined
+        else:
+            h = min(n, h)
+            take = color_defined[:h] & on[:h]
+        packed[:h] = np.where(take, color_grid[:h], packed[:h])
+    return ParsedGrid(frame.mode, on, _unpacked(packed), defined)
+
+
+def _in_ranges(lines, starts, ends):
+    """Mask of the lines inside any of the ranges ``starts[i]..ends[i]``."""
+    marks = np.zeros(lines + 1, dtype=np.int32)
+    np.add.at(marks, starts, 1)
+    np.add.at(marks, ends, -1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+def _build_stack(frames, scan, parsed, default_rgb, palette):
+    """Build every frame in one pass when all share a mode and a full ``H`` x ``W`` shape.
+
+    That is how the exporter writes them.  Returns ``None`` for anything
+    else, which ``_build_frame`` then handles frame by frame.
+    """
+    mode = frames[0].mode
+    if any(frame.mode != mode for frame in frames):
+        return None
+    count = len(frames)
+    starts, ends = np.array([frame.data for frame in frames]).T
+    nonblank_before = np.concatenate(([0], np.cumsum(scan.nonblank)))
+    rows = nonblank_before[ends] - nonblank_before[starts]
+    height = int(rows[0])
+    lengths = parsed.number_counts if mode == "Colored" else parsed.bit_counts
+    lengths = lengths[_in_ranges(scan.lines, starts, ends) & scan.nonblank]
+    if not height or (rows != height).any() or (lengths != lengths[0]).any():
+        return None
+    width = int(lengths[0])
+    on = np.ones((count, height, width), dtype=bool)
+    defined = np.ones((count, height, width), dtype=bool)
+
+    if mode == "Colored":
+        table = np.concatenate((palette.array, [default_rgb])).astype(np.uint8)
+        index = np.minimum(parsed.numbers.reshape(count, height, width), len(palette))
+        colors = np.take(table, index, axis=0)
+    else:
+        on = parsed.bits.reshape(count, height, width)
+        with_colors = [frame.colors is not None for frame in frames]
+        if any(with_colors):
+            if not all(with_colors):
+                return None
+            color_starts, color_ends = np.array([frame.colors for frame in frames]).T
+            color_lengths = parsed.number_counts[_in_ranges(scan.lines, color_starts, color_ends)]
+            if ((color_ends - color_starts) != height).any() or (color_lengths != 3 * width).any():
+                return None
+            colors = parsed.numbers.reshape(count, height, width, 3).astype(np.uint8)
+            if mode == "Formatted":
+                # Every color entry lights its cell, as in _build_frame.
+                on = defined
+            else:
+                colors *= on[..., None]
+        else:
+            colors = np.where(on[..., None], np.asarray(default_rgb, dtype=np.uint8), np.uint8(0))
+    return [ParsedGrid(mode, on[k], colors[k], defined[k]) for k in range(count)]
+
+
+def parse_frames(text, default_rgb=DEFAULT_COLOR, palette=FIRMWARE_PALETTE):
+    """Parse every frame in ``text``; returns a list of ``ParsedGrid``."""
+    palette = as_palette(palette)
+    scan = _Scan(text)
+    frames = _split_frames(scan)
+    kind = _line_kinds(scan, frames)
+    char_kind = scan.per_char(kind)
+    bad = np.flatnonzero((scan.classes & scan.per_char(np.uint8(1) << kind.astype(np.uint8))) == 0)
+    if bad.size:
+        char = int(scan.buf[bad[0]])
+        shown = repr(chr(char)) if char < 128 else "non-ASCII text"
+        section = {PLAIN: "Plain", FORMATTED: "Formatted", COLORED: "Colored"}.get(int(char_kind[bad[0]]), "colors")
+        scan.error(bad[0], f"unexpected {shown} in {section} data")
+    parsed = _Values(*_parse_bits(scan, char_kind), *_parse_numbers(scan, char_kind, kind))
+    stack = _build_stack(frames, scan, parsed, default_rgb, palette)
+    if stack is not None:
+        return stack
+    return [_build_frame(frame, scan, parsed, default_rgb, palette) for frame in frames]
+
+
+def parse_grid(text, default_rgb=DEFAULT_COLOR, palette=FIRMWARE_PALETTE):
+    """Parse the first frame of ``text``."""
+    return parse_frames(text, default_rgb, palette)[0]
@@ -0,0 +1,242 @@
+import time
+
+import numpy as np
+
+
+class CellDiff:
+    """Sparse set of cell values: flat cell indices plus their on/color values."""
+
+    __slots__ = ("index", "on", "colors")
+
+    def __init__(self, index, on, colors):
+        self.index = index
+        self.on = on
+        self.colors = colors
+
+    @classmethod
+    def between(cls, source, target):
+        """Diff that turns ``target`` back into ``source`` (both ``(on, colors)``)."""
+        source_on, source_colors = source
+        target_on, target_colors = target
+        changed = (source_on != target_on) | np.any(source_colors != target_colors, axis=-1)
+        index = np.flatnonzero(changed).astype(np.int32)
+        rows, cols = np.unravel_index(index, source_on.shape)
+        return cls(index, source_on[rows, cols], source_colors[rows, cols])
+
+    @property
+    def nbytes(self):
+        return self.index.nbytes + self.on.nbytes + self.colors.nbytes
+
+    def apply(self, on, colors):
+        """Write the stored values into ``on``/``colors`` in place and return them."""
+        rows, cols = np.unravel_index(self.index, on.shape)
+        on[rows, cols] = self.on
+        colors[rows, cols] = self.colors
+        return on, colors
+
+    def changed_mask(self, shape):
+        mask = np.zeros(shape, dtype=bool)
+        mask.flat[self.index] = True
+        return mask
+
+
+class Keyframe:
+    """Full copy of a grid state, used when a diff would not be smaller."""
+
+    __slots__ = ("on", "colors")
+
+    def __init__(self, on, colors):
+        self.on = on.copy()
+        self.colors = colors.copy()
+
+    @property
+    def nbytes(self):
+        return self.on.nbytes + self.colors.nbytes
+
+    def apply(self, on, colors):
+        return self.on.copy(), self.colors.copy()
+
+    def changed_mask(self, shape):
+        return None
+
+
+class History:
+    """Undo/redo history that stores sparse per-cell diffs between states.
+
+    Only the newest undo state is kept in full.  Every older state is stored
+    as a ``CellDiff`` that rebuilds it from the state above it, or as a
+    ``Keyframe`` every ``keyframe_interval`` entries and whenever the grid
+    shape changed or the diff would be larger than a full copy.  Once the
+    stored entries exceed ``max_bytes`` the oldest undo entries are dropped.
+
+    ``record`` calls that pass the same ``merge_key`` within ``merge_window``
+    seconds of each other collapse into one entry, so a held-down key
+    produces a single undo step.
+
+    Each state can carry a ``context``: state kept outside ``model`` that
+    must come back with it.  After ``undo``/``redo``, ``context`` holds the
+    one saved with the state just restored.  ``context_nbytes(older,
+    newer)`` returns the bytes ``older`` keeps alive that ``newer`` no
+    longer references; a stored context is charged that against
+    ``max_bytes`` next to its entry.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, keyframe_interval=64, merge_window=1.0,
+                 context_nbytes=None):
+        self.max_bytes = max_bytes
+        self.keyframe_interval = keyframe_interval
+        self.merge_window = merge_window
+        self.context_nbytes = context_nbytes
+        self.undo_entries = []
+        self.redo_entries = []
+        self.undo_contexts = []
+        self.redo_contexts = []
+        self.context = None
+        self.nbytes = 0
+        self._top = None
+        self._top_context = None
+        self._since_keyframe = 0
+        self._merge_key = None
+        self._merge_time = 0.0
+
+    def __len__(self):
+        return len(self.undo_entries) + (self._top is not None)
+
+    def can_undo(self):
+        return self._top is not None
+
+    def can_redo(self):
+        return bool(self.redo_entries)
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+        self.undo_contexts.clear()
+        self.redo_contexts.clear()
+        self.context = None
+        self.nbytes = 0
+        self._top = None
+        self._top_context = None
+        self._since_keyframe = 0
+        self._merge_key = None
+
+    def record(self, model, merge_key=None, context=None):
+        """Save the current state of ``model`` (and ``context``) as a new undo step."""
+        now = time.monotonic()
+        if (merge_key is not None and merge_key == self._merge_key and self._top is not None
+                and not self.redo_entries and now - self._merge_time <= self.merge_window):
+            self._merge_time = now
+            return
+        self._merge_key = merge_key
+        self._merge_time = now
+        for entry in self.redo_entries:
+            self.nbytes -= entry.nbytes
+        for _, nbytes in self.redo_contexts:
+            self.nbytes -= nbytes
+        self.redo_entries.clear()
+        self.redo_contexts.clear()
+        self._push(model.snapshot(), context)
+
+    def undo(self, model, context=None):
+        """Restore the previous state into ``model``.
+
+        ``context`` goes with the live state and comes back from ``redo``.
+        Returns a mask of the cells that changed, or ``None`` when the whole
+        grid was replaced.
+        """
+        if self._top is None:
+            return None
+        self._merge_key = None
+        live = (model.on, model.colors)
+        redo = self._encode(live, self._top, keyframe=False)
+        context_bytes = self._context_cost(context, self._top_context)
+        self.redo_entries.append(redo)
+        self.redo_contexts.append((context, context_bytes))
+        self.nbytes += redo.nbytes + context_bytes
+        changed = self._restore(model, redo, self._top)
+        self.context = self._top_context
+        self.nbytes -= self._top[0].nbytes + self._top[1].nbytes
+        if self.undo_entries:
+            entry = self.undo_entries.pop()
+            self._top_context, context_bytes = self.undo_contexts.pop()
+            self.nbytes -= entry.nbytes + context_bytes
+            top = entry.apply(self._top[0], self._top[1])
+            self._top = top
+            self.nbytes += top[0].nbytes + top[1].nbytes
+        else:
+            self._top = self._top_context = None
+        self._evict()
+        return changed
+
+    def redo(self, model, context=None):
+        """Re-apply the most recently undone state; returns a changed-cell mask or ``None``."""
+        if not self.redo_entries:
+            return None
+        self._merge_key = None
+        entry = self.redo_entries.pop()
+        restored, context_bytes = self.redo_contexts.pop()
+        self.nbytes -= entry.nbytes + context_bytes
+        self._push(model.snapshot(), context)
+        self.context = restored
+        return self._apply_to_model(model, entry)
+
+    def _restore(self, model, redo, state):
+        if isinstance(redo, Keyframe):
+            return self._apply_to_model(model, Keyframe(*state))
+        return self._apply_to_model(model, CellDiff(redo.index, *self._values_at(state, redo.index)))
+
+    @staticmethod
+    def _apply_to_model(model, entry):
+        if isinstance(entry, Keyframe):
+            model.assign(entry.on, entry.colors)
+            return None
+        entry.apply(model.on, model.colors)
+        changed = entry.changed_mask(model.shape)
+        model.mark_dirty(changed)
+        return changed
+
+    @staticmethod
+    def _values_at(state, index):
+        rows, cols = np.unravel_index(index, state[0].shape)
+        return state[0][rows, cols], state[1][rows, cols]
+
+    def _context_cost(self, older, newer):
+        if self.context_nbytes is None or older is None or newer is None:
+            return 0
+        return self.context_nbytes(older, newer)
+
+    def _push(self, snapshot, context=None):
+        if self._top is not None:
+            entry = self._encode(self._top, snapshot, keyframe=None)
+            context_bytes = self._context_cost(self._top_context, context)
+            self.undo_entries.append(entry)
+            self.undo_contexts.append((self._top_context, context_bytes))
+            self.nbytes += entry.nbytes + context_bytes - self._top[0].nbytes - self._top[1].nbytes
+        self._top = snapshot
+        self._top_context = context
+        self.nbytes += snapshot[0].nbytes + snapshot[1].nbytes
+        self._evict()
+
+    def _encode(self, state, newer, keyframe=None):
+        """Entry that rebuilds ``state`` from ``newer``.
+
+        ``keyframe=None`` lets the periodic keyframe interval decide.
+        """
+        full_size = state[0].nbytes + state[1].nbytes
+        if state[0].shape != newer[0].shape:
+            return Keyframe(*state)
+        if keyframe is None:
+            self._since_keyframe += 1
+            if self._since_keyframe >= self.keyframe_interval:
+                self._since_keyframe = 0
+                return Keyframe(*state)
+        diff = CellDiff.between(state, newer)
+        if diff.nbytes >= full_size:
+            return Keyframe(*state)
+        return diff
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and self.undo_entries:
+            self.nbytes -= self.undo_entries.pop(0).nbytes + self.undo_contexts.pop(0)[1]
+        while self.nbytes > self.max_bytes and len(self.redo_entries) > 1:
+            self.nbytes -= self.redo_entries.pop(0).nbytes + self.redo_contexts.pop(0)[1]
@@ -0,0 +1,102 @@
+"""Refresh simulation of a HUB75 panel: scan multiplexing and BCM bit planes.
+
+A HUB75 panel with 1/``scan`` scan lights one row address at a time; rows
+``r``, ``r + scan``, ... share address ``r % scan`` and are only on during
+its slot.  Within a slot each channel is shown with binary-code
+modulation: bit plane ``b`` of the ``color_depth``-bit value is displayed
+for ``2**b`` LSB times.  The next plane is shifted in while the current one
+is shown, which takes ``cols / clock_hz``; planes shorter than that still
+occupy a full shift time, stretching the refresh and dimming the panel.
+
+``Hub75Simulator`` splits a frame into bit planes and scan slots and
+integrates how long each LED is lit over one refresh (what the eye sees)
+or over a shorter camera exposure (the banding in photos and videos).
+"""
+import numpy as np
+
+SCANS = (2, 4, 8, 16, 32)
+
+# sRGB-ish display gamma used to show linear LED light on a monitor.
+DISPLAY_GAMMA = 2.2
+
+
+class Hub75Simulator:
+    """Timing of one panel configuration and the light it produces per LED.
+
+    ``refresh_hz`` is the refresh rate the driver aims for; ``refresh`` is
+    the one it gets once shift times are accounted for, and
+    ``efficiency`` the share of each refresh spent displaying rather than
+    waiting for a shift.
+    """
+
+    def __init__(self, cols=64, scan=16, color_depth=8, refresh_hz=240.0, clock_hz=20e6):
+        if scan not in SCANS:
+            raise ValueError(f"Unsupported scan: 1/{scan}")
+        if not 1 <= color_depth <= 8:
+            raise ValueError(f"Color depth must be 1-8 bits, got {color_depth}")
+        self.cols = cols
+        self.scan = scan
+        self.color_depth = color_depth
+        self.refresh_hz = refresh_hz
+        self.clock_hz = clock_hz
+
+        lsb = 1.0 / (refresh_hz * scan * ((1 << color_depth) - 1))
+        self.shift_time = cols / clock_hz
+        # Display time and slot length of each bit plane, LSB first.
+        self.plane_on = lsb * 2.0 ** np.arange(color_depth)
+        plane_slots = np.maximum(self.plane_on, self.shift_time)
+        row_time = plane_slots.sum()
+        self.frame_time = scan * row_time
+        self.refresh = 1.0 / self.frame_time
+        self.efficiency = self.plane_on.sum() / row_time
+        # Start of every (address, plane) slot within one refresh.
+        offsets = np.concatenate(([0.0], np.cumsum(plane_slots)[:-1]))
+        self.plane_start = np.arange(scan)[:, None] * row_time + offsets
+
+    def summary(self):
+        return (f"HUB75 1/{self.scan} scan, {self.color_depth}-bit: {self.refresh:.0f} Hz refresh, "
+                f"{self.efficiency:.0%} brightness")
+
+    def bit_planes(self, colors):
+        """``uint8[H, W, 3, color_depth]`` bits of each channel after truncation, LSB first."""
+        values = np.asarray(colors, dtype=np.uint8) >> (8 - self.color_depth)
+        return (values[..., None] >> np.arange(self.color_depth, dtype=np.uint8)) & 1
+
+    def overlap(self, start=0.0, exposure=None):
+        """Seconds each ``(address, plane)`` slot is lit during ``[start, start + exposure)``.
+
+        ``exposure`` defaults to one refresh.  Returns ``float[scan, color_depth]``.
+        """
+        period = self.frame_time
+        if exposure is None:
+            exposure = period
+        whole, rest = divmod(exposure, period)
+        lit = np.broadcast_to(whole * self.plane_on, self.plane_start.shape).copy()
+        begin = start % period
+        on_start = self.plane_start
+        on_end = on_start + self.plane_on
+        # The rest of the window may wrap into the next refresh.
+        for window_start in (begin, begin - period):
+            window_end = window_start + rest
+            lit += np.clip(np.minimum(on_end, window_end) - np.maximum(on_start, window_start), 0, None)
+        return lit
+
+    def lit_time(self, colors, start=0.0, exposure=None):
+        """Seconds each LED channel of ``uint8[H, W, 3]`` is lit during the window."""
+        planes = self.bit_planes(colors)
+        per_row = self.overlap(start, exposure)[np.arange(planes.shape[0]) % self.scan]
+        return np.einsum("hwcd,hd->hwc", planes, per_row)
+
+    def perceived(self, colors, start=0.0, exposure=None):
+        """Light of each LED channel relative to a static, full-on drive (0..1).
+
+        Averaged over one refresh this is what the eye sees; a short
+        ``exposure`` gives the rows a camera catches lit or dark.
+        """
+        window = self.frame_time if exposure is None else exposure
+        return np.minimum(self.lit_time(colors, start, exposure) * (self.scan / window), 1.0)
+
+    def display_colors(self, colors, start=0.0, exposure=None):
+        """``uint8[H, W, 3]`` colors that show the perceived light on a monitor."""
+        light = self.perceived(colors, start, exposure)
+        return np.rint(255 * light ** (1 / DISPLAY_GAMMA)).astype(np.uint8)
@@ -0,0 +1,254 @@
+import itertools
+import os
+import re
+
+import numpy as np
+from PIL import Image
+
+
+# Colors of the firmware palette, in index order (see palette.FIRMWARE_PALETTE).
+DEFAULT_PALETTE = (
+    (0, 0, 0),        # black
+    (255, 0, 0),      # red
+    (0, 128, 0),      # green
+    (0, 0, 255),      # blue
+    (255, 255, 0),    # yellow
+    (0, 255, 255),    # cyan
+    (255, 192, 203),  # pink
+    (255, 255, 255),  # white
+)
+
+RESAMPLE_FILTERS = {
+    "nearest": Image.Resampling.NEAREST,
+    "box": Image.Resampling.BOX,
+    "bilinear": Image.Resampling.BILINEAR,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".apng", ".webp")
+
+FIT_MODES = ("fit", "fill", "crop")
+
+DITHER_MODES = ("none", "ordered", "floyd-steinberg")
+
+# 4x4 Bayer matrix normalised to [-0.5, 0.5).
+_BAYER_4 = (np.array([[0, 8, 2, 10],
+                      [12, 4, 14, 6],
+                      [3, 11, 1, 9],
+                      [15, 7, 13, 5]], dtype=np.float32) + 0.5) / 16 - 0.5
+
+# Distance-matrix entries per block in ``nearest_palette_index``.
+_NEAREST_BLOCK = 1 << 22
+
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# ``frame_0012.png`` -> ("frame_", "0012", ".png")
+_NUMBERED = re.compile(r"(.*?)(\d+)(\.[^.]+)")
+
+
+def resize_to_grid(img, rows, cols, mode="fit", resample="nearest"):
+    """Scale ``img`` onto a ``rows`` x ``cols`` canvas.
+
+    ``fit`` letterboxes the whole image, ``fill`` stretches it and ``crop``
+    covers the grid and trims the overflow around the centre.  Returns an
+    RGBA ``uint8[rows, cols, 4]`` array; letterbox cells have alpha 0.
+    """
+    if mode not in FIT_MODES:
+        raise ValueError(f"Unknown fit mode: {mode}")
+    resample = RESAMPLE_FILTERS[resample]
+    # Let JPEG decoders downscale while decoding instead of after.
+    img.draft("RGB", (cols * 2, rows * 2))
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    src_w, src_h = img.size
+    if mode == "fill":
+        return np.asarray(img.resize((cols, rows), resample, reducing_gap=3.0).convert("RGBA"))
+    if mode == "fit":
+        scale = min(cols / src_w, rows / src_h)
+    else:
+        scale = max(cols / src_w, rows / src_h)
+    new_w = max(1, int(src_w * scale))
+    new_h = max(1, int(src_h * scale))
+    resized = np.asarray(img.resize((new_w, new_h), resample, reducing_gap=3.0).convert("RGBA"))
+    out = np.zeros((rows, cols, 4), dtype=np.uint8)
+    x_off = (cols - new_w) // 2
+    y_off = (rows - new_h) // 2
+    src_x, dst_x = max(0, -x_off), max(0, x_off)
+    src_y, dst_y = max(0, -y_off), max(0, y_off)
+    w = min(new_w - src_x, cols - dst_x)
+    h = min(new_h - src_y, rows - dst_y)
+    out[dst_y:dst_y + h, dst_x:dst_x + w] = resized[src_y:src_y + h, src_x:src_x + w]
+    return out
+
+
+def nearest_palette_index(rgb, palette=DEFAULT_PALETTE):
+    """Index of the closest palette color (squared RGB distance) for each pixel.
+
+    ``|x - p|²`` is ranked as ``|p|² - 2·x·p`` (``|x|²`` is the same for every
+    candidate): one matrix product per block of pixels, with blocks sized so
+    the distance matrix stays around 16 MB for any palette size.  For
+    channels in 0..255 every term is an integer below 2**24, so float32
+    arithmetic is exact and ties still resolve to the lowest index.
+    """
+    pal = np.asarray(palette, dtype=np.float32).reshape(-1, 3)
+    rgb = np.asarray(rgb)
+    points = rgb.reshape(-1, 3)
+    norms = np.einsum("ij,ij->i", pal, pal)
+    index = np.empty(len(points), dtype=np.intp)
+    block = max(1, _NEAREST_BLOCK // len(pal))
+    for start in range(0, len(points), block):
+        # Fractional inputs are truncated, as the integer search always did.
+        chunk = points[start:start + block].astype(np.int32).astype(np.float32)
+        index[start:start + block] = (norms - 2.0 * (chunk @ pal.T)).argmin(axis=1)
+    return index.reshape(rgb.shape[:-1])
+
+
+def ordered_dither(rgb, palette=DEFAULT_PALETTE, spread=64.0):
+    """Quantize to ``palette`` after adding a tiled 4x4 Bayer threshold."""
+    h, w = rgb.shape[:2]
+    bayer = np.tile(_BAYER_4, ((h + 3) // 4, (w + 3) // 4))[:h, :w, None]
+    noisy = np.clip(rgb.astype(np.float32) + bayer * spread, 0, 255)
+    return nearest_palette_index(noisy, palette)
+
+
+def floyd_steinberg_dither(rgb, palette=DEFAULT_PALETTE):
+    """Quantize to ``palette`` with Floyd-Steinberg error diffusion.
+
+    Error diffusion is sequential along a row, so each row is walked pixel
+    by pixel; every pixel's distances to the whole palette are one
+    matrix-vector product, and the error pushed into the next row is spread
+    with whole-row array operations.  This runs on the grid-sized image,
+    after scaling.
+    """
+    pal = np.asarray(palette, dtype=np.float64).reshape(-1, 3)
+    # ``|x - p|²`` ranked as ``|p|² - 2·x·p``, as in ``nearest_palette_index``.
+    pal2 = 2.0 * pal
+    norms = np.einsum("ij,ij->i", pal, pal)
+    work = rgb.astype(np.float32)
+    h, w = work.shape[:2]
+    index = np.zeros((h, w), dtype=np.intp)
+    for y in range(h):
+        row = work[y].astype(np.float64)
+        errors = np.empty((w, 3), dtype=np.float64)
+        carry = np.zeros(3)
+        for x in range(w):
+            value = row[x] + carry
+            best = int((norms - pal2 @ value).argmin())
+            index[y, x] = best
+            error = errors[x] = value - pal[best]
+            carry = error * (7 / 16)
+        if y + 1 < h:
+            below = np.zeros((w + 2, 3), dtype=np.float32)
+            err = errors.astype(np.float32)
+            below[0:w] += err * (3 / 16)
+            below[1:w + 1] += err * (5 / 16)
+            below[2:w + 2] += err * (1 / 16)
+            work[y + 1] += below[1:w + 1]
+    return index
+
+
+def image_to_grid(img, rows, cols, mode="fit", resample="nearest", dark_threshold=0,
+                  light_threshold=255, dither="none", palette=DEFAULT_PALETTE):
+    """Convert a PIL image to ``(on, colors)`` planes for a ``rows`` x ``cols`` grid.
+
+    Cells are off where the image is transparent or letterboxed, where the
+    luminance is at or below ``dark_threshold`` and where every channel is
+    at or above ``light_threshold`` (``None`` keeps light pixels).  With a
+    ``dither`` mode other than ``"none"`` colors are reduced to ``palette``
+    and cells that land on black are switched off as well.
+    """
+    if dither not in DITHER_MODES:
+        raise ValueError(f"Unknown dither mode: {dither}")
+    rgba = resize_to_grid(img, rows, cols, mode, resample)
+    rgb = rgba[..., :3]
+    on = rgba[..., 3] >= 128
+    on &= rgb.astype(np.float32) @ _LUMA > dark_threshold
+    if light_threshold is not None:
+        on &= ~np.all(rgb >= light_threshold, axis=-1)
+    if dither == "none":
+        colors = np.ascontiguousarray(rgb)
+    else:
+        if dither == "ordered":
+            index = ordered_dither(rgb, palette)
+        else:
+            index = floyd_steinberg_dither(rgb, palette)
+        colors = np.asarray(palette, dtype=np.uint8)[index]
+        on &= colors.any(axis=-1)
+    colors = np.where(on[..., None], colors, np.uint8(0))
+    return on, colors
+
+
+def load_image_grid(filename, rows, cols, **settings):
+    """Open ``filename`` and convert its first frame with ``image_to_grid``."""
+    with Image.open(filename) as img:
+        return image_to_grid(img, rows, cols, **settings)
+
+
+def is_animated(filename):
+    """Whether ``filename`` holds more than one frame (GIF, APNG, WebP)."""
+    with Image.open(filename) as img:
+        return getattr(img, "is_animated", False)
+
+
+def sequence_files(filename):
+    """The numbered image sequence ``filename`` belongs to, in numeric order.
+
+    ``frame_7.png`` picks up every ``frame_<digits>.png`` next to it; a name
+    without a trailing number is a sequence of one.
+    """
+    directory, name = os.path.split(filename)
+    match = _NUMBERED.fullmatch(name)
+    if not match:
+        return [filename]
+    prefix, _, suffix = match.groups()
+    pattern = re.compile(re.escape(prefix) + r"(\d+)" + re.escape(suffix), re.IGNORECASE)
+    numbered = []
+    for other in os.listdir(directory or "."):
+        other_match = pattern.fullmatch(other)
+        if other_match:
+            numbered.append((int(other_match.group(1)), other))
+    return [os.path.join(directory, other) for _, other in sorted(numbered)]
+
+
+def iter_image_frames(filename, sequence=True):
+    """Yield ``(image, duration_ms)`` for each frame, decoding one at a time.
+
+    Animated files are stepped through with ``seek``; a still image yields
+    its whole numbered sequence when ``sequence`` is true.  Each image is
+    only valid until the next one is requested, and ``duration_ms`` is
+    ``None`` where the file has no timing.
+    """
+    with Image.open(filename) as img:
+        if getattr(img, "is_animated", False):
+            for index in itertools.count():
+                try:
+                    img.seek(index)
+                except EOFError:
+                    return
+                yield img, img.info.get("duration")
+    for path in sequence_files(filename) if sequence else [filename]:
+        with Image.open(path) as img:
+            yield img, None
+
+
+def iter_image_grids(filename, rows, cols, sequence=True, dedupe=True, **settings):
+    """Yield ``(on, colors, duration_ms)`` for each frame, via ``image_to_grid``.
+
+    Frames are scaled and quantized as they are decoded, so only one
+    full-resolution frame is in memory at a time.  With ``dedupe`` a frame
+    identical to the one before it is dropped and its duration added to
+    the frame that is kept.
+    """
+    pending = None
+    for img, duration in iter_image_frames(filename, sequence):
+        on, colors = image_to_grid(img, rows, cols, **settings)
+        if pending is not None:
+            if dedupe and np.array_equal(on, pending[0]) and np.array_equal(colors, pending[1]):
+                if duration is not None:
+                    pending[2] = (pending[2] or 0) + duration
+                continue
+            yield tuple(pending)
+        pending = [on, colors, duration]
+    if pending is not None:
+        yield tuple(pending)
@@ -0,0 +1,274 @@
+"""Batch conversion from the command line, without Qt.
+
+    python led_cli.py image photos/ -o out/ --rows 32 --cols 64 --format Formatted
+    python led_cli.py text snippets/ -o out/ --color 255,0,0
+    python led_cli.py convert exports/ -o out/ --format Colored
+    python led_cli.py convert animation.txt -o out/ --format C --word-bits 16 --order column
+    python led_cli.py text tickers/ -o out/ --marquee left --speed 2 --format C --strip
+
+Every input file (directories are expanded to the files they contain) is
+written to ``<out>/<name>.txt``, ``<out>/<name>.bin`` for binary formats or
+``.h``/``.rs``/``.py`` for code.  All frames of a multi-frame input are
+converted; ``text --marquee`` writes every frame of the scrolling text, or
+with ``--strip`` the rendered strip and its offset table.  Files are
+converted in parallel with a process pool; ``--jobs 1`` runs everything
+in this process.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import binary_format
+import codegen
+from color_correction import ColorCorrection
+from exporter import EXPORT_MODES
+from grid_model import GridModel
+from imaging import DITHER_MODES, FIT_MODES, IMAGE_EXTENSIONS, RESAMPLE_FILTERS
+from led_core import CORRECTED_FORMATS, apply_import, image_frames, read_grid_frames, save_frames, text_to_grid
+from marquee import DIRECTIONS, Marquee, write_strip_code
+from palette import FIRMWARE_PALETTE, Palette
+
+TEXT_EXTENSIONS = (".txt",)
+
+
+def parse_rgb(value):
+    try:
+        rgb = tuple(int(part) for part in value.split(","))
+    except ValueError:
+        rgb = ()
+    if len(rgb) != 3 or not all(0 <= v <= 255 for v in rgb):
+        raise argparse.ArgumentTypeError(f"expected R,G,B with values 0-255, got {value!r}")
+    return rgb
+
+
+def parse_gains(value):
+    try:
+        gains = tuple(float(part) for part in value.split(","))
+    except ValueError:
+        gains = ()
+    if len(gains) != 3 or not all(0 <= v for v in gains):
+        raise argparse.ArgumentTypeError(f"expected R,G,B gains such as 1,0.8,0.7, got {value!r}")
+    return gains
+
+
+def collect_inputs(paths, extensions):
+    """Expand directories (non-recursively) to the files matching ``extensions``."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                full = os.path.join(path, name)
+                if os.path.isfile(full) and name.lower().endswith(extensions):
+                    files.append(full)
+        else:
+            files.append(path)
+    return files
+
+
+def load_frames(kind, src, options):
+    """Read one input file as a list of grids (several for multi-frame exports)."""
+    rows, cols = options["rows"], options["cols"]
+    if kind == "image":
+        # Every frame of an animated GIF/APNG/WebP; numbered files stay separate jobs.
+        return [model for model, _ in image_frames(src, rows, cols, sequence=False, **options["image"])]
+    if kind == "text":
+        with open(src, "r", encoding="utf-8") as f:
+            return [text_to_grid(f.read().rstrip("\n"), rows, cols, **options["text"])]
+    models = []
+    if src.lower().endswith(".bin"):
+        for on, colors in binary_format.load(src, options["palette"]):
+            model = GridModel.from_arrays(on, colors)
+            if rows or cols:
+                model.resize(rows or model.rows, cols or model.cols)
+            models.append(model)
+        return models
+    for parsed in read_grid_frames(src, palette=options["palette"]):
+        model = GridModel(rows or parsed.shape[0], cols or parsed.shape[1])
+        apply_import(model, parsed)
+        models.append(model)
+    return models
+
+
+def convert_marquee(src, dest, options):
+    """Scroll the text of ``src`` across the grid, rendering it only once."""
+    with open(src, "r", encoding="utf-8") as f:
+        text = f.read().rstrip("\n")
+    marquee = Marquee.from_text(text, options["rows"], options["cols"], options["marquee"], options["speed"],
+                                **options["text"])
+    code = dict(options["code"], name=options["code"]["name"] or os.path.splitext(os.path.basename(src))[0])
+    if options["strip"]:
+        with open(dest, "w") as f:
+            write_strip_code(f, marquee, options["format"], **code)
+        return
+    on, colors = marquee.stack()
+    end_row = options["end_row"] if options["end_row"] is not None else options["rows"] - 1
+    rows = slice(options["start_row"], end_row + 1)
+    save_frames(dest, on[:, rows], colors[:, rows], options["format"], options["palette"], options["correction"],
+                **code)
+
+
+def convert_file(kind, src, dest, options):
+    """Convert one input file; runs inside a worker process.
+
+    Every frame of a multi-frame input is written: binary files and code
+    get one array with a frame dimension, text exports one block per frame.
+    """
+    if options.get("marquee"):
+        convert_marquee(src, dest, options)
+        return
+    models = load_frames(kind, src, options)
+    end_row = options["end_row"] if options["end_row"] is not None else models[0].rows - 1
+    rows = slice(options["start_row"], end_row + 1)
+    code = dict(options["code"], name=options["code"]["name"] or os.path.splitext(os.path.basename(src))[0])
+    save_frames(dest, [model.on[rows] for model in models], [model.colors[rows] for model in models],
+                options["format"], options["palette"], options["correction"], **code)
+
+
+def _run_job(job):
+    kind, src, dest, options = job
+    try:
+        convert_file(kind, src, dest, options)
+    except Exception as e:
+        return src, e
+    return src, None
+
+
+def report(results):
+    failed = 0
+    for src, error in results:
+        if error is not None:
+            failed += 1
+            print(f"Error converting {src}: {error}", file=sys.stderr)
+    return failed
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Convert images, text and grid exports to LED grid export files.")
+    sub = parser.add_subparsers(dest="kind", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="input files or directories")
+    common.add_argument("-o", "--out", required=True, help="output directory")
+    common.add_argument("--format", choices=EXPORT_MODES + tuple(binary_format.FORMATS) + codegen.LANGUAGES,
+                        default="Formatted",
+                        help="text export mode, binary layout (.bin) or source language (.h/.rs/.py)")
+    common.add_argument("--start-row", type=int, default=0)
+    common.add_argument("--end-row", type=int, default=None, help="last exported row (inclusive)")
+    common.add_argument("--palette", type=Palette.load, default=FIRMWARE_PALETTE,
+                        help="palette file for Colored output and dithering (default: firmware colors)")
+    common.add_argument("--name", default=None, help="array name for code output (default: input file name)")
+    common.add_argument("--word-bits", type=int, choices=codegen.WORD_BITS, default=8, help="code output word size")
+    common.add_argument("--order", choices=codegen.ORDERS, default="row", help="code output: words per row or column")
+    common.add_argument("--bit-order", choices=codegen.BIT_ORDERS, default="msb",
+                        help="code output: first cell in the most or least significant bit")
+    common.add_argument("--no-progmem", dest="progmem", action="store_false", help="C output: plain const arrays")
+    common.add_argument("--gamma", type=float, default=None,
+                        help=f"bake this gamma into {'/'.join(CORRECTED_FORMATS)} colors (e.g. 2.2)")
+    common.add_argument("--brightness", type=float, default=None, help="bake a global brightness (0-1)")
+    common.add_argument("--white-balance", type=parse_gains, default=None, help="bake R,G,B channel gains (0-1)")
+    common.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes")
+
+    image = sub.add_parser("image", parents=[common], help="convert image files")
+    image.add_argument("--rows", type=int, default=32)
+    image.add_argument("--cols", type=int, default=64)
+    image.add_argument("--fit", choices=FIT_MODES, default="fit")
+    image.add_argument("--resample", choices=sorted(RESAMPLE_FILTERS), default="nearest")
+    image.add_argument("--dither", choices=DITHER_MODES, default="none")
+    image.add_argument("--dark-threshold", type=int, default=0)
+    image.add_argument("--light-threshold", type=int, default=255)
+
+    text = sub.add_parser("text", parents=[common], help="render text snippet files")
+    text.add_argument("--rows", type=int, default=32)
+    text.add_argument("--cols", type=int, default=64)
+    text.add_argument("--font", default="Arial", help="font family")
+    text.add_argument("--font-size", type=int, default=20)
+    text.add_argument("--bold", action="store_true")
+    text.add_argument("--italic", action="store_true")
+    text.add_argument("--resize-factor", type=float, default=1.0)
+    text.add_argument("--color", type=parse_rgb, default=(255, 0, 0), help="text color as R,G,B")
+    text.add_argument("--marquee", choices=DIRECTIONS, default=None,
+                      help="scroll the text in this direction and write every frame")
+    text.add_argument("--speed", type=int, default=1, help="marquee: cells moved per frame")
+    text.add_argument("--strip", action="store_true",
+                      help="marquee code output: the rendered strip plus a frame offset table")
+
+    convert = sub.add_parser("convert", parents=[common], help="re-export grid export files (text or .bin)")
+    convert.add_argument("--rows", type=int, default=None, help="grid rows (default: from the file)")
+    convert.add_argument("--cols", type=int, default=None, help="grid columns (default: from the file)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "strip", False) and not (args.marquee and args.format in codegen.LANGUAGES):
+        parser.error("--strip needs --marquee and a code --format (C, Rust or MicroPython)")
+    correction = None
+    if (args.gamma, args.brightness, args.white_balance) != (None, None, None):
+        correction = ColorCorrection(args.gamma or 1.0, 1.0 if args.brightness is None else args.brightness,
+                                     args.white_balance or (1.0, 1.0, 1.0))
+    options = {
+        "rows": args.rows,
+        "cols": args.cols,
+        "format": args.format,
+        "start_row": args.start_row,
+        "end_row": args.end_row,
+        "palette": args.palette,
+        "correction": correction,
+        "code": {
+            "name": args.name,
+            "word_bits": args.word_bits,
+            "order": args.order,
+            "bit_order": args.bit_order,
+            "progmem": args.progmem,
+        },
+    }
+    if args.kind == "image":
+        extensions = IMAGE_EXTENSIONS
+        options["image"] = {
+            "mode": args.fit,
+            "resample": args.resample,
+            "dither": args.dither,
+            "dark_threshold": args.dark_threshold,
+            "light_threshold": args.light_threshold,
+            "palette": args.palette,
+        }
+    elif args.kind == "text":
+        extensions = TEXT_EXTENSIONS
+        options["text"] = {
+            "bold": args.bold,
+            "italic": args.italic,
+            "font_family": args.font,
+            "resize_factor": args.resize_factor,
+            "text_color": args.color,
+            "font_size": args.font_size,
+        }
+        options["marquee"] = args.marquee
+        options["speed"] = args.speed
+        options["strip"] = args.strip
+    else:
+        extensions = TEXT_EXTENSIONS + (".bin",)
+
+    if args.format in binary_format.FORMATS:
+        extension = ".bin"
+    else:
+        extension = codegen.EXTENSIONS.get(args.format, ".txt")
+    os.makedirs(args.out, exist_ok=True)
+    jobs = []
+    for src in collect_inputs(args.inputs, extensions):
+        name = os.path.splitext(os.path.basename(src))[0] + extension
+        jobs.append((args.kind, src, os.path.join(args.out, name), options))
+
+    if args.jobs == 1 or len(jobs) <= 1:
+        failed = report(map(_run_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            chunksize = max(1, len(jobs) // (args.jobs * 4))
+            failed = report(pool.map(_run_job, jobs, chunksize=chunksize))
+    print(f"Converted {len(jobs) - failed} of {len(jobs)} files into {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Qt-free conversion core shared by the GUI and the command-line tool.
+
+Grids are ``GridModel`` instances.  Images and text are turned into grids,
+grids are written out in the Plain/Formatted/Colored text formats the
+firmware code pastes in (or as C/Rust/MicroPython array literals), and
+those files are parsed back.
+"""
+import io
+
+from PIL import Image
+
+import numpy as np
+
+import binary_format
+import codegen
+from exporter import write_export
+from grid_model import GridModel
+from grid_parser import DEFAULT_COLOR, parse_frames, parse_grid
+from imaging import image_to_grid as _image_planes, iter_image_grids
+from palette import FIRMWARE_PALETTE
+from text_render import render_text
+
+# Formats that store raw RGB, so a color correction can be baked into them.
+# Palette-indexed formats (Colored, pal3) keep the uncorrected colors.
+CORRECTED_FORMATS = ("Plain", "Formatted", "rgb565", "rgb888")
+
+
+def image_to_grid(source, rows=32, cols=64, **settings):
+    """Convert an image path or PIL image to a grid; ``settings`` go to ``imaging.image_to_grid``."""
+    if isinstance(source, Image.Image):
+        return GridModel.from_arrays(*_image_planes(source, rows, cols, **settings))
+    with Image.open(source) as img:
+        return GridModel.from_arrays(*_image_planes(img, rows, cols, **settings))
+
+
+def image_frames(filename, rows=32, cols=64, sequence=True, dedupe=True, **settings):
+    """Lazily yield ``(grid, duration_ms)`` for every frame of an animated image or sequence.
+
+    See ``imaging.iter_image_grids``; ``settings`` go to ``imaging.image_to_grid``.
+    """
+    for on, colors, duration in iter_image_grids(filename, rows, cols, sequence, dedupe, **settings):
+        yield GridModel.from_arrays(on, colors), duration
+
+
+def text_to_grid(text, rows=32, cols=64, **options):
+    """Render ``text`` to a grid; ``options`` go to ``text_render.render_text``."""
+    return GridModel.from_arrays(*render_text(text, rows, cols, **options))
+
+
+def bake_colors(colors, fmt, correction=None):
+    """``colors`` with ``correction`` applied if ``fmt`` stores raw RGB, else unchanged."""
+    if correction is None or fmt not in CORRECTED_FORMATS:
+        return colors
+    return correction.apply(colors)
+
+
+def write_grid(writer, model, mode="Formatted", start_row=0, end_row=None, header=True,
+               color_section=True, palette=FIRMWARE_PALETTE, correction=None):
+    """Stream rows ``start_row..end_row`` (inclusive) of ``model`` to ``writer``.
+
+    ``header`` adds the ``#export_format`` line and ``color_section`` the
+    ``#colors`` block that Plain and Formatted files carry.  A
+    ``ColorCorrection`` is baked into those colors; which cells are lit
+    does not change.
+    """
+    if end_row is None:
+        end_row = model.rows - 1
+    rows = slice(start_row, end_row + 1)
+    colors = model.colors[rows]
+    lit = model.on[rows] & colors.any(axis=-1)
+    write_export(writer, lit, bake_colors(colors, mode, correction), mode, header, color_section, palette)
+
+
+def export_grid(model, mode="Formatted", start_row=0, end_row=None, header=True, color_section=True,
+                palette=FIRMWARE_PALETTE, correction=None):
+    """Like ``write_grid`` but returns the export as a string."""
+    buffer = io.StringIO()
+    write_grid(buffer, model, mode, start_row, end_row, header, color_section, palette, correction)
+    return buffer.getvalue()
+
+
+def write_code(writer, model, language="C", start_row=0, end_row=None, **options):
+    """Stream rows ``start_row..end_row`` of ``model`` as source code; ``options`` go to ``codegen.write_code``."""
+    if end_row is None:
+        end_row = model.rows - 1
+    rows = slice(start_row, end_row + 1)
+    lit = model.on[rows] & model.colors[rows].any(axis=-1)
+    codegen.write_code(writer, lit, language, **options)
+
+
+def export_code(model, language="C", start_row=0, end_row=None, **options):
+    """Like ``write_code`` but returns the code as a string."""
+    buffer = io.StringIO()
+    write_code(buffer, model, language, start_row, end_row, **options)
+    return buffer.getvalue()
+
+
+def save_frames(filename, on, colors, fmt, palette=FIRMWARE_PALETTE, correction=None, **code_options):
+    """Write frames to ``filename`` as a text export, binary layout or source code.
+
+    ``on``/``colors`` are ``bool[F, H, W]``/``uint8[F, H, W, 3]`` stacks or
+    lists of per-frame planes.  Text exports write one headered block per
+    frame; binary files and code hold all frames in one array, so their
+    frames must share a size.  ``correction`` is baked in as by
+    ``bake_colors``; ``code_options`` go to ``codegen.write_code``.
+    """
+    if fmt in binary_format.FORMATS:
+        binary_format.save(filename, np.stack(on), bake_colors(np.stack(colors), fmt, correction), fmt, palette)
+        return
+    with open(filename, "w") as f:
+        if fmt in codegen.LANGUAGES:
+            lit = np.stack([frame_on & frame_colors.any(axis=-1) for frame_on, frame_colors in zip(on, colors)])
+            codegen.write_code(f, lit[0] if len(lit) == 1 else lit, fmt, **code_options)
+            return
+        for frame_on, frame_colors in zip(on, colors):
+            write_export(f, frame_on & frame_colors.any(axis=-1), bake_colors(frame_colors, fmt, correction),
+                         fmt, palette=palette)
+
+
+def read_grid_file(filename, default_rgb=DEFAULT_COLOR, palette=FIRMWARE_PALETTE):
+    """Parse the first frame of an export file."""
+    with open(filename, "r") as f:
+        return parse_grid(f.read(), default_rgb, palette)
+
+
+def read_grid_frames(filename, default_rgb=DEFAULT_COLOR, palette=FIRMWARE_PALETTE):
+    """Parse every frame of an export file."""
+    with open(filename, "r") as f:
+        return parse_frames(f.read(), default_rgb, palette)
+
+
+def apply_import(model, parsed, merge=False):
+    """Write ``parsed`` into the top-left of ``model``.
+
+    A plain import replaces every cell the file defines; ``merge=True``
+    is an ``or`` merge (see ``merge_grids``).  Returns the changed-cell mask.
+    """
+    if merge:
+        return merge_grids(model, [parsed])
+    h = min(parsed.shape[0], model.rows)
+    w = min(parsed.shape[1], model.cols)
+    mask = parsed.defined[:h, :w]
+    on = model.on.copy()
+    colors = model.colors.copy()
+    on[:h, :w][mask] = parsed.on[:h, :w][mask]
+    colors[:h, :w][mask] = parsed.colors[:h, :w][mask]
+    return model.assign(on, colors)
+
+
+def merge_grids(model, grids, mode="or"):
+    """Merge parsed grids into ``model`` in order with one of ``MERGE_MODES``.
+
+    The grid is written once however many grids are merged, so the whole
+    merge is a single change.  Returns the changed-cell mask.
+    """
+    return model.merge(((parsed.on, parsed.colors) for parsed in grids), mode)
@@ -1,14 +1,47 @@
 import sys
+import time
+from collections import OrderedDict
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QGridLayout, QPushButton,
-    QSizePolicy, QFileDialog, QMenu, QDialog, QFormLayout,
-    QSpinBox, QComboBox, QDialogButtonBox, QLabel, QFrame,
-    QColorDialog, QPlainTextEdit, QCheckBox, QDoubleSpinBox
+    QApplication, QMainWindow, QWidget, QPushButton,
+    QFileDialog, QMenu, QDialog, QFormLayout,
+    QSpinBox, QComboBox, QDialogButtonBox,
+    QColorDialog, QPlainTextEdit, QCheckBox, QDoubleSpinBox, QMessageBox, QLineEdit, QLabel, QStackedWidget
 )
-from PyQt6.QtGui import QAction, QPainter, QColor, QFont, QPalette
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QAction, QPainter, QColor, QFont, QPalette, QPixmap, QRegion
+from PyQt6.QtCore import Qt, QObject, QThread, QTimer, QPoint, QRect, QRectF, pyqtSignal, pyqtSlot
+
+from PIL import Image
+import numpy as np
+
+import binary_format
+from binary_format import FORMATS as BINARY_FORMATS
+from codegen import BIT_ORDERS, EXTENSIONS as CODE_EXTENSIONS, LANGUAGES, ORDERS, WORD_BITS
+from color_correction import ColorCorrection
+from effects import EFFECTS, FrameScheduler, record as record_effect
+from exporter import EXPORT_MODES
+from grid_model import BLACK, MERGE_MODES, RESIZE_ANCHORS, GridModel
+from grid_parser import ParseError
+from history import History
+from hub75 import SCANS, Hub75Simulator
+from imaging import (
+    DITHER_MODES, FIT_MODES, IMAGE_EXTENSIONS, RESAMPLE_FILTERS, is_animated, iter_image_grids, load_image_grid
+)
+from led_core import (
+    CORRECTED_FORMATS, apply_import, bake_colors, export_code, export_grid, merge_grids,
+    read_grid_file, read_grid_frames, save_frames, write_grid
+)
+from life import LifeEngine
+from marquee import DIRECTIONS as MARQUEE_DIRECTIONS, Marquee, write_strip_code
+from palette import FIRMWARE_PALETTE, Palette
+from receiver import PROTOCOLS, RECEIVE_TRANSPORTS, FrameReceiver
+from shared_frame import SharedFrameBuffer
+from streaming import DDP_PORT, TRANSPORTS, FrameStreamer, SerialTransport, UdpTransport
+from text_render import render_text
+from timeline import Timeline
 
-from PIL import Image, ImageDraw, ImageFont
+
+def qcolor_to_rgb(color):
+    return color.red(), color.green(), color.blue()
 
 
 class GridSizeDialog(QDialog):
@@ -27,18 +60,448 @@ class GridSizeDialog(QDialog):
         self.col_spin.setValue(current_cols)
         layout.addRow("Columns:", self.col_spin)
 
+        self.anchor_combo = QComboBox(self)
+        self.anchor_combo.addItems(list(RESIZE_ANCHORS))
+        layout.addRow("Keep Content At:", self.anchor_combo)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return self.row_spin.value(), self.col_spin.value(), self.anchor_combo.currentText()
+
+
+class GameOfLifeSettingsDialog(QDialog):
+    def __init__(self, rate, wrap, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Game of Life Settings")
+        layout = QFormLayout(self)
+
+        self.rate_spin = QSpinBox(self)
+        self.rate_spin.setRange(1, 60)
+        self.rate_spin.setSuffix(" Hz")
+        self.rate_spin.setValue(rate)
+        layout.addRow("Generation Rate:", self.rate_spin)
+
+        self.wrap_checkbox = QCheckBox("Wrap around edges (torus)", self)
+        self.wrap_checkbox.setChecked(wrap)
+        layout.addRow("Edges:", self.wrap_checkbox)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return self.rate_spin.value(), self.wrap_checkbox.isChecked()
+
+
+class ImageImportSettingsDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Image Import Settings")
+        layout = QFormLayout(self)
+
+        self.mode_combo = QComboBox(self)
+        self.mode_combo.addItems(list(FIT_MODES))
+        self.mode_combo.setCurrentText(settings["mode"])
+        layout.addRow("Scaling:", self.mode_combo)
+
+        self.resample_combo = QComboBox(self)
+        self.resample_combo.addItems(list(RESAMPLE_FILTERS))
+        self.resample_combo.setCurrentText(settings["resample"])
+        layout.addRow("Resampling Filter:", self.resample_combo)
+
+        self.dark_spin = QSpinBox(self)
+        self.dark_spin.setRange(0, 255)
+        self.dark_spin.setValue(settings["dark_threshold"])
+        layout.addRow("Off at or below brightness:", self.dark_spin)
+
+        self.light_checkbox = QCheckBox("Treat light pixels as off", self)
+        self.light_checkbox.setChecked(settings["light_threshold"] is not None)
+        layout.addRow("Light Background:", self.light_checkbox)
+
+        self.light_spin = QSpinBox(self)
+        self.light_spin.setRange(0, 255)
+        self.light_spin.setValue(255 if settings["light_threshold"] is None else settings["light_threshold"])
+        self.light_spin.setEnabled(self.light_checkbox.isChecked())
+        self.light_checkbox.toggled.connect(self.light_spin.setEnabled)
+        layout.addRow("Off at or above (all channels):", self.light_spin)
+
+        self.dither_combo = QComboBox(self)
+        self.dither_combo.addItems(list(DITHER_MODES))
+        self.dither_combo.setCurrentText(settings["dither"])
+        layout.addRow("Dither to Palette:", self.dither_combo)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return {
+            "mode": self.mode_combo.currentText(),
+            "resample": self.resample_combo.currentText(),
+            "dark_threshold": self.dark_spin.value(),
+            "light_threshold": self.light_spin.value() if self.light_checkbox.isChecked() else None,
+            "dither": self.dither_combo.currentText(),
+        }
+
+
+class ColorCorrectionDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Color Correction")
+        layout = QFormLayout(self)
+
+        self.gamma_spin = QDoubleSpinBox(self)
+        self.gamma_spin.setRange(0.1, 5.0)
+        self.gamma_spin.setSingleStep(0.1)
+        self.gamma_spin.setValue(settings["gamma"])
+        layout.addRow("Gamma:", self.gamma_spin)
+
+        self.brightness_spin = QSpinBox(self)
+        self.brightness_spin.setRange(0, 100)
+        self.brightness_spin.setSuffix(" %")
+        self.brightness_spin.setValue(round(settings["brightness"] * 100))
+        layout.addRow("Brightness:", self.brightness_spin)
+
+        self.gain_spins = []
+        for channel, gain in zip(("Red", "Green", "Blue"), settings["white_balance"]):
+            spin = QSpinBox(self)
+            spin.setRange(0, 100)
+            spin.setSuffix(" %")
+            spin.setValue(round(gain * 100))
+            layout.addRow(f"{channel} Gain:", spin)
+            self.gain_spins.append(spin)
+
+        self.preview_checkbox = QCheckBox("Show corrected colors in the grid", self)
+        self.preview_checkbox.setChecked(settings["preview"])
+        layout.addRow("Preview:", self.preview_checkbox)
+
+        self.bake_checkbox = QCheckBox(f"Bake into {', '.join(CORRECTED_FORMATS)} exports", self)
+        self.bake_checkbox.setChecked(settings["bake"])
+        layout.addRow("Export:", self.bake_checkbox)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return {
+            "gamma": self.gamma_spin.value(),
+            "brightness": self.brightness_spin.value() / 100,
+            "white_balance": tuple(spin.value() / 100 for spin in self.gain_spins),
+            "preview": self.preview_checkbox.isChecked(),
+            "bake": self.bake_checkbox.isChecked(),
+        }
+
+
+class Hub75SettingsDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("HUB75 Preview Settings")
+        layout = QFormLayout(self)
+
+        self.scan_combo = QComboBox(self)
+        for scan in SCANS:
+            self.scan_combo.addItem(f"1/{scan}", scan)
+        self.scan_combo.setCurrentIndex(SCANS.index(settings["scan"]))
+        layout.addRow("Scan:", self.scan_combo)
+
+        self.depth_spin = QSpinBox(self)
+        self.depth_spin.setRange(1, 8)
+        self.depth_spin.setSuffix(" bits")
+        self.depth_spin.setValue(settings["color_depth"])
+        layout.addRow("Color Depth:", self.depth_spin)
+
+        self.refresh_spin = QSpinBox(self)
+        self.refresh_spin.setRange(30, 10000)
+        self.refresh_spin.setSuffix(" Hz")
+        self.refresh_spin.setValue(settings["refresh_hz"])
+        layout.addRow("Target Refresh:", self.refresh_spin)
+
+        self.clock_spin = QDoubleSpinBox(self)
+        self.clock_spin.setRange(1.0, 50.0)
+        self.clock_spin.setSuffix(" MHz")
+        self.clock_spin.setValue(settings["clock_hz"] / 1e6)
+        layout.addRow("Shift Clock:", self.clock_spin)
+
+        self.exposure_spin = QDoubleSpinBox(self)
+        self.exposure_spin.setRange(0.0, 100.0)
+        self.exposure_spin.setDecimals(3)
+        self.exposure_spin.setSuffix(" ms")
+        self.exposure_spin.setSpecialValueText("Eye (whole refresh)")
+        self.exposure_spin.setValue(0.0 if settings["exposure"] is None else settings["exposure"] * 1000)
+        layout.addRow("Camera Exposure:", self.exposure_spin)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        exposure = self.exposure_spin.value()
+        return {
+            "scan": self.scan_combo.currentData(),
+            "color_depth": self.depth_spin.value(),
+            "refresh_hz": self.refresh_spin.value(),
+            "clock_hz": self.clock_spin.value() * 1e6,
+            "exposure": exposure / 1000 if exposure else None,
+        }
+
+
+class LiveOutputDialog(QDialog):
+    BAUD_RATES = (9600, 57600, 115200, 230400, 460800, 921600, 1000000, 2000000)
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Live Output Settings")
+        layout = QFormLayout(self)
+
+        self.transport_combo = QComboBox(self)
+        self.transport_combo.addItems(TRANSPORTS)
+        self.transport_combo.setCurrentText(settings["transport"])
+        layout.addRow("Transport:", self.transport_combo)
+
+        self.host_edit = QLineEdit(settings["host"], self)
+        layout.addRow("UDP Host:", self.host_edit)
+
+        self.port_spin = QSpinBox(self)
+        self.port_spin.setRange(1, 65535)
+        self.port_spin.setValue(settings["port"])
+        layout.addRow("UDP Port:", self.port_spin)
+
+        self.device_edit = QLineEdit(settings["device"], self)
+        layout.addRow("Serial Device:", self.device_edit)
+
+        self.baud_combo = QComboBox(self)
+        for baud in self.BAUD_RATES:
+            self.baud_combo.addItem(str(baud), baud)
+        self.baud_combo.setCurrentIndex(self.BAUD_RATES.index(settings["baud"]))
+        layout.addRow("Baud Rate:", self.baud_combo)
+
+        self.fps_spin = QSpinBox(self)
+        self.fps_spin.setRange(1, 240)
+        self.fps_spin.setSuffix(" fps")
+        self.fps_spin.setValue(settings["max_fps"])
+        layout.addRow("Max Frame Rate:", self.fps_spin)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return {
+            "transport": self.transport_combo.currentText(),
+            "host": self.host_edit.text().strip(),
+            "port": self.port_spin.value(),
+            "device": self.device_edit.text().strip(),
+            "baud": self.baud_combo.currentData(),
+            "max_fps": self.fps_spin.value(),
+        }
+
+
+class VirtualDisplayDialog(QDialog):
+    SOURCES = RECEIVE_TRANSPORTS + ("Shared Memory",)
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Virtual Display Settings")
+        layout = QFormLayout(self)
+
+        self.transport_combo = QComboBox(self)
+        self.transport_combo.addItems(self.SOURCES)
+        self.transport_combo.setCurrentText(settings["transport"])
+        layout.addRow("Listen On:", self.transport_combo)
+
+        self.protocol_combo = QComboBox(self)
+        self.protocol_combo.addItems(PROTOCOLS)
+        self.protocol_combo.setCurrentText(settings["protocol"])
+        layout.addRow("Protocol:", self.protocol_combo)
+
+        self.host_edit = QLineEdit(settings["host"], self)
+        layout.addRow("Host:", self.host_edit)
+
+        self.port_spin = QSpinBox(self)
+        self.port_spin.setRange(1, 65535)
+        self.port_spin.setValue(settings["port"])
+        layout.addRow("Port:", self.port_spin)
+
+        self.path_edit = QLineEdit(settings["path"], self)
+        layout.addRow("Unix Socket:", self.path_edit)
+
+        self.shm_edit = QLineEdit(settings["shm_path"], self)
+        layout.addRow("Shared Memory:", self.shm_edit)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return {
+            "transport": self.transport_combo.currentText(),
+            "protocol": self.protocol_combo.currentText(),
+            "host": self.host_edit.text().strip(),
+            "port": self.port_spin.value(),
+            "path": self.path_edit.text().strip(),
+            "shm_path": self.shm_edit.text().strip(),
+        }
+
+
+class MarqueeDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Marquee")
+        layout = QFormLayout(self)
+
+        self.text_edit = QLineEdit(settings["text"], self)
+        layout.addRow("Text:", self.text_edit)
+
+        self.direction_combo = QComboBox(self)
+        self.direction_combo.addItems(list(MARQUEE_DIRECTIONS))
+        self.direction_combo.setCurrentText(settings["direction"])
+        layout.addRow("Direction:", self.direction_combo)
+
+        self.speed_spin = QSpinBox(self)
+        self.speed_spin.setRange(1, 16)
+        self.speed_spin.setSuffix(" cells/frame")
+        self.speed_spin.setValue(settings["speed"])
+        layout.addRow("Speed:", self.speed_spin)
+
+        self.fps_spin = QSpinBox(self)
+        self.fps_spin.setRange(1, 120)
+        self.fps_spin.setSuffix(" fps")
+        self.fps_spin.setValue(settings["fps"])
+        layout.addRow("Frame Rate:", self.fps_spin)
+
+        self.font_combo = QComboBox(self)
+        self.font_combo.addItems(["Arial", "Times New Roman", "Courier New"])
+        self.font_combo.setCurrentText(settings["font_family"])
+        layout.addRow("Font Family:", self.font_combo)
+
+        self.font_size_spin = QSpinBox(self)
+        self.font_size_spin.setRange(1, 200)
+        self.font_size_spin.setValue(settings["font_size"])
+        layout.addRow("Font Size:", self.font_size_spin)
+
+        self.bold_checkbox = QCheckBox("Bold", self)
+        self.bold_checkbox.setChecked(settings["bold"])
+        layout.addRow("Bold:", self.bold_checkbox)
+
+        self.italic_checkbox = QCheckBox("Italic", self)
+        self.italic_checkbox.setChecked(settings["italic"])
+        layout.addRow("Italic:", self.italic_checkbox)
+
+        self.text_color = QColor(*settings["text_color"])
+        self.text_color_button = QPushButton("Select Text Color", self)
+        self.text_color_button.setStyleSheet("background-color: " + self.text_color.name())
+        self.text_color_button.clicked.connect(self.choose_color)
+        layout.addRow("Text Color:", self.text_color_button)
+
         button_box = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
 
+    def choose_color(self):
+        chosen = QColorDialog.getColor(self.text_color, self, "Select Text Color")
+        if chosen.isValid():
+            self.text_color = chosen
+            self.text_color_button.setStyleSheet("background-color: " + self.text_color.name())
+
     def getValues(self):
-        return self.row_spin.value(), self.col_spin.value()
+        return {
+            "text": self.text_edit.text(),
+            "direction": self.direction_combo.currentText(),
+            "speed": self.speed_spin.value(),
+            "fps": self.fps_spin.value(),
+            "font_family": self.font_combo.currentText(),
+            "font_size": self.font_size_spin.value(),
+            "bold": self.bold_checkbox.isChecked(),
+            "italic": self.italic_checkbox.isChecked(),
+            "text_color": qcolor_to_rgb(self.text_color),
+        }
+
+
+class EffectsDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Effect Settings")
+        layout = QFormLayout(self)
+
+        self.effect_combo = QComboBox(self)
+        self.effect_combo.addItems(list(EFFECTS))
+        layout.addRow("Effect:", self.effect_combo)
+
+        # One page of parameter spin boxes per effect, built from its PARAMETERS table.
+        self.pages = QStackedWidget(self)
+        self.param_spins = {}
+        for name, effect in EFFECTS.items():
+            page = QWidget(self.pages)
+            form = QFormLayout(page)
+            form.setContentsMargins(0, 0, 0, 0)
+            spins = self.param_spins[name] = {}
+            for param, (default, low, high) in effect.PARAMETERS.items():
+                spin = QSpinBox(page) if isinstance(default, int) else QDoubleSpinBox(page)
+                spin.setRange(low, high)
+                spin.setValue(settings["params"].get(name, {}).get(param, default))
+                form.addRow(param.capitalize() + ":", spin)
+                spins[param] = spin
+            self.pages.addWidget(page)
+        self.effect_combo.currentIndexChanged.connect(self.pages.setCurrentIndex)
+        self.effect_combo.setCurrentText(settings["effect"])
+        self.pages.setCurrentIndex(self.effect_combo.currentIndex())
+        layout.addRow(self.pages)
+
+        self.fps_spin = QSpinBox(self)
+        self.fps_spin.setRange(1, 240)
+        self.fps_spin.setSuffix(" fps")
+        self.fps_spin.setValue(settings["fps"])
+        layout.addRow("Target Frame Rate:", self.fps_spin)
+
+        self.adaptive_checkbox = QCheckBox("Lower detail when a frame is over budget", self)
+        self.adaptive_checkbox.setChecked(settings["adaptive"])
+        layout.addRow("Adaptive:", self.adaptive_checkbox)
+
+        self.seconds_spin = QDoubleSpinBox(self)
+        self.seconds_spin.setRange(0.1, 60.0)
+        self.seconds_spin.setSuffix(" s")
+        self.seconds_spin.setValue(settings["seconds"])
+        layout.addRow("Record Length:", self.seconds_spin)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return {
+            "effect": self.effect_combo.currentText(),
+            "params": {name: {param: spin.value() for param, spin in spins.items()}
+                       for name, spins in self.param_spins.items()},
+            "fps": self.fps_spin.value(),
+            "adaptive": self.adaptive_checkbox.isChecked(),
+            "seconds": self.seconds_spin.value(),
+        }
 
 
 class ExportSettingsDialog(QDialog):
-    def __init__(self, max_rows, parent=None):
+    def __init__(self, max_rows, parent=None, formats=EXPORT_MODES, default_format="Formatted"):
         super().__init__(parent)
         self.setWindowTitle("Export Settings")
         layout = QFormLayout(self)
@@ -54,8 +517,8 @@ class ExportSettingsDialog(QDialog):
         layout.addRow("End Row:", self.end_spin)
 
         self.format_combo = QComboBox(self)
-        self.format_combo.addItems(["Plain", "Formatted", "Colored"])
-        index = self.format_combo.findText("Formatted")
+        self.format_combo.addItems(list(formats))
+        index = self.format_combo.findText(default_format)
         if index >= 0:
             self.format_combo.setCurrentIndex(index)
         layout.addRow("Export Format:", self.format_combo)
@@ -72,118 +535,532 @@ class ExportSettingsDialog(QDialog):
                 self.format_combo.currentText())
 
 
-class RowLabel(QLabel):
-    def __init__(self, text, row_index, main_window, parent=None):
-        super().__init__(text, parent)
-        self.row_index = row_index
-        self.main_window = main_window
-        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.setFixedWidth(20)
-        self.setStyleSheet("")
+class AnimationSettingsDialog(QDialog):
+    def __init__(self, fps, duration, loop, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Animation Settings")
+        layout = QFormLayout(self)
 
-    def mousePressEvent(self, event):
-        if self.row_index in self.main_window.selected_rows:
-            self.main_window.selected_rows = []
-            self.main_window.last_selected_row = None
-            self.main_window.update_row_label_styles()
-        else:
-            if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
-                self.main_window.select_row(self.row_index, shift=True)
-            else:
-                self.main_window.select_row(self.row_index, shift=False)
-        super().mousePressEvent(event)
+        self.fps_spin = QSpinBox(self)
+        self.fps_spin.setRange(1, 120)
+        self.fps_spin.setSuffix(" fps")
+        self.fps_spin.setValue(fps)
+        layout.addRow("Playback Rate:", self.fps_spin)
 
+        self.duration_spin = QSpinBox(self)
+        self.duration_spin.setRange(1, 60000)
+        self.duration_spin.setSuffix(" ms")
+        self.duration_spin.setValue(duration)
+        layout.addRow("Current Frame Duration:", self.duration_spin)
 
-class ColumnLabel(QLabel):
-    def __init__(self, text, col_index, main_window, parent=None):
-        super().__init__(text, parent)
-        self.col_index = col_index
-        self.main_window = main_window
-        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.setStyleSheet("border: 1px solid gray;")
-        self.setFixedHeight(20)
+        self.all_checkbox = QCheckBox("Use this duration for every frame", self)
+        layout.addRow("", self.all_checkbox)
 
-    def mousePressEvent(self, event):
-        if self.col_index in self.main_window.selected_columns:
-            self.main_window.selected_columns = []
-            self.main_window.last_selected_column = None
-            self.main_window.update_column_label_styles()
+        self.loop_checkbox = QCheckBox("Loop playback", self)
+        self.loop_checkbox.setChecked(loop)
+        layout.addRow("Playback:", self.loop_checkbox)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return (self.fps_spin.value(), self.duration_spin.value(),
+                self.all_checkbox.isChecked(), self.loop_checkbox.isChecked())
+
+
+class MergeModeDialog(QDialog):
+    LABELS = {
+        "or": "OR (imported cells overwrite)",
+        "and": "AND (keep cells lit in both)",
+        "xor": "XOR (lit in exactly one)",
+        "subtract": "Subtract (turn imported cells off)",
+        "under": "Only where empty",
+    }
+
+    def __init__(self, mode, file_count, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Merge Import")
+        layout = QFormLayout(self)
+
+        self.mode_combo = QComboBox(self)
+        for name in MERGE_MODES:
+            self.mode_combo.addItem(self.LABELS[name], name)
+        self.mode_combo.setCurrentIndex(MERGE_MODES.index(mode))
+        layout.addRow(f"Merge {file_count} file(s):", self.mode_combo)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        return self.mode_combo.currentData()
+
+
+class CodeExportSettingsDialog(QDialog):
+    def __init__(self, max_rows, settings, parent=None, title="Copy as Code", row_range=True):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        layout = QFormLayout(self)
+
+        self.start_spin = QSpinBox(self)
+        self.start_spin.setRange(0, max_rows - 1)
+        self.start_spin.setValue(0)
+        self.end_spin = QSpinBox(self)
+        self.end_spin.setRange(0, max_rows - 1)
+        self.end_spin.setValue(max_rows - 1)
+        if row_range:
+            layout.addRow("Start Row:", self.start_spin)
+            layout.addRow("End Row:", self.end_spin)
         else:
-            if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
-                self.main_window.select_column(self.col_index, shift=True)
-            else:
-                self.main_window.select_column(self.col_index, shift=False)
-        super().mousePressEvent(event)
+            self.start_spin.hide()
+            self.end_spin.hide()
+
+        self.language_combo = QComboBox(self)
+        self.language_combo.addItems(list(LANGUAGES))
+        self.language_combo.setCurrentText(settings["language"])
+        layout.addRow("Language:", self.language_combo)
+
+        self.name_edit = QLineEdit(settings["name"], self)
+        layout.addRow("Array Name:", self.name_edit)
+
+        self.word_combo = QComboBox(self)
+        self.word_combo.addItems([str(bits) for bits in WORD_BITS])
+        self.word_combo.setCurrentText(str(settings["word_bits"]))
+        layout.addRow("Word Size (bits):", self.word_combo)
+
+        self.order_combo = QComboBox(self)
+        self.order_combo.addItems(list(ORDERS))
+        self.order_combo.setCurrentText(settings["order"])
+        layout.addRow("Order (row/column-major):", self.order_combo)
+
+        self.bit_order_combo = QComboBox(self)
+        self.bit_order_combo.addItems(list(BIT_ORDERS))
+        self.bit_order_combo.setCurrentText(settings["bit_order"])
+        layout.addRow("First Cell In:", self.bit_order_combo)
+
+        self.progmem_checkbox = QCheckBox("Place C arrays in PROGMEM", self)
+        self.progmem_checkbox.setChecked(settings["progmem"])
+        layout.addRow("Flash Storage:", self.progmem_checkbox)
 
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def getValues(self):
+        settings = {
+            "language": self.language_combo.currentText(),
+            "name": self.name_edit.text().strip() or "grid",
+            "word_bits": int(self.word_combo.currentText()),
+            "order": self.order_combo.currentText(),
+            "bit_order": self.bit_order_combo.currentText(),
+            "progmem": self.progmem_checkbox.isChecked(),
+        }
+        return self.start_spin.value(), self.end_spin.value(), settings
+
+
+class LedSpriteCache:
+    """LRU cache of pre-rendered antialiased LED pixmaps.
+
+    Sprites are keyed by ``(rgb, cell_size, theme)`` where ``theme`` is the
+    background color the LED is composited on, so painting a cell is a
+    single opaque blit. ``hits``/``misses`` count lookups since the last
+    ``reset_stats()``.
+    """
+
+    def __init__(self, max_entries=1024, margin=2):
+        self.max_entries = max_entries
+        self.margin = margin
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, rgb, cell_size, theme, device_pixel_ratio=1.0):
+        key = (rgb, cell_size, theme, device_pixel_ratio)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = self.render(rgb, cell_size, theme, device_pixel_ratio)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_entries:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def tile(self, rgb, cell_size, group_size, gap, theme, device_pixel_ratio=1.0):
+        """Pixmap of one LED group (``group_size`` LEDs plus a ``gap`` column) for tiling."""
+        key = ("tile", rgb, cell_size, group_size, gap, theme, device_pixel_ratio)
+        tile = self.sprites.get(key)
+        if tile is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return tile
+        self.misses += 1
+        sprite = self.render(rgb, cell_size, theme, device_pixel_ratio)
+        width = group_size * cell_size + gap
+        tile = QPixmap(max(1, round(width * device_pixel_ratio)), sprite.height())
+        tile.setDevicePixelRatio(device_pixel_ratio)
+        tile.fill(QColor(*theme))
+        painter = QPainter(tile)
+        for i in range(group_size):
+            painter.drawPixmap(i * cell_size, 0, sprite)
+        painter.end()
+        self.sprites[key] = tile
+        if len(self.sprites) > self.max_entries:
+            self.sprites.popitem(last=False)
+        return tile
+
+    def render(self, rgb, cell_size, theme, device_pixel_ratio):
+        side = max(1, round(cell_size * device_pixel_ratio))
+        pixmap = QPixmap(side, side)
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        pixmap.fill(QColor(*theme))
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(*rgb))
+        diameter = cell_size - 2 * self.margin
+        painter.drawEllipse(QRectF(self.margin, self.margin, diameter, diameter))
+        painter.end()
+        return pixmap
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.sprites.clear()
+
+
+class LedCanvas(QWidget):
+    """Single widget that paints every LED, the group separators and the headers.
 
-class CircleButton(QPushButton):
-    def __init__(self, size=15, default_color=QColor("green"), on_toggle=None, main_window=None, parent=None):
+    Cell state is read from ``main_window.model``; clicks are mapped back to
+    cell or header coordinates and forwarded to the main window.
+    """
+
+    def __init__(self, main_window, cell_size=15, group_size=8, sprite_cache=None, parent=None):
         super().__init__(parent)
-        self.setFixedSize(size, size)
-        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        self.colored = False
-        self.cell_color = None
-        self.default_color = default_color
-        self.on_toggle = on_toggle
         self.main_window = main_window
-        self.setStyleSheet("border: none;")
+        self.sprite_cache = sprite_cache if sprite_cache is not None else LedSpriteCache()
+        self.cell_size = cell_size
+        self.group_size = group_size
+        self.header_width = 20
+        self.header_height = 20
+        self.separator_width = 1
+        self.rows = 0
+        self.cols = 0
+        self.frame_interval = 16  # ms; dirty cells are flushed at most once per frame.
+        self.pending = None
+        self.last_flush = 0.0
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.set_grid_size(main_window.num_rows, main_window.num_cols)
+
+    def set_grid_size(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.pending = None
+        self.setFixedSize(self.col_x(cols - 1) + self.cell_size, self.row_y(rows - 1) + self.cell_size)
+        self.update()
 
-    def mousePressEvent(self, event):
-        if self.main_window.uncolor_mode:
-            target_color = self.cell_color if (self.colored and self.cell_color is not None) else QColor("black")
-            self.main_window.record_undo()
-            self.main_window.uncolor_all_cells_with_color(target_color)
-            self.main_window.uncolor_mode = False
+    def col_x(self, c):
+        return self.header_width + c * self.cell_size + (c // self.group_size) * self.separator_width
+
+    def row_y(self, r):
+        return self.header_height + r * self.cell_size
+
+    def cells_rect(self):
+        return QRect(self.header_width, self.header_height,
+                     self.col_x(self.cols - 1) + self.cell_size - self.header_width, self.rows * self.cell_size)
+
+    def cell_rect(self, r, c):
+        return QRect(self.col_x(c), self.row_y(r), self.cell_size, self.cell_size)
+
+    def col_at(self, x):
+        x -= self.header_width
+        if x < 0:
+            return None
+        group_width = self.group_size * self.cell_size + self.separator_width
+        group, offset = divmod(x, group_width)
+        if offset >= self.group_size * self.cell_size:
+            return None
+        c = group * self.group_size + offset // self.cell_size
+        return c if c < self.cols else None
+
+    def row_at(self, y):
+        y -= self.header_height
+        if y < 0:
+            return None
+        r = y // self.cell_size
+        return r if r < self.rows else None
+
+    def visible_range(self, rect):
+        """Return the row/column index ranges that intersect ``rect``."""
+        r0 = max(0, (rect.top() - self.header_height) // self.cell_size)
+        r1 = min(self.rows, (rect.bottom() - self.header_height) // self.cell_size + 1)
+        group_width = self.group_size * self.cell_size + self.separator_width
+        left = max(0, rect.left() - self.header_width)
+        right = max(0, rect.right() - self.header_width)
+        c0 = max(0, (left // group_width) * self.group_size + (left % group_width) // self.cell_size)
+        c1 = min(self.cols, (right // group_width) * self.group_size
+                 + min(self.group_size, (right % group_width) // self.cell_size + 1))
+        return range(r0, r1), range(c0, c1)
+
+    def update_cells(self, mask=None):
+        """Queue the cells in ``mask`` (all cells if None) for the next frame's repaint.
+
+        Masks from several operations are OR-ed together and flushed as one
+        region so a burst of edits costs a single paint.
+        """
+        if mask is None:
+            mask = np.ones((self.rows, self.cols), dtype=bool)
+        if self.pending is None or self.pending.shape != mask.shape:
+            self.pending = mask.copy()
+        else:
+            self.pending |= mask
+        if not self.flush_timer.isActive():
+            elapsed = (time.perf_counter() - self.last_flush) * 1000
+            self.flush_timer.start(max(0, int(self.frame_interval - elapsed)))
+
+    def flush(self):
+        mask, self.pending = self.pending, None
+        self.last_flush = time.perf_counter()
+        if mask is None or mask.shape != (self.rows, self.cols):
+            if mask is not None:
+                self.update()
             return
-
-        if self.main_window.eyedrop_mode:
-            self.main_window.record_undo()
-            sample_color = self.cell_color if (self.colored and self.cell_color is not None) else QColor("black")
-            self.main_window.paint_color = sample_color
-            self.main_window.picked_color = sample_color
-            self.main_window.paint_mode = True
-            self.main_window.eyedrop_mode = False
+        rows = np.flatnonzero(mask.any(axis=1))
+        if rows.size == 0:
             return
-
-        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
-            chosen_color = QColorDialog.getColor(self.default_color, self, "Select Color for This Cell")
-            if chosen_color.isValid():
-                self.main_window.record_undo()
-                self.colored = True
-                self.cell_color = chosen_color
+        if rows.size == self.rows and mask.all():
             self.update()
             return
-        else:
-            if self.on_toggle:
-                self.on_toggle()
-            self.toggle_color()
-            super().mousePressEvent(event)
-
-    def toggle_color(self):
-        if not self.colored:
-            self.colored = True
-            self.cell_color = self.main_window.paint_color
-        else:
-            self.colored = False
-            self.cell_color = None
-        self.update()
+        first = mask[rows].argmax(axis=1)
+        last = self.cols - 1 - mask[rows, ::-1].argmax(axis=1)
+        region = QRegion()
+        for r, c0, c1 in zip(rows.tolist(), first.tolist(), last.tolist()):
+            region += self.cell_rect(r, c0).united(self.cell_rect(r, c1))
+        self.update(region)
+
+    def update_headers(self):
+        self.update(QRect(0, 0, self.width(), self.header_height))
+        self.update(QRect(0, 0, self.header_width, self.height()))
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        margin = 2
-        diameter = min(self.width(), self.height()) - 2 * margin
-        color = self.cell_color if (self.colored and self.cell_color is not None) else QColor("black")
-        painter.setBrush(color)
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawEllipse(margin, margin, diameter, diameter)
+        rect = event.rect()
+        background = self.palette().color(QPalette.ColorRole.Window)
+        painter.fillRect(rect, background)
+        self.paint_headers(painter, rect)
+
+        rows, cols = self.visible_range(rect)
+        if rows and cols:
+            model = self.main_window.model
+            theme = qcolor_to_rgb(background)
+            dpr = self.devicePixelRatioF()
+            size = self.cell_size
+            # Off LEDs are tiled a whole group at a time; only lit cells are blitted one by one.
+            cells = self.cells_rect().intersected(rect)
+            tile_width = self.group_size * size + self.separator_width
+            tile = self.sprite_cache.tile(BLACK, size, self.group_size, self.separator_width, theme, dpr)
+            offset = QPoint((cells.left() - self.header_width) % tile_width, (cells.top() - self.header_height) % size)
+            painter.drawTiledPixmap(cells, tile, offset)
+
+            sub = (slice(rows.start, rows.stop), slice(cols.start, cols.stop))
+            lit_r, lit_c = np.nonzero(model.on[sub])
+            if lit_r.size:
+                colors = self.main_window.display_colors()[sub][lit_r, lit_c].tolist()
+                lit_c += cols.start
+                xs = (self.header_width + lit_c * size + (lit_c // self.group_size) * self.separator_width).tolist()
+                ys = (self.header_height + (lit_r + rows.start) * size).tolist()
+                sprite = self.sprite_cache.get
+                for x, y, rgb in zip(xs, ys, colors):
+                    painter.drawPixmap(x, y, sprite(tuple(rgb), size, theme, dpr))
+
+        separator = QColor("#cccccc")
+        top = self.header_height
+        for g in range(1, (self.cols - 1) // self.group_size + 1):
+            x = self.col_x(g * self.group_size) - self.separator_width
+            if rect.left() <= x <= rect.right():
+                painter.fillRect(x, top, self.separator_width, self.rows * self.cell_size, separator)
+
+    def paint_headers(self, painter, rect):
+        selected = QColor("lightblue")
+        border = QColor("gray")
+        text_color = self.palette().color(QPalette.ColorRole.WindowText)
+        align = Qt.AlignmentFlag.AlignCenter
+        if rect.top() < self.header_height:
+            selected_columns = set(self.main_window.selected_columns)
+            _, cols = self.visible_range(QRect(rect.left(), self.header_height, rect.width(), 1))
+            for c in cols:
+                cell = QRect(self.col_x(c), 0, self.cell_size, self.header_height)
+                if c in selected_columns:
+                    painter.fillRect(cell, selected)
+                painter.setPen(border)
+                painter.drawRect(cell.adjusted(0, 0, -1, -1))
+                painter.setPen(text_color)
+                painter.drawText(cell, align, str(c % self.group_size))
+        if rect.left() < self.header_width:
+            selected_rows = set(self.main_window.selected_rows)
+            rows, _ = self.visible_range(QRect(self.header_width, rect.top(), 1, rect.height()))
+            painter.setPen(text_color)
+            for r in rows:
+                cell = QRect(0, self.row_y(r), self.header_width, self.cell_size)
+                if r in selected_rows:
+                    painter.fillRect(cell, selected)
+                painter.drawText(cell, align, str(r))
+
+    def mousePressEvent(self, event):
+        pos = event.position().toPoint()
+        row = self.row_at(pos.y())
+        col = self.col_at(pos.x())
+        shift = bool(event.modifiers() & Qt.KeyboardModifier.ShiftModifier)
+        if pos.y() < self.header_height:
+            if col is not None:
+                self.main_window.column_header_clicked(col, shift)
+        elif pos.x() < self.header_width:
+            if row is not None:
+                self.main_window.row_header_clicked(row, shift)
+        elif row is not None and col is not None:
+            self.main_window.cell_clicked(row, col, event.modifiers())
+
+
+class TextRenderWorker(QObject):
+    """Renders text overlays off the GUI thread.
+
+    Only the newest request is rendered: requests older than ``latest`` are
+    dropped before rendering and their results are never emitted.
+    """
+
+    rendered = pyqtSignal(int, object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.latest = 0
+
+    @pyqtSlot(int, object)
+    def render(self, request_id, params):
+        if request_id != self.latest:
+            return
+        on, colors = render_text(**params)
+        if request_id == self.latest:
+            self.rendered.emit(request_id, on, colors)
+
+
+class ImageFramesWorker(QObject):
+    """Decodes animated images and image sequences off the GUI thread.
+
+    Frames are converted one at a time and sent in batches about every
+    ``batch_interval`` seconds.  Bumping ``latest`` cancels the current
+    request at its next frame.
+    """
+
+    frames_loaded = pyqtSignal(int, object)
+    finished = pyqtSignal(int)
+    failed = pyqtSignal(int, str)
+
+    batch_interval = 0.1
+
+    def __init__(self):
+        super().__init__()
+        self.latest = 0
+
+    @pyqtSlot(int, str, object)
+    def load(self, request_id, filename, params):
+        batch = []
+        sent = time.monotonic()
+        try:
+            for frame in iter_image_grids(filename, **params):
+                if request_id != self.latest:
+                    return
+                batch.append(frame)
+                if time.monotonic() - sent >= self.batch_interval:
+                    self.frames_loaded.emit(request_id, batch)
+                    batch = []
+                    sent = time.monotonic()
+        except Exception as e:
+            self.failed.emit(request_id, str(e))
+            return
+        if request_id == self.latest:
+            self.frames_loaded.emit(request_id, batch)
+            self.finished.emit(request_id)
+
+
+class EffectWorker(QObject):
+    """Runs an effect under a ``FrameScheduler`` off the GUI thread.
+
+    A frame is only sent once the GUI has taken the previous one
+    (``shown``), so a busy GUI never builds up a queue of stale frames.
+    Bumping ``latest`` stops the current run; an effect that fails to start
+    or render ends it with ``failed``.
+    """
+
+    frame_ready = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self):
+        super().__init__()
+        self.latest = 0
+        self.shown = True
+        self.scheduler = None
+
+    @pyqtSlot(int, object)
+    def run(self, request_id, params):
+        def emit(colors):
+            if self.shown:
+                self.shown = False
+                self.frame_ready.emit(request_id, colors)
+
+        try:
+            effect = EFFECTS[params["effect"]](params["rows"], params["cols"], **params["values"])
+            self.scheduler = FrameScheduler(effect, params["fps"], params["adaptive"])
+            self.scheduler.run(emit, lambda: request_id == self.latest)
+        except Exception as e:
+            self.failed.emit(request_id, str(e))
 
 
 class TextOverlayDialog(QDialog):
+    render_requested = pyqtSignal(int, object)
+
     def __init__(self, main_window, parent=None):
         super().__init__(parent)
         self.main_window = main_window
         self.setWindowTitle("Text Overlay Settings")
+        # The preview edits the grid directly; this is what Cancel restores and
+        # what the single undo entry recorded on OK goes back to.
+        self.original_state = main_window.model.snapshot()
+        self.request_id = 0
+
+        self.worker_thread = QThread(self)
+        self.worker = TextRenderWorker()
+        self.worker.moveToThread(self.worker_thread)
+        self.render_requested.connect(self.worker.render)
+        self.worker.rendered.connect(self.show_preview)
+        self.worker_thread.start()
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(120)
+        self.debounce_timer.timeout.connect(self.request_render)
 
         layout = QFormLayout(self)
 
@@ -241,15 +1118,53 @@ class TextOverlayDialog(QDialog):
             self.update_overlay()
 
     def update_overlay(self):
-        self.main_window.apply_text_overlay(
-            self.text_edit.toPlainText(),
-            self.bold_checkbox.isChecked(),
-            self.italic_checkbox.isChecked(),
-            self.font_combo.currentText(),
-            self.resize_spin.value(),
-            self.text_color,
-            self.font_size_spin.value()
-        )
+        self.debounce_timer.start()
+
+    def render_params(self):
+        return {
+            "text": self.text_edit.toPlainText(),
+            "rows": self.main_window.num_rows,
+            "cols": self.main_window.num_cols,
+            "bold": self.bold_checkbox.isChecked(),
+            "italic": self.italic_checkbox.isChecked(),
+            "font_family": self.font_combo.currentText(),
+            "resize_factor": self.resize_spin.value(),
+            "text_color": qcolor_to_rgb(self.text_color),
+            "font_size": self.font_size_spin.value(),
+        }
+
+    def request_render(self):
+        self.request_id += 1
+        self.worker.latest = self.request_id
+        self.render_requested.emit(self.request_id, self.render_params())
+
+    def show_preview(self, request_id, on, colors):
+        if request_id != self.request_id:
+            return
+        self.main_window.model.assign(on, colors)
+        self.main_window.refresh_cells()
+
+    def accept(self):
+        self.stop_worker()
+        on, colors = render_text(**self.render_params())
+        model = self.main_window.model
+        model.assign(*self.original_state)
+        self.main_window.record_undo()
+        model.assign(on, colors)
+        self.main_window.refresh_cells()
+        super().accept()
+
+    def reject(self):
+        self.stop_worker()
+        self.main_window.model.assign(*self.original_state)
+        self.main_window.refresh_cells()
+        super().reject()
+
+    def stop_worker(self):
+        self.debounce_timer.stop()
+        self.worker.latest = -1
+        self.worker_thread.quit()
+        self.worker_thread.wait()
 
     def getValues(self):
         return (
@@ -264,13 +1179,15 @@ class TextOverlayDialog(QDialog):
 
 
 class MainWindow(QMainWindow):
+    image_frames_requested = pyqtSignal(int, str, object)
+    effect_requested = pyqtSignal(int, object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Grid with Cell Painting, Text Overlay, and Eyedropper (P)")
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         self.setAcceptDrops(True)
-        self.undo_stack = []
-        self.redo_stack = []
+        self.history = History(max_bytes=64 * 1024 * 1024, context_nbytes=self.frame_context_nbytes)
         self.default_color = QColor("green")
         self.paint_mode = False
         self.paint_color = QColor("green")
@@ -281,150 +1198,551 @@ class MainWindow(QMainWindow):
         self.last_selected_row = None
         self.selected_columns = []  # Selected column indices.
         self.last_selected_column = None
-        self.row_labels = []
-        self.col_labels = []
 
         # Initialize GameOfLifee mode state and timer.
         self.game_of_life_mode = False
+        self.game_of_life_rate = 2  # Generations per second.
+        self.life_engine = LifeEngine(wrap=False)
         self.game_of_life_timer = QTimer(self)
+        self.game_of_life_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.game_of_life_timer.timeout.connect(self.game_of_life_step)
 
-        central_widget = QWidget(self)
-        self.setCentralWidget(central_widget)
-        grid_layout = QGridLayout(central_widget)
-        grid_layout.setSpacing(0)
-        grid_layout.setContentsMargins(0, 0, 0, 0)
-
-        grid_layout.addWidget(QLabel(""), 0, 0)
-
         self.num_rows = 32
         self.num_cols = 64
-        cell_size = 15
-        group_size = 8
-
-        for c in range(self.num_cols):
-            grid_col = 1 + c + (c // group_size)
-            col_lbl = ColumnLabel(str(c % group_size), c, main_window=self)
-            self.col_labels.append(col_lbl)
-            grid_layout.addWidget(col_lbl, 0, grid_col)
-
-        self.buttons = []
-        for r in range(self.num_rows):
-            row_lbl = RowLabel(str(r), r, main_window=self)
-            self.row_labels.append(row_lbl)
-            grid_layout.addWidget(row_lbl, r + 1, 0)
-            row_buttons = []
-            for c in range(self.num_cols):
-                grid_col = 1 + c + (c // group_size)
-                btn = CircleButton(size=cell_size, default_color=self.default_color,
-                                   on_toggle=self.record_undo, main_window=self)
-                grid_layout.addWidget(btn, r + 1, grid_col)
-                row_buttons.append(btn)
-            self.buttons.append(row_buttons)
-
-        for i in range(1, self.num_cols // group_size):
-            sep_col = i * (group_size + 1)
-            separator = QFrame(self)
-            separator.setFrameShape(QFrame.Shape.VLine)
-            separator.setLineWidth(1)
-            separator.setFixedWidth(1)
-            separator.setStyleSheet("background-color: #cccccc;")
-            grid_layout.addWidget(separator, 1, sep_col, self.num_rows, 1)
+        self.model = GridModel(self.num_rows, self.num_cols)
+        self.last_changed_cells = 0
+        self.total_changed_cells = 0
+        # A permanent label, so per-frame counts never hide one-off status messages.
+        self.changed_label = QLabel("Changed cells: 0", self)
+        self.statusBar().addPermanentWidget(self.changed_label)
+        self.image_import_settings = {
+            "mode": "fit",
+            "resample": "nearest",
+            "dark_threshold": 0,
+            "light_threshold": 255,
+            "dither": "none",
+        }
+        self.code_settings = {
+            "language": "C",
+            "name": "grid",
+            "word_bits": 8,
+            "order": "row",
+            "bit_order": "msb",
+            "progmem": True,
+        }
+        self.marquee_settings = {
+            "text": "Hello, world",
+            "direction": "left",
+            "speed": 1,
+            "fps": 20,
+            "font_family": "Arial",
+            "font_size": 20,
+            "bold": False,
+            "italic": False,
+            "text_color": (255, 0, 0),
+        }
+        self.marquee = None
+        self.hub75_settings = {
+            "scan": 16,
+            "color_depth": 8,
+            "refresh_hz": 240,
+            "clock_hz": 20e6,
+            "exposure": None,
+        }
+        self.hub75 = None
+        self.color_correction_settings = {
+            "gamma": 2.2,
+            "brightness": 1.0,
+            "white_balance": (1.0, 1.0, 1.0),
+            "preview": False,
+            "bake": False,
+        }
+        self.color_correction = ColorCorrection()
+        self.live_output_settings = {
+            "transport": "UDP",
+            "host": "127.0.0.1",
+            "port": DDP_PORT,
+            "device": "/dev/ttyUSB0",
+            "baud": 115200,
+            "max_fps": 30,
+        }
+        self.streamer = None
+        self.streamer_error = None
+        self.virtual_display_settings = {
+            "transport": "UDP",
+            "protocol": "Raw",
+            "host": "127.0.0.1",
+            "port": 4049,
+            "path": "/tmp/led-grid.sock",
+            "shm_path": "led-grid",
+        }
+        self.merge_mode = "or"
+        self.palette = FIRMWARE_PALETTE
+        self.preview_snapshot = None
+        self.canvas = LedCanvas(self, cell_size=15, group_size=8)
+        self.setCentralWidget(self.canvas)
+
+        # Animation timeline; the grid is the editor for ``current_frame``.
+        self.timeline = Timeline(self.num_rows, self.num_cols)
+        self.current_frame = None
+        self.playback_loop = True
+        self.playback_start = 0.0
+        self.playback_timer = QTimer(self)
+        self.playback_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.playback_timer.timeout.connect(self.playback_step)
+        self.frame_label = QLabel(self)
+        self.statusBar().addPermanentWidget(self.frame_label)
+
+        # Animated images stream into a fresh timeline from a worker thread.
+        self.image_frames_request = 0
+        self.image_frames_shown = False
+        self.image_frames_thread = QThread(self)
+        self.image_frames_worker = ImageFramesWorker()
+        self.image_frames_worker.moveToThread(self.image_frames_thread)
+        self.image_frames_requested.connect(self.image_frames_worker.load)
+        self.image_frames_worker.frames_loaded.connect(self.add_image_frames)
+        self.image_frames_worker.finished.connect(self.finish_image_frames)
+        self.image_frames_worker.failed.connect(self.fail_image_frames)
+
+        # Effects render on their own thread, started on first use like the image loader's.
+        self.effect_settings = {
+            "effect": "Plasma",
+            "params": {},
+            "fps": 60,
+            "adaptive": True,
+            "seconds": 5.0,
+        }
+        self.effect_request = 0
+        self.effect_playing = False
+        self.effect_stats = None
+        self.effects_thread = QThread(self)
+        self.effect_worker = EffectWorker()
+        self.effect_worker.moveToThread(self.effects_thread)
+        self.effect_requested.connect(self.effect_worker.run)
+        self.effect_worker.frame_ready.connect(self.show_effect_frame)
+        self.effect_worker.failed.connect(self.fail_effect)
+        self.effect_label = QLabel(self)
+        self.effect_label.hide()
+        self.statusBar().addPermanentWidget(self.effect_label)
+
+        # Virtual display: a receiver thread fills a buffer, polled at display rate.
+        self.receiver = None
+        self.received_colors = None
+        self.received_sequence = 0
+        self.shown_frames = 0
+        self.receiver_stats = None
+        self.receiver_timer = QTimer(self)
+        self.receiver_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.receiver_timer.timeout.connect(self.show_received_frame)
+        self.receiver_label = QLabel(self)
+        self.receiver_label.hide()
+        self.statusBar().addPermanentWidget(self.receiver_label)
 
         self.setup_menu()
 
     def change_grid_size(self):
         dialog = GridSizeDialog(self.num_rows, self.num_cols, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            new_rows, new_cols = dialog.getValues()
-            self.num_rows = new_rows
-            self.num_cols = new_cols
+            new_rows, new_cols, anchor = dialog.getValues()
+            self.resize_grid(new_rows, new_cols, anchor)
+
+    def resize_grid(self, rows, cols, anchor="top-left"):
+        """Resize the grid in place, keeping existing content at ``anchor``."""
+        if (rows, cols) == (self.num_rows, self.num_cols):
+            return
+        self.record_undo()
+        self.model.resize(rows, cols, anchor)
+        self.sync_grid_size()
+
+    def sync_grid_size(self):
+        """Match the canvas and selections to the model after its shape changed."""
+        rows, cols = self.model.shape
+        if (rows, cols) != (self.num_rows, self.num_cols):
+            self.num_rows = rows
+            self.num_cols = cols
+            self.selected_rows = [r for r in self.selected_rows if r < rows]
+            self.selected_columns = [c for c in self.selected_columns if c < cols]
+            if self.hub75 is not None:
+                self.set_hub75_preview(True)
+            if self.receiver is not None:
+                self.restart_virtual_display()
+            if self.effect_playing:
+                self.set_effect_playing(True)
             self.rebuild_grid()
+        self.refresh_cells()
 
     def rebuild_grid(self):
-        central_widget = QWidget(self)
-        self.setCentralWidget(central_widget)
-        grid_layout = QGridLayout(central_widget)
-        grid_layout.setSpacing(0)
-        grid_layout.setContentsMargins(0, 0, 0, 0)
-
-        group_size = 8
-
-        self.col_labels = []
-        grid_layout.addWidget(QLabel(""), 0, 0)
-        for c in range(self.num_cols):
-            grid_col = 1 + c + (c // group_size)
-            col_lbl = ColumnLabel(str(c % group_size), c, main_window=self)
-            self.col_labels.append(col_lbl)
-            grid_layout.addWidget(col_lbl, 0, grid_col)
-
-        self.row_labels = []
-        self.buttons = []
-        for r in range(self.num_rows):
-            row_lbl = RowLabel(str(r), r, main_window=self)
-            self.row_labels.append(row_lbl)
-            grid_layout.addWidget(row_lbl, r + 1, 0)
-            row_buttons = []
-            for c in range(self.num_cols):
-                grid_col = 1 + c + (c // group_size)
-                btn = CircleButton(size=15, default_color=self.default_color,
-                                   on_toggle=self.record_undo, main_window=self)
-                grid_layout.addWidget(btn, r + 1, grid_col)
-                row_buttons.append(btn)
-            self.buttons.append(row_buttons)
-
-        for i in range(1, self.num_cols // group_size):
-            sep_col = i * (group_size + 1)
-            separator = QFrame(self)
-            separator.setFrameShape(QFrame.Shape.VLine)
-            separator.setLineWidth(1)
-            separator.setFixedWidth(1)
-            separator.setStyleSheet("background-color: #cccccc;")
-            grid_layout.addWidget(separator, 1, sep_col, self.num_rows, 1)
+        self.canvas.set_grid_size(self.num_rows, self.num_cols)
+        self.adjustSize()
+
+    def cell_clicked(self, row, col, modifiers):
+        if self.uncolor_mode:
+            target_color = self.cell_qcolor(row, col)
+            self.record_undo()
+            self.uncolor_all_cells_with_color(target_color)
+            self.uncolor_mode = False
+            return
+
+        if self.eyedrop_mode:
+            self.record_undo()
+            sample_color = self.cell_qcolor(row, col)
+            self.paint_color = sample_color
+            self.picked_color = sample_color
+            self.paint_mode = True
+            self.eyedrop_mode = False
+            return
+
+        if modifiers & Qt.KeyboardModifier.ControlModifier:
+            chosen_color = QColorDialog.getColor(self.default_color, self, "Select Color for This Cell")
+            if chosen_color.isValid():
+                self.record_undo()
+                self.model.set_cell(row, col, True, qcolor_to_rgb(chosen_color))
+        else:
+            self.record_undo()
+            if not self.model.on[row, col]:
+                paint_color = self.paint_color or self.default_color
+                self.model.set_cell(row, col, True, qcolor_to_rgb(paint_color))
+            else:
+                self.model.set_cell(row, col, False)
+        self.refresh_cells()
+
+    def cell_qcolor(self, row, col):
+        colored, rgb = self.model.get_cell(row, col)
+        return QColor(*rgb) if colored else QColor("black")
+
+    def row_header_clicked(self, row, shift=False):
+        if row in self.selected_rows:
+            self.selected_rows = []
+            self.last_selected_row = None
+            self.update_row_label_styles()
+        else:
+            self.select_row(row, shift=shift)
+
+    def column_header_clicked(self, col, shift=False):
+        if col in self.selected_columns:
+            self.selected_columns = []
+            self.last_selected_column = None
+            self.update_column_label_styles()
+        else:
+            self.select_column(col, shift=shift)
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
+            file_path = event.mimeData().urls()[0].toLocalFile()
+            if file_path.lower().endswith(IMAGE_EXTENSIONS):
+                self.preview_image(file_path)
         else:
             super().dragEnterEvent(event)
 
+    def dragLeaveEvent(self, event):
+        self.end_image_preview()
+        super().dragLeaveEvent(event)
+
     def dropEvent(self, event):
+        self.end_image_preview()
         urls = event.mimeData().urls()
         if urls:
             file_path = urls[0].toLocalFile()
-            if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-                self.load_image_from_file(file_path)
+            if file_path.lower().endswith(IMAGE_EXTENSIONS):
+                try:
+                    animated = is_animated(file_path)
+                except Exception as e:
+                    print(f"Error loading image from file: {e}")
+                    animated = False
+                if animated:
+                    self.load_image_frames(file_path, sequence=False)
+                else:
+                    self.load_image_from_file(file_path)
         event.acceptProposedAction()
 
+    def preview_image(self, filename):
+        """Show ``filename`` on the grid while it is dragged over the window."""
+        try:
+            on, colors = load_image_grid(filename, self.num_rows, self.num_cols, palette=self.palette,
+                                         **self.image_import_settings)
+        except Exception as e:
+            print(f"Error previewing image: {e}")
+            return
+        if self.preview_snapshot is None:
+            self.preview_snapshot = self.model.snapshot()
+        self.model.assign(on, colors)
+        self.refresh_cells()
+
+    def end_image_preview(self):
+        if self.preview_snapshot is not None:
+            self.model.assign(*self.preview_snapshot)
+            self.preview_snapshot = None
+            self.refresh_cells()
+
     def load_image_from_file(self, filename: str):
         try:
-            img = Image.open(filename)
-            img = img.convert("RGB")
-            target_width, target_height = self.num_cols, self.num_rows
-            original_width, original_height = img.size
-            scale_factor = min(target_width / original_width, target_height / original_height)
-            new_width = int(original_width * scale_factor)
-            new_height = int(original_height * scale_factor)
-            resized_img = img.resize((new_width, new_height), Image.NEAREST)
-            new_img = Image.new("RGB", (target_width, target_height), "white")
-            x_offset = (target_width - new_width) // 2
-            y_offset = (target_height - new_height) // 2
-            new_img.paste(resized_img, (x_offset, y_offset))
-            new_state = []
-            for y in range(self.num_rows):
-                row_state = []
-                for x in range(self.num_cols):
-                    pixel = new_img.getpixel((x, y))
-                    if pixel == (255, 255, 255) or pixel == (0, 0, 0):
-                        row_state.append((False, (0, 0, 0)))
-                    else:
-                        row_state.append((True, pixel))
-                new_state.append(row_state)
+            on, colors = load_image_grid(filename, self.num_rows, self.num_cols, palette=self.palette,
+                                         **self.image_import_settings)
             self.record_undo()
-            self.set_grid_state(new_state)
+            self.model.assign(on, colors)
+            self.refresh_cells()
         except Exception as e:
             print(f"Error loading image from file: {e}")
 
+    def import_image_animation(self):
+        extensions = " ".join("*" + extension for extension in IMAGE_EXTENSIONS)
+        filename, _ = QFileDialog.getOpenFileName(self, "Import Image Animation", "",
+                                                  f"Image Files ({extensions})")
+        if filename:
+            self.load_image_frames(filename)
+
+    def load_image_frames(self, filename, sequence=True):
+        """Replace the timeline with the frames of an animated image or numbered sequence.
+
+        Decoding runs on the worker thread; frames show up in the timeline
+        as they arrive, and the first one is put on the grid right away.
+        """
+        self.playback_timer.stop()
+        self.cancel_image_frames()
+        self.image_frames_shown = False
+        self.record_undo()
+        self.timeline = Timeline(self.num_rows, self.num_cols, fps=self.timeline.fps)
+        self.current_frame = None
+        self.update_frame_label()
+        params = dict(self.image_import_settings, rows=self.num_rows, cols=self.num_cols,
+                      palette=self.palette, sequence=sequence)
+        self.statusBar().showMessage(f"Loading frames from {filename}...")
+        if not self.image_frames_thread.isRunning():
+            self.image_frames_thread.start()
+        self.image_frames_requested.emit(self.image_frames_request, filename, params)
+
+    def cancel_image_frames(self):
+        """Drop the frames of any image still being decoded."""
+        self.image_frames_request += 1
+        self.image_frames_worker.latest = self.image_frames_request
+
+    def add_image_frames(self, request_id, frames):
+        if request_id != self.image_frames_request or not frames:
+            return
+        self.timeline.extend(((on, colors) for on, colors, _ in frames),
+                             [duration for _, _, duration in frames])
+        if not self.image_frames_shown:
+            self.image_frames_shown = True
+            self.show_frame(0)
+        else:
+            self.update_frame_label()
+
+    def finish_image_frames(self, request_id):
+        if request_id == self.image_frames_request:
+            self.statusBar().showMessage(f"Loaded {len(self.timeline)} frames")
+
+    def fail_image_frames(self, request_id, message):
+        if request_id == self.image_frames_request:
+            print(f"Error loading image frames: {message}")
+            self.statusBar().showMessage(f"Loading stopped after {len(self.timeline)} frames")
+
+    def closeEvent(self, event):
+        self.image_frames_worker.latest = -1
+        self.image_frames_thread.quit()
+        self.image_frames_thread.wait()
+        self.effect_worker.latest = -1
+        self.effects_thread.quit()
+        self.effects_thread.wait()
+        if self.streamer is not None:
+            self.streamer.close()
+            self.streamer = None
+        self.set_virtual_display(False)
+        super().closeEvent(event)
+
+    def display_colors(self):
+        """Colors the canvas paints: the grid's own, corrected and/or as the simulated panel shows them."""
+        colors = self.model.colors
+        if self.color_correction_settings["preview"]:
+            colors = self.color_correction.apply(colors)
+        if self.hub75 is not None:
+            colors = self.hub75.display_colors(colors, exposure=self.hub75_settings["exposure"])
+        return colors
+
+    def export_correction(self):
+        """The correction to bake into exports, or None."""
+        return self.color_correction if self.color_correction_settings["bake"] else None
+
+    def open_color_correction(self):
+        dialog = ColorCorrectionDialog(self.color_correction_settings, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.color_correction_settings = settings = dialog.getValues()
+        self.color_correction = ColorCorrection(settings["gamma"], settings["brightness"], settings["white_balance"])
+        self.canvas.update()
+        self.stream_grid()
+
+    def set_live_output(self, enabled):
+        if self.streamer is not None:
+            self.streamer.close()
+            self.streamer = None
+            if not enabled:
+                self.statusBar().showMessage("Live output stopped")
+        if not enabled:
+            return
+        settings = self.live_output_settings
+        try:
+            if settings["transport"] == "Serial":
+                transport = SerialTransport(settings["device"], settings["baud"])
+                target = settings["device"]
+                keyframe_interval = None
+            else:
+                transport = UdpTransport(settings["host"], settings["port"])
+                target = f"{settings['host']}:{settings['port']}"
+                # UDP drops packets silently; a periodic full frame repairs the receiver.
+                keyframe_interval = 1.0
+        except (OSError, ValueError) as e:
+            print(f"Error starting live output: {e}")
+            self.statusBar().showMessage(f"Live output failed: {e}")
+            self.live_output_action.setChecked(False)
+            return
+        self.streamer = FrameStreamer(transport, settings["max_fps"], keyframe_interval)
+        self.streamer_error = None
+        self.stream_grid()
+        self.statusBar().showMessage(f"Live output to {target}")
+
+    def stream_grid(self):
+        """Queue the grid, as the panel should show it, for live output."""
+        if self.streamer is None:
+            return
+        # The streamer keeps retrying; report only when sending starts or stops failing.
+        error = self.streamer.error
+        if error is not None and self.streamer_error is None:
+            print(f"Error sending live output: {error}")
+            self.statusBar().showMessage(f"Live output failing, retrying: {error}")
+        elif error is None and self.streamer_error is not None:
+            self.statusBar().showMessage("Live output resumed")
+        self.streamer_error = error
+        colors = self.model.colors * self.model.on[..., None]
+        self.streamer.submit(bake_colors(colors, "rgb888", self.export_correction()))
+
+    def set_virtual_display(self, enabled):
+        if not enabled:
+            if self.receiver is not None:
+                self.close_receiver()
+                self.statusBar().showMessage("Virtual display stopped")
+            return
+        if self.restart_virtual_display():
+            # A received session is undone as one step, like a Game of Life run.
+            self.record_undo()
+
+    def close_receiver(self):
+        self.receiver_timer.stop()
+        self.receiver.close()
+        self.receiver = None
+        self.receiver_label.hide()
+
+    def restart_virtual_display(self):
+        """(Re)open the receiver at the grid's current shape; returns whether it started."""
+        receiver = self.receiver
+        if receiver is not None:
+            self.close_receiver()
+            # After a resize the old buffer is left to its writers and a new file made in its place.
+            shape = (self.num_rows, self.num_cols)
+            if isinstance(receiver, SharedFrameBuffer) and (receiver.rows, receiver.cols) != shape:
+                try:
+                    receiver.unlink()
+                except FileNotFoundError:
+                    pass
+        settings = self.virtual_display_settings
+        try:
+            if settings["transport"] == "Shared Memory":
+                self.receiver = SharedFrameBuffer(settings["shm_path"], self.num_rows, self.num_cols, create=True)
+                target = self.receiver.path
+            elif settings["transport"] == "Unix":
+                self.receiver = FrameReceiver(self.num_rows, self.num_cols, "Unix", settings["path"],
+                                              settings["protocol"])
+                target = f"{settings['protocol']} frames on {self.receiver.address}"
+            else:
+                address = (settings["host"], settings["port"])
+                self.receiver = FrameReceiver(self.num_rows, self.num_cols, settings["transport"], address,
+                                              settings["protocol"])
+                target = "{} frames on {} {}:{}".format(settings["protocol"], settings["transport"],
+                                                       *self.receiver.address)
+        except (OSError, ValueError) as e:
+            print(f"Error starting virtual display: {e}")
+            self.statusBar().showMessage(f"Virtual display failed: {e}")
+            self.virtual_display_action.setChecked(False)
+            return False
+        self.received_colors = np.zeros((self.num_rows, self.num_cols, 3), dtype=np.uint8)
+        self.received_sequence = 0
+        self.shown_frames = 0
+        self.receiver_stats = (time.perf_counter(), self.receiver.frames_received, 0)
+        self.receiver_label.setText("RX 0 fps")
+        self.receiver_label.setToolTip("")
+        self.receiver_label.show()
+        # Poll at display rate; frames arriving faster are skipped, not queued.  Checking
+        # shared memory is a single read, so it is polled more often to cut latency.
+        self.receiver_timer.start(4 if settings["transport"] == "Shared Memory" else 16)
+        self.statusBar().showMessage(f"Virtual display: {self.num_rows}x{self.num_cols} {target}")
+        return True
+
+    def show_received_frame(self):
+        receiver = self.receiver
+        if receiver.error is not None:
+            print(f"Error receiving frames: {receiver.error}")
+            self.virtual_display_action.setChecked(False)
+            self.statusBar().showMessage(f"Virtual display stopped: {receiver.error}")
+            return
+        sequence = receiver.copy_to(self.received_colors)
+        if sequence != self.received_sequence:
+            self.received_sequence = sequence
+            self.shown_frames += 1
+            self.model.assign(self.received_colors.any(axis=-1), self.received_colors)
+            self.refresh_cells()
+        now = time.perf_counter()
+        since, received, shown = self.receiver_stats
+        if now - since >= 0.5:
+            rx_fps = (receiver.frames_received - received) / (now - since)
+            shown_fps = (self.shown_frames - shown) / (now - since)
+            text = f"RX {rx_fps:.0f} fps, shown {shown_fps:.0f} fps"
+            # A shared-memory buffer has no connections to drop.
+            dropped = getattr(receiver, "connections_dropped", 0)
+            if dropped:
+                text += f", {dropped} dropped"
+                self.receiver_label.setToolTip(f"Last dropped connection: {receiver.connection_error}")
+            self.receiver_label.setText(text)
+            self.receiver_stats = (now, receiver.frames_received, self.shown_frames)
+
+    def open_virtual_display_settings(self):
+        dialog = VirtualDisplayDialog(self.virtual_display_settings, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.virtual_display_settings = dialog.getValues()
+        if self.receiver is not None:
+            self.restart_virtual_display()
+
+    def open_live_output_settings(self):
+        dialog = LiveOutputDialog(self.live_output_settings, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.live_output_settings = dialog.getValues()
+        if self.streamer is not None:
+            self.set_live_output(True)
+
+    def set_hub75_preview(self, enabled):
+        if enabled:
+            settings = dict(self.hub75_settings)
+            settings.pop("exposure")
+            self.hub75 = Hub75Simulator(self.num_cols, **settings)
+            self.statusBar().showMessage(self.hub75.summary())
+        else:
+            self.hub75 = None
+        self.canvas.update()
+
+    def open_hub75_settings(self):
+        dialog = Hub75SettingsDialog(self.hub75_settings, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.hub75_settings = dialog.getValues()
+        if self.hub75 is not None:
+            self.set_hub75_preview(True)
+
+    def open_image_import_settings(self):
+        dialog = ImageImportSettingsDialog(self.image_import_settings, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.image_import_settings = dialog.getValues()
+
     def setup_menu(self):
         menu_bar = self.menuBar()
         file_menu = menu_bar.addMenu("File")
@@ -452,10 +1770,22 @@ class MainWindow(QMainWindow):
         text_overlay_action.setShortcut("Ctrl+I")
         text_overlay_action.triggered.connect(self.open_text_overlay_dialog)
         file_menu.addAction(text_overlay_action)
+        export_binary_action = QAction("Export Binary", self)
+        export_binary_action.setShortcut("Ctrl+Shift+S")
+        export_binary_action.triggered.connect(self.export_binary_state)
+        file_menu.addAction(export_binary_action)
+        import_binary_action = QAction("Import Binary", self)
+        import_binary_action.setShortcut("Ctrl+Shift+O")
+        import_binary_action.triggered.connect(self.import_binary_state)
+        file_menu.addAction(import_binary_action)
         copy_formatted_action = QAction("Copy (Formatted)", self)
         copy_formatted_action.setShortcut("Ctrl+C")
         copy_formatted_action.triggered.connect(self.copy_formatted_to_clipboard)
         file_menu.addAction(copy_formatted_action)
+        copy_code_action = QAction("Copy as Code", self)
+        copy_code_action.setShortcut("Ctrl+Shift+C")
+        copy_code_action.triggered.connect(self.copy_code_to_clipboard)
+        file_menu.addAction(copy_code_action)
 
         edit_menu = menu_bar.addMenu("Edit")
         undo_action = QAction("Undo", self)
@@ -504,12 +1834,105 @@ class MainWindow(QMainWindow):
         grid_size_action = QAction("Grid Size", self)
         grid_size_action.triggered.connect(self.change_grid_size)
         options_menu.addAction(grid_size_action)
+        image_import_action = QAction("Image Import Settings", self)
+        image_import_action.triggered.connect(self.open_image_import_settings)
+        options_menu.addAction(image_import_action)
+        load_palette_action = QAction("Load Palette", self)
+        load_palette_action.triggered.connect(self.load_palette)
+        options_menu.addAction(load_palette_action)
+        reset_palette_action = QAction("Reset Palette", self)
+        reset_palette_action.triggered.connect(self.reset_palette)
+        options_menu.addAction(reset_palette_action)
+
+        color_correction_action = QAction("Color Correction", self)
+        color_correction_action.triggered.connect(self.open_color_correction)
+        options_menu.addAction(color_correction_action)
+        self.hub75_action = QAction("HUB75 Preview", self)
+        self.hub75_action.setShortcut("Ctrl+Shift+H")
+        self.hub75_action.setCheckable(True)
+        self.hub75_action.toggled.connect(self.set_hub75_preview)
+        options_menu.addAction(self.hub75_action)
+        hub75_settings_action = QAction("HUB75 Preview Settings", self)
+        hub75_settings_action.triggered.connect(self.open_hub75_settings)
+        options_menu.addAction(hub75_settings_action)
+        self.live_output_action = QAction("Live Output", self)
+        self.live_output_action.setShortcut("Ctrl+Shift+L")
+        self.live_output_action.setCheckable(True)
+        self.live_output_action.toggled.connect(self.set_live_output)
+        options_menu.addAction(self.live_output_action)
+        live_output_settings_action = QAction("Live Output Settings", self)
+        live_output_settings_action.triggered.connect(self.open_live_output_settings)
+        options_menu.addAction(live_output_settings_action)
+        self.virtual_display_action = QAction("Virtual Display", self)
+        self.virtual_display_action.setShortcut("Ctrl+Shift+V")
+        self.virtual_display_action.setCheckable(True)
+        self.virtual_display_action.toggled.connect(self.set_virtual_display)
+        options_menu.addAction(self.virtual_display_action)
+        virtual_display_settings_action = QAction("Virtual Display Settings", self)
+        virtual_display_settings_action.triggered.connect(self.open_virtual_display_settings)
+        options_menu.addAction(virtual_display_settings_action)
 
         # New menu action to toggle GameOfLifee mode.
         game_of_life_action = QAction("GameOfLifee Mode", self)
         game_of_life_action.setShortcut("Ctrl+G")
         game_of_life_action.triggered.connect(self.toggle_game_of_life_mode)
         options_menu.addAction(game_of_life_action)
+        game_of_life_settings_action = QAction("GameOfLifee Settings", self)
+        game_of_life_settings_action.triggered.connect(self.open_game_of_life_settings)
+        options_menu.addAction(game_of_life_settings_action)
+
+        animation_menu = menu_bar.addMenu("Animation")
+        add_frame_action = QAction("Add Frame", self)
+        add_frame_action.setShortcut("Ctrl+Shift+N")
+        add_frame_action.triggered.connect(self.add_frame)
+        animation_menu.addAction(add_frame_action)
+        delete_frame_action = QAction("Delete Frame", self)
+        delete_frame_action.triggered.connect(self.delete_frame)
+        animation_menu.addAction(delete_frame_action)
+        previous_frame_action = QAction("Previous Frame", self)
+        previous_frame_action.setShortcut("PgUp")
+        previous_frame_action.triggered.connect(lambda: self.step_frame(-1))
+        animation_menu.addAction(previous_frame_action)
+        next_frame_action = QAction("Next Frame", self)
+        next_frame_action.setShortcut("PgDown")
+        next_frame_action.triggered.connect(lambda: self.step_frame(1))
+        animation_menu.addAction(next_frame_action)
+        play_action = QAction("Play / Stop", self)
+        play_action.setShortcut("Ctrl+Shift+P")
+        play_action.triggered.connect(self.toggle_playback)
+        animation_menu.addAction(play_action)
+        animation_settings_action = QAction("Animation Settings", self)
+        animation_settings_action.triggered.connect(self.open_animation_settings)
+        animation_menu.addAction(animation_settings_action)
+        export_animation_action = QAction("Export Animation", self)
+        export_animation_action.setShortcut("Ctrl+Shift+E")
+        export_animation_action.triggered.connect(self.export_animation)
+        animation_menu.addAction(export_animation_action)
+        import_animation_action = QAction("Import Animation", self)
+        import_animation_action.triggered.connect(self.import_animation)
+        animation_menu.addAction(import_animation_action)
+        import_image_animation_action = QAction("Import Image Animation", self)
+        import_image_animation_action.triggered.connect(self.import_image_animation)
+        animation_menu.addAction(import_image_animation_action)
+        marquee_action = QAction("Marquee", self)
+        marquee_action.setShortcut("Ctrl+Shift+M")
+        marquee_action.triggered.connect(self.create_marquee)
+        animation_menu.addAction(marquee_action)
+        export_marquee_action = QAction("Export Marquee Strip", self)
+        export_marquee_action.triggered.connect(self.export_marquee_strip)
+        animation_menu.addAction(export_marquee_action)
+        animation_menu.addSeparator()
+        self.effect_action = QAction("Play Effect", self)
+        self.effect_action.setShortcut("Ctrl+Shift+F")
+        self.effect_action.setCheckable(True)
+        self.effect_action.toggled.connect(self.set_effect_playing)
+        animation_menu.addAction(self.effect_action)
+        effect_settings_action = QAction("Effect Settings", self)
+        effect_settings_action.triggered.connect(self.open_effect_settings)
+        animation_menu.addAction(effect_settings_action)
+        record_effect_action = QAction("Record Effect to Timeline", self)
+        record_effect_action.triggered.connect(self.record_effect_to_timeline)
+        animation_menu.addAction(record_effect_action)
 
         # New Theme menu.
         theme_menu = menu_bar.addMenu("Theme")
@@ -527,42 +1950,306 @@ class MainWindow(QMainWindow):
         """Toggle the Game of Life simulation mode."""
         self.game_of_life_mode = not self.game_of_life_mode
         if self.game_of_life_mode:
-            # Start timer with an update every 500ms (adjust as desired)
-            self.game_of_life_timer.start(500)
+            # The whole run is undone as one step rather than one entry per generation.
+            self.record_undo()
+            self.game_of_life_timer.start(round(1000 / self.game_of_life_rate))
         else:
             self.game_of_life_timer.stop()
 
+    def open_game_of_life_settings(self):
+        dialog = GameOfLifeSettingsDialog(self.game_of_life_rate, self.life_engine.wrap, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.game_of_life_rate, self.life_engine.wrap = dialog.getValues()
+            if self.game_of_life_mode:
+                self.game_of_life_timer.start(round(1000 / self.game_of_life_rate))
+
     def game_of_life_step(self):
         """Compute one generation update based on Conway's Game of Life rules."""
-        state = self.get_grid_state()
-        new_state = []
-        for r in range(self.num_rows):
-            new_row = []
-            for c in range(self.num_cols):
-                live_neighbors = 0
-                # Check all 8 neighbors.
-                for dr in (-1, 0, 1):
-                    for dc in (-1, 0, 1):
-                        if dr == 0 and dc == 0:
-                            continue
-                        nr, nc = r + dr, c + dc
-                        if 0 <= nr < self.num_rows and 0 <= nc < self.num_cols:
-                            if state[nr][nc][0]:
-                                live_neighbors += 1
-                cell_alive = state[r][c][0]
-                # Apply Game of Life rules:
-                # 1. Underpopulation or overpopulation: a live cell dies.
-                if cell_alive and (live_neighbors < 2 or live_neighbors > 3):
-                    new_row.append((False, (0, 0, 0)))
-                # 2. Reproduction: a dead cell with exactly 3 live neighbors becomes alive.
-                elif not cell_alive and live_neighbors == 3:
-                    new_row.append((True, (0, 255, 0)))  # Default new cell color.
-                # 3. Otherwise, the cell stays the same.
-                else:
-                    new_row.append(state[r][c])
-            new_state.append(new_row)
-        self.record_undo()  # Save current state to allow undo.
-        self.set_grid_state(new_state)
+        alive = self.model.on
+        new_alive = self.life_engine.step(alive)
+        colors = self.model.colors.copy()
+        colors[new_alive & ~alive] = (0, 255, 0)  # Default new cell color.
+        self.model.assign(new_alive, colors)
+        self.refresh_cells()
+
+    def store_current_frame(self):
+        """Save the grid into the frame it is editing."""
+        if self.current_frame is None:
+            return
+        if self.model.shape != self.timeline.shape:
+            self.timeline.resize(*self.model.shape)
+        self.timeline.set_frame(self.current_frame, self.model.on, self.model.colors)
+
+    def show_frame(self, index):
+        self.current_frame = index
+        self.model.assign(*self.timeline.frame(index))
+        self.sync_grid_size()
+        self.update_frame_label()
+
+    def update_frame_label(self):
+        if self.current_frame is None:
+            self.frame_label.setText("")
+            return
+        duration = self.timeline.durations[self.current_frame]
+        self.frame_label.setText(f"Frame {self.current_frame + 1}/{len(self.timeline)} ({duration} ms)")
+
+    def add_frame(self):
+        """Insert a copy of the grid after the current frame and make it current."""
+        self.store_current_frame()
+        if not len(self.timeline):
+            self.timeline.resize(*self.model.shape)
+        index = 0 if self.current_frame is None else self.current_frame + 1
+        self.timeline.insert(index, self.model.on, self.model.colors)
+        self.current_frame = index
+        self.update_frame_label()
+
+    def delete_frame(self):
+        if self.current_frame is None:
+            return
+        self.record_undo()
+        self.timeline.remove(self.current_frame)
+        if not len(self.timeline):
+            self.current_frame = None
+            self.update_frame_label()
+            return
+        self.show_frame(min(self.current_frame, len(self.timeline) - 1))
+
+    def step_frame(self, step):
+        if self.current_frame is None or self.playback_timer.isActive():
+            return
+        self.store_current_frame()
+        # Flipping through frames collapses into one undo entry.
+        self.record_undo(merge_key="frame")
+        self.show_frame((self.current_frame + step) % len(self.timeline))
+
+    def toggle_playback(self):
+        """Play the timeline at its frame rate, or stop on the frame being shown."""
+        if self.playback_timer.isActive():
+            self.playback_timer.stop()
+            return
+        if not len(self.timeline):
+            self.statusBar().showMessage("Add frames (Ctrl+Shift+N) before playing")
+            return
+        self.store_current_frame()
+        self.record_undo()
+        self.playback_start = time.monotonic()
+        self.playback_timer.start(round(1000 / self.timeline.fps))
+        self.playback_step()
+
+    def playback_step(self):
+        # The frame is picked from the elapsed time, so late ticks skip frames
+        # instead of slowing the animation down.
+        elapsed = (time.monotonic() - self.playback_start) * 1000
+        index = self.timeline.frame_at(elapsed, self.playback_loop)
+        if index is None:
+            self.playback_timer.stop()
+        elif index != self.current_frame:
+            self.show_frame(index)
+
+    def open_animation_settings(self):
+        duration = (self.timeline.durations[self.current_frame] if self.current_frame is not None
+                    else self.timeline.default_duration)
+        dialog = AnimationSettingsDialog(self.timeline.fps, duration, self.playback_loop, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.timeline.fps, duration, apply_to_all, self.playback_loop = dialog.getValues()
+        if apply_to_all:
+            self.timeline.durations = [duration] * len(self.timeline)
+        elif self.current_frame is not None:
+            self.timeline.durations[self.current_frame] = duration
+        if self.playback_timer.isActive():
+            self.playback_timer.start(round(1000 / self.timeline.fps))
+        self.update_frame_label()
+
+    def create_marquee(self):
+        """Render scrolling text once and play its frames as the timeline."""
+        dialog = MarqueeDialog(self.marquee_settings, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.marquee_settings = dialog.getValues()
+        settings = dict(self.marquee_settings)
+        text, direction, speed, fps = (settings.pop(key) for key in ("text", "direction", "speed", "fps"))
+        try:
+            self.marquee = Marquee.from_text(text, self.num_rows, self.num_cols, direction, speed, **settings)
+        except Exception as e:
+            print(f"Error rendering marquee: {e}")
+            return
+        self.playback_timer.stop()
+        self.cancel_image_frames()
+        self.record_undo()
+        self.timeline = Timeline(self.num_rows, self.num_cols, fps=fps)
+        self.timeline.extend(zip(*self.marquee.stack()))
+        self.show_frame(0)
+        self.toggle_playback()
+
+    def export_marquee_strip(self):
+        """Write the last marquee as its text strip plus a per-frame offset table."""
+        if self.marquee is None:
+            self.statusBar().showMessage("Create a marquee (Ctrl+Shift+M) first")
+            return
+        dialog = CodeExportSettingsDialog(self.num_rows, self.code_settings, self,
+                                          title="Export Marquee Strip", row_range=False)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        _, _, self.code_settings = dialog.getValues()
+        settings = dict(self.code_settings)
+        language = settings.pop("language")
+        filename, _ = QFileDialog.getSaveFileName(self, "Export Marquee Strip", "",
+                                                  f"{language} Files (*{CODE_EXTENSIONS[language]})")
+        if not filename:
+            return
+        try:
+            with open(filename, "w") as f:
+                write_strip_code(f, self.marquee, language, **settings)
+        except Exception as e:
+            print(f"Error exporting marquee strip: {e}")
+
+    def effect_params(self):
+        settings = self.effect_settings
+        name = settings["effect"]
+        return {
+            "effect": name,
+            "values": settings["params"].get(name, {}),
+            "rows": self.num_rows,
+            "cols": self.num_cols,
+            "fps": settings["fps"],
+            "adaptive": settings["adaptive"],
+        }
+
+    def set_effect_playing(self, enabled):
+        """Start (or restart) the configured effect on the grid, or stop it."""
+        self.effect_request += 1
+        self.effect_worker.latest = self.effect_request
+        if not enabled:
+            self.effect_playing = False
+            self.effect_label.hide()
+            return
+        # The whole run is undone as one step, like a Game of Life run; a restart continues it.
+        if not self.effect_playing:
+            self.record_undo()
+        self.effect_playing = True
+        self.effect_worker.shown = True
+        self.effect_stats = (time.perf_counter(), 0)
+        self.effect_label.setText(self.effect_settings["effect"])
+        self.effect_label.show()
+        if not self.effects_thread.isRunning():
+            self.effects_thread.start()
+        self.effect_requested.emit(self.effect_request, self.effect_params())
+
+    def show_effect_frame(self, request_id, colors):
+        # Even a stale frame must release the worker, or a restarted run never sends one.
+        self.effect_worker.shown = True
+        if request_id != self.effect_request:
+            return
+        self.model.assign(colors.any(axis=-1), colors)
+        self.refresh_cells()
+        scheduler = self.effect_worker.scheduler
+        now = time.perf_counter()
+        since, rendered = self.effect_stats
+        if scheduler is not None and now - since >= 0.5:
+            fps = (scheduler.frames_rendered - rendered) / (now - since)
+            text = (f"{self.effect_settings['effect']} {fps:.0f} fps, "
+                    f"{scheduler.render_time * 1000:.1f} ms/frame, {scheduler.frames_skipped} skipped")
+            if scheduler.effect.step > 1:
+                text += f", 1/{scheduler.effect.step} detail"
+            self.effect_label.setText(text)
+            self.effect_stats = (now, scheduler.frames_rendered)
+
+    def fail_effect(self, request_id, message):
+        if request_id == self.effect_request:
+            print(f"Error playing effect: {message}")
+            self.effect_action.setChecked(False)
+            self.statusBar().showMessage(f"Effect stopped: {message}")
+
+    def open_effect_settings(self):
+        dialog = EffectsDialog(self.effect_settings, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.effect_settings = dialog.getValues()
+        if self.effect_playing:
+            self.set_effect_playing(True)
+
+    def record_effect_to_timeline(self):
+        """Render the configured effect for its record length, at full detail, into the timeline."""
+        params = self.effect_params()
+        fps = params["fps"]
+        try:
+            effect = EFFECTS[params["effect"]](self.num_rows, self.num_cols, **params["values"])
+            frames = record_effect(effect, max(1, round(self.effect_settings["seconds"] * fps)), fps)
+        except Exception as e:
+            print(f"Error recording effect: {e}")
+            self.statusBar().showMessage(f"Recording effect failed: {e}")
+            return
+        self.effect_action.setChecked(False)
+        self.playback_timer.stop()
+        self.cancel_image_frames()
+        self.record_undo()
+        self.timeline = Timeline(self.num_rows, self.num_cols, fps=fps)
+        self.timeline.extend((colors.any(axis=-1), colors) for colors in frames)
+        self.show_frame(0)
+        self.statusBar().showMessage(f"Recorded {len(frames)} frames of {params['effect']}")
+
+    def export_animation(self):
+        if not len(self.timeline):
+            self.statusBar().showMessage("The timeline has no frames to export")
+            return
+        self.store_current_frame()
+        formats = EXPORT_MODES + tuple(BINARY_FORMATS) + LANGUAGES
+        dialog = ExportSettingsDialog(self.timeline.shape[0], self, formats=formats)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        start_row, end_row, fmt = dialog.getValues()
+        if start_row > end_row:
+            start_row, end_row = end_row, start_row
+        if fmt in BINARY_FORMATS:
+            file_filter = "Binary Grid Files (*.bin)"
+        elif fmt in LANGUAGES:
+            file_filter = f"{fmt} Files (*{CODE_EXTENSIONS[fmt]})"
+        else:
+            file_filter = "Text Files (*.txt)"
+        filename, _ = QFileDialog.getSaveFileName(self, "Export Animation", "", file_filter)
+        if not filename:
+            return
+        code_options = dict(self.code_settings)
+        code_options.pop("language")
+        try:
+            on, colors = self.timeline.stack(start_row, end_row)
+            save_frames(filename, on, colors, fmt, self.palette, self.export_correction(), **code_options)
+        except Exception as e:
+            print(f"Error exporting animation: {e}")
+
+    def import_animation(self):
+        """Replace the timeline with the frames of a multi-frame text or binary file."""
+        filename, _ = QFileDialog.getOpenFileName(self, "Import Animation", "", "Grid Files (*.txt *.bin)")
+        if not filename:
+            return
+        default_rgb = qcolor_to_rgb(self.default_color)
+        frames = []
+        try:
+            if filename.lower().endswith(".bin"):
+                for on, colors in binary_format.load(filename, self.palette, default_rgb):
+                    frame = GridModel(self.num_rows, self.num_cols)
+                    frame.paste(on, colors)
+                    frames.append((frame.on, frame.colors))
+            else:
+                for parsed in read_grid_frames(filename, default_rgb, self.palette):
+                    frame = GridModel(self.num_rows, self.num_cols)
+                    apply_import(frame, parsed)
+                    frames.append((frame.on, frame.colors))
+        except ParseError as e:
+            QMessageBox.warning(self, "Import Animation", f"Could not import {filename}:\n{e}")
+            return
+        except Exception as e:
+            print(f"Error importing animation: {e}")
+            return
+        if not frames:
+            return
+        self.playback_timer.stop()
+        self.cancel_image_frames()
+        self.record_undo()
+        self.timeline = Timeline(self.num_rows, self.num_cols, fps=self.timeline.fps)
+        self.timeline.extend(frames)
+        self.show_frame(0)
 
     def set_light_theme(self):
         """Set the application to light mode using the system default palette."""
@@ -592,18 +2279,10 @@ class MainWindow(QMainWindow):
         self.set_light_theme()
 
     def update_row_label_styles(self):
-        for lbl in self.row_labels:
-            if lbl.row_index in self.selected_rows:
-                lbl.setStyleSheet("background-color: lightblue;")
-            else:
-                lbl.setStyleSheet("")
+        self.canvas.update_headers()
 
     def update_column_label_styles(self):
-        for lbl in self.col_labels:
-            if lbl.col_index in self.selected_columns:
-                lbl.setStyleSheet("background-color: lightblue; border: 1px solid gray;")
-            else:
-                lbl.setStyleSheet("border: 1px solid gray;")
+        self.canvas.update_headers()
 
     def select_row(self, row_index, shift=False):
         self.update_column_label_styles()
@@ -634,10 +2313,9 @@ class MainWindow(QMainWindow):
         end = max(self.selected_rows)
         if start == 0:
             return
-        state = self.get_grid_state()
-        state[start - 1:end + 1] = state[start:end + 1] + [state[start - 1]]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(-1, axis=0, rows=range(start - 1, end + 1))
+        self.refresh_cells()
         self.selected_rows = [r - 1 for r in self.selected_rows]
         self.update_row_label_styles()
         self.last_selected_row = self.selected_rows[0]
@@ -649,10 +2327,9 @@ class MainWindow(QMainWindow):
         end = max(self.selected_rows)
         if end == self.num_rows - 1:
             return
-        state = self.get_grid_state()
-        state[start:end + 2] = [state[end + 1]] + state[start:end + 1]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(1, axis=0, rows=range(start, end + 2))
+        self.refresh_cells()
         self.selected_rows = [r + 1 for r in self.selected_rows]
         self.update_row_label_styles()
         self.last_selected_row = self.selected_rows[-1]
@@ -660,22 +2337,16 @@ class MainWindow(QMainWindow):
     def shift_selected_rows_left(self):
         if not self.selected_rows:
             return
-        state = self.get_grid_state()
-        for r in self.selected_rows:
-            row = state[r]
-            state[r] = row[1:] + row[0:1]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(-1, axis=1, rows=self.selected_rows)
+        self.refresh_cells()
 
     def shift_selected_rows_right(self):
         if not self.selected_rows:
             return
-        state = self.get_grid_state()
-        for r in self.selected_rows:
-            row = state[r]
-            state[r] = row[-1:] + row[:-1]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(1, axis=1, rows=self.selected_rows)
+        self.refresh_cells()
 
     def move_selected_columns_left(self):
         if not self.selected_columns:
@@ -684,12 +2355,9 @@ class MainWindow(QMainWindow):
         end = max(self.selected_columns)
         if start == 0:
             return
-        state = self.get_grid_state()
-        for r in range(self.num_rows):
-            row = state[r]
-            row[start - 1:end + 1] = row[start:end + 1] + [row[start - 1]]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(-1, axis=1, cols=range(start - 1, end + 1))
+        self.refresh_cells()
         self.selected_columns = [c - 1 for c in self.selected_columns]
         self.update_column_label_styles()
         self.last_selected_column = self.selected_columns[0]
@@ -701,12 +2369,9 @@ class MainWindow(QMainWindow):
         end = max(self.selected_columns)
         if end == self.num_cols - 1:
             return
-        state = self.get_grid_state()
-        for r in range(self.num_rows):
-            row = state[r]
-            row[start:end + 2] = [row[end + 1]] + row[start:end + 1]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(1, axis=1, cols=range(start, end + 2))
+        self.refresh_cells()
         self.selected_columns = [c + 1 for c in self.selected_columns]
         self.update_column_label_styles()
         self.last_selected_column = self.selected_columns[-1]
@@ -714,48 +2379,26 @@ class MainWindow(QMainWindow):
     def shift_selected_columns_up(self):
         if not self.selected_columns:
             return
-        state = self.get_grid_state()
-        for c in sorted(self.selected_columns):
-            col_vals = [state[r][c] for r in range(self.num_rows)]
-            new_col = col_vals[1:] + [col_vals[0]]
-            for r in range(self.num_rows):
-                state[r][c] = new_col[r]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(-1, axis=0, cols=self.selected_columns)
+        self.refresh_cells()
 
     def shift_selected_columns_down(self):
         if not self.selected_columns:
             return
-        state = self.get_grid_state()
-        for c in sorted(self.selected_columns):
-            col_vals = [state[r][c] for r in range(self.num_rows)]
-            new_col = [col_vals[-1]] + col_vals[:-1]
-            for r in range(self.num_rows):
-                state[r][c] = new_col[r]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(1, axis=0, cols=self.selected_columns)
+        self.refresh_cells()
 
     def shift_intersection_horizontal(self, left=True):
-        state = self.get_grid_state()
-        for r in sorted(self.selected_rows):
-            cols = sorted(self.selected_columns)
-            sub = [state[r][c] for c in cols]
-            new_sub = sub[1:] + [sub[0]] if left else [sub[-1]] + sub[:-1]
-            for i, c in enumerate(cols):
-                state[r][c] = new_sub[i]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(-1 if left else 1, axis=1, rows=self.selected_rows, cols=self.selected_columns)
+        self.refresh_cells()
 
     def shift_intersection_vertical(self, up=True):
-        state = self.get_grid_state()
-        for c in sorted(self.selected_columns):
-            rows = sorted(self.selected_rows)
-            sub = [state[r][c] for r in rows]
-            new_sub = sub[1:] + [sub[0]] if up else [sub[-1]] + sub[:-1]
-            for i, r in enumerate(rows):
-                state[r][c] = new_sub[i]
         self.record_undo()
-        self.set_grid_state(state)
+        self.model.roll(-1 if up else 1, axis=0, rows=self.selected_rows, cols=self.selected_columns)
+        self.refresh_cells()
 
     def keyPressEvent(self, event):
         if self.selected_rows and self.selected_columns and event.modifiers() == Qt.KeyboardModifier.NoModifier:
@@ -819,8 +2462,7 @@ class MainWindow(QMainWindow):
             return
         if (event.modifiers() == Qt.KeyboardModifier.ControlModifier and
                 event.key() in (Qt.Key.Key_Left, Qt.Key.Key_Right, Qt.Key.Key_Up, Qt.Key.Key_Down)):
-            if not event.isAutoRepeat():
-                self.record_undo()
+            self.record_undo(merge_key="shift_grid")
             if event.key() == Qt.Key.Key_Left:
                 self.shift_grid("left", record_undo=False)
             elif event.key() == Qt.Key.Key_Right:
@@ -850,66 +2492,22 @@ class MainWindow(QMainWindow):
 
     def open_text_overlay_dialog(self):
         dialog = TextOverlayDialog(self, self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            pass
+        dialog.exec()
 
     def apply_text_overlay(self, text, bold, italic, font_family, resize_factor, text_color, font_size):
-        width = int(self.num_cols * resize_factor)
-        height = int(self.num_rows * resize_factor)
-        img = Image.new("RGB", (width, height), "white")
-        draw = ImageDraw.Draw(img)
-        try:
-            calculated_font_size = int(font_size * resize_factor)
-            if font_family.lower() == "arial":
-                if bold and italic:
-                    font_path = "arialbi.ttf"
-                elif bold:
-                    font_path = "arialbd.ttf"
-                elif italic:
-                    font_path = "ariali.ttf"
-                else:
-                    font_path = "arial.ttf"
-            elif font_family.lower() == "times new roman":
-                if bold and italic:
-                    font_path = "timesbi.ttf"
-                elif bold:
-                    font_path = "timesbd.ttf"
-                elif italic:
-                    font_path = "timesi.ttf"
-                else:
-                    font_path = "times.ttf"
-            elif font_family.lower() == "courier new":
-                if bold and italic:
-                    font_path = "courbi.ttf"
-                elif bold:
-                    font_path = "courbd.ttf"
-                elif italic:
-                    font_path = "couri.ttf"
-                else:
-                    font_path = "cour.ttf"
-            else:
-                font_path = "arial.ttf"
-            font = ImageFont.truetype(font_path, calculated_font_size)
-        except Exception as e:
-            font = ImageFont.load_default()
-        tc = (text_color.red(), text_color.green(), text_color.blue())
-        draw.text((0, 0), text, fill=tc, font=font)
-        self.apply_generated_image(img)
+        on, colors = render_text(text, self.num_rows, self.num_cols, bold, italic, font_family,
+                                 resize_factor, qcolor_to_rgb(text_color), font_size)
+        self.record_undo()
+        self.model.assign(on, colors)
+        self.refresh_cells()
 
     def apply_generated_image(self, img):
         img_resized = img.resize((self.num_cols, self.num_rows), Image.NEAREST)
-        new_state = []
-        for y in range(self.num_rows):
-            row_state = []
-            for x in range(self.num_cols):
-                pixel = img_resized.getpixel((x, y))
-                if pixel != (255, 255, 255):
-                    row_state.append((True, pixel))
-                else:
-                    row_state.append((False, (0, 0, 0)))
-            new_state.append(row_state)
+        pixels = np.asarray(img_resized.convert("RGB"), dtype=np.uint8)
+        on = ~np.all(pixels == 255, axis=-1)
         self.record_undo()
-        self.set_grid_state(new_state)
+        self.model.assign(on, pixels)
+        self.refresh_cells()
 
     def import_png_state(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Import PNG File", "", "PNG Files (*.png)")
@@ -917,97 +2515,64 @@ class MainWindow(QMainWindow):
             return
         self.load_image_from_file(filename)
 
+    def refresh_cells(self):
+        """Repaint the cells the model reports as changed and count them."""
+        changed = self.model.take_dirty()
+        self.last_changed_cells = int(np.count_nonzero(changed))
+        self.total_changed_cells += self.last_changed_cells
+        self.changed_label.setText(f"Changed cells: {self.last_changed_cells}")
+        if self.last_changed_cells:
+            self.canvas.update_cells(changed)
+            self.stream_grid()
+
     def get_grid_state(self):
-        state = []
-        for row in self.buttons:
-            row_state = []
-            for btn in row:
-                if btn.colored and btn.cell_color is not None:
-                    rgb = (btn.cell_color.red(), btn.cell_color.green(), btn.cell_color.blue())
-                    row_state.append((True, rgb))
-                else:
-                    row_state.append((False, (0, 0, 0)))
-            state.append(row_state)
-        return state
+        return self.model.to_state()
 
     def set_grid_state(self, state):
-        for r, row in enumerate(state):
-            for c, cell_state in enumerate(row):
-                if r < len(self.buttons) and c < len(self.buttons[r]):
-                    btn = self.buttons[r][c]
-                    colored, rgb = cell_state
-                    btn.colored = colored
-                    btn.cell_color = QColor(*rgb) if colored else None
-                    btn.update()
-
-    def record_undo(self):
-        current_state = self.get_grid_state()
-        self.undo_stack.append(current_state)
-        self.redo_stack.clear()
+        """Apply a list-of-tuples state, touching only the cells that differ."""
+        self.model.load_state(state)
+        self.refresh_cells()
+
+    def record_undo(self, merge_key=None):
+        # The timeline and the frame being edited go with the grid, so undo
+        # never writes one frame's cells over another.
+        self.history.record(self.model, merge_key, self.frame_context())
+
+    def frame_context(self):
+        return self.timeline, self.timeline.snapshot(), self.current_frame
+
+    @staticmethod
+    def frame_context_nbytes(older, newer):
+        # Frames an undo step alone keeps alive, such as a replaced timeline, count towards the budget.
+        return Timeline.dropped_nbytes(older[1], newer[1])
+
+    def restore_frame_context(self, context):
+        timeline, frames, self.current_frame = context
+        self.playback_timer.stop()
+        if timeline is not self.timeline:
+            self.cancel_image_frames()
+            self.timeline = timeline
+        timeline.restore(frames)
+        self.update_frame_label()
 
     def undo(self):
-        if self.undo_stack:
-            current_state = self.get_grid_state()
-            self.redo_stack.append(current_state)
-            previous_state = self.undo_stack.pop()
-            self.set_grid_state(previous_state)
+        if self.history.can_undo():
+            self.history.undo(self.model, self.frame_context())
+            self.restore_frame_context(self.history.context)
+            self.sync_grid_size()
 
     def redo(self):
-        if self.redo_stack:
-            current_state = self.get_grid_state()
-            self.undo_stack.append(current_state)
-            next_state = self.redo_stack.pop()
-            self.set_grid_state(next_state)
+        if self.history.can_redo():
+            self.history.redo(self.model, self.frame_context())
+            self.restore_frame_context(self.history.context)
+            self.sync_grid_size()
 
     def shift_grid(self, direction, record_undo=True):
         if record_undo:
-            self.record_undo()
-        rows = self.num_rows
-        cols = self.num_cols
-        new_state = [[(False, (0, 0, 0)) for _ in range(cols)] for _ in range(rows)]
-        curr_state = self.get_grid_state()
-        for r in range(rows):
-            for c in range(cols):
-                if curr_state[r][c][0]:
-                    if direction == "left":
-                        new_c = c - 1
-                        if new_c >= 0:
-                            new_state[r][new_c] = curr_state[r][c]
-                    elif direction == "right":
-                        new_c = c + 1
-                        if new_c < cols:
-                            new_state[r][new_c] = curr_state[r][c]
-                    elif direction == "up":
-                        new_r = r - 1
-                        if new_r >= 0:
-                            new_state[new_r][c] = curr_state[r][c]
-                    elif direction == "down":
-                        new_r = r + 1
-                        if new_r < rows:
-                            new_state[new_r][c] = curr_state[r][c]
-        self.set_grid_state(new_state)
-
-    def map_color_to_index(self, color: QColor) -> int:
-        allowed_colors = {
-            0: QColor("black"),
-            1: QColor("red"),
-            2: QColor("green"),
-            3: QColor("blue"),
-            4: QColor("yellow"),
-            5: QColor("cyan"),
-            6: QColor("pink"),
-            7: QColor("white")
-        }
-        r, g, b, _ = color.getRgb()
-        best_index = 0
-        best_distance = float("inf")
-        for idx, allowed in allowed_colors.items():
-            ar, ag, ab, _ = allowed.getRgb()
-            dist = (r - ar) ** 2 + (g - ag) ** 2 + (b - ab) ** 2
-            if dist < best_distance:
-                best_distance = dist
-                best_index = idx
-        return best_index
+            # Auto-repeated Ctrl+arrow shifts collapse into a single undo entry.
+            self.record_undo(merge_key="shift_grid")
+        self.model.shift(direction)
+        self.refresh_cells()
 
     def export_grid_state(self):
         max_rows = self.num_rows
@@ -1022,53 +2587,8 @@ class MainWindow(QMainWindow):
             return
         try:
             with open(filename, "w") as f:
-                f.write(f"#export_format:{mode}\n")
-                if mode == "Colored":
-                    for row in self.buttons[start_row:end_row + 1]:
-                        line = ",".join(
-                            str(self.map_color_to_index(btn.cell_color if (btn.colored and btn.cell_color is not None)
-                                                        else QColor("black")))
-                            for btn in row
-                        )
-                        f.write(line + "\n")
-                elif mode == "Plain":
-                    for row in self.buttons[start_row:end_row + 1]:
-                        line = " ".join("1" if (
-                                btn.colored and btn.cell_color is not None and btn.cell_color.name() != "#000000") else "0"
-                                        for btn in row)
-                        f.write(line + "\n")
-                    f.write("\n#colors\n")
-                    for row in self.buttons[start_row:end_row + 1]:
-                        line_parts = []
-                        for btn in row:
-                            if btn.colored and btn.cell_color is not None:
-                                r_val, g_val, b_val, _ = btn.cell_color.getRgb()
-                                line_parts.append(f"{r_val},{g_val},{b_val}")
-                            else:
-                                line_parts.append("0,0,0")
-                        f.write(" ".join(line_parts) + "\n")
-                else:
-                    for row in self.buttons[start_row:end_row + 1]:
-                        row_values = ["1" if (
-                                btn.colored and btn.cell_color is not None and btn.cell_color.name() != "#000000") else "0"
-                                      for btn in row]
-                        groups = []
-                        group_size = 8
-                        for i in range(0, len(row_values), group_size):
-                            group = "".join(row_values[i:i + group_size])
-                            groups.append("0b" + group)
-                        line = ", ".join(groups) + ","
-                        f.write(line + "\n")
-                    f.write("\n#colors\n")
-                    for row in self.buttons[start_row:end_row + 1]:
-                        line_parts = []
-                        for btn in row:
-                            if btn.colored and btn.cell_color is not None:
-                                r_val, g_val, b_val, _ = btn.cell_color.getRgb()
-                                line_parts.append(f"{r_val},{g_val},{b_val}")
-                            else:
-                                line_parts.append("0,0,0")
-                        f.write(" ".join(line_parts) + "\n")
+                write_grid(f, self.model, mode, start_row, end_row, palette=self.palette,
+                           correction=self.export_correction())
         except Exception as e:
             print(f"Error exporting grid state: {e}")
 
@@ -1077,247 +2597,74 @@ class MainWindow(QMainWindow):
         if not filename:
             return
         try:
-            with open(filename, "r") as f:
-                lines = [line.rstrip("\r\n") for line in f]
-            export_mode = "Plain"
-            if lines and lines[0].startswith("#export_format:"):
-                export_mode = lines[0].split(":", 1)[1].strip()
-                lines = lines[1:]
-            if export_mode == "Colored":
-                imported_state = []
-                for line in lines:
-                    if not line.strip():
-                        continue
-                    parts = [p for p in line.split(",") if p != ""]
-                    row_state = [int(val) for val in parts]
-                    imported_state.append(row_state)
-                color_mapping = {
-                    0: QColor("black"),
-                    1: QColor("red"),
-                    2: QColor("green"),
-                    3: QColor("blue"),
-                    4: QColor("yellow"),
-                    5: QColor("cyan"),
-                    6: QColor("pink"),
-                    7: QColor("white")
-                }
-                self.record_undo()
-                for r in range(min(len(imported_state), self.num_rows)):
-                    for c in range(min(len(imported_state[r]), self.num_cols)):
-                        btn = self.buttons[r][c]
-                        val = imported_state[r][c]
-                        btn.colored = True
-                        btn.cell_color = color_mapping.get(val, self.default_color)
-                        btn.update()
-            elif export_mode == "Formatted":
-                imported_state = []
-                for line in lines:
-                    if not line.strip():
-                        continue
-                    groups = [grp.strip() for grp in line.split(",") if grp.strip()]
-                    row_str = ""
-                    for grp in groups:
-                        if grp.startswith("0b"):
-                            row_str += grp[2:]
-                    row_bool = [True if ch == "1" else False for ch in row_str]
-                    imported_state.append(row_bool)
-                self.record_undo()
-                for r in range(min(len(imported_state), self.num_rows)):
-                    for c in range(min(len(imported_state[r]), self.num_cols)):
-                        btn = self.buttons[r][c]
-                        if imported_state[r][c]:
-                            btn.colored = True
-                            btn.cell_color = self.default_color
-                        else:
-                            btn.colored = False
-                            btn.cell_color = None
-                        btn.update()
-                if "#colors" in lines:
-                    index = lines.index("#colors")
-                    color_data = lines[index + 1:]
-                    for r in range(min(len(color_data), self.num_rows)):
-                        parts = color_data[r].split()
-                        for c in range(min(len(parts), self.num_cols)):
-                            rgb_parts = parts[c].split(",")
-                            if len(rgb_parts) >= 3:
-                                r_val = int(rgb_parts[0])
-                                g_val = int(rgb_parts[1])
-                                b_val = int(rgb_parts[2])
-                                btn = self.buttons[r][c]
-                                btn.cell_color = QColor(r_val, g_val, b_val)
-                                btn.colored = True
-                                btn.update()
-            else:
-                main_data = lines
-                color_data = []
-                if "#colors" in lines:
-                    index = lines.index("#colors")
-                    main_data = lines[:index]
-                    color_data = lines[index + 1:]
-                imported_state = []
-                for line in main_data:
-                    if not line.strip():
-                        continue
-                    row_bool = [True if val == "1" else False for val in line.split()]
-                    imported_state.append(row_bool)
-                self.record_undo()
-                for r in range(min(len(imported_state), self.num_rows)):
-                    for c in range(min(len(imported_state[r]), self.num_cols)):
-                        btn = self.buttons[r][c]
-                        if imported_state[r][c]:
-                            btn.colored = True
-                            if color_data and r < len(color_data):
-                                parts = color_data[r].split()
-                                if c < len(parts):
-                                    rgb_parts = parts[c].split(",")
-                                    if len(rgb_parts) >= 3:
-                                        r_val = int(rgb_parts[0])
-                                        g_val = int(rgb_parts[1])
-                                        b_val = int(rgb_parts[2])
-                                        btn.cell_color = QColor(r_val, g_val, b_val)
-                                    else:
-                                        btn.cell_color = self.default_color
-                            else:
-                                btn.cell_color = self.default_color
-                        else:
-                            btn.colored = False
-                            btn.cell_color = None
-                        btn.update()
+            parsed = read_grid_file(filename, qcolor_to_rgb(self.default_color), self.palette)
+            self.record_undo()
+            apply_import(self.model, parsed)
+            self.refresh_cells()
+        except ParseError as e:
+            QMessageBox.warning(self, "Import Grid State", f"Could not import {filename}:\n{e}")
         except Exception as e:
             print(f"Error importing grid state: {e}")
 
     def merge_import_grid_state(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "Merge Import Grid State", "", "Text Files (*.txt)")
+        filenames, _ = QFileDialog.getOpenFileNames(self, "Merge Import Grid State", "", "Text Files (*.txt)")
+        if not filenames:
+            return
+        dialog = MergeModeDialog(self.merge_mode, len(filenames), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.merge_mode = dialog.getValues()
+        default_rgb = qcolor_to_rgb(self.default_color)
+        grids = []
+        for filename in filenames:
+            try:
+                grids.append(read_grid_file(filename, default_rgb, self.palette))
+            except ParseError as e:
+                QMessageBox.warning(self, "Merge Import Grid State", f"Could not import {filename}:\n{e}")
+                return
+            except Exception as e:
+                print(f"Error merging imported grid state: {e}")
+                return
+        self.record_undo()
+        merge_grids(self.model, grids, self.merge_mode)
+        self.refresh_cells()
+
+    def export_binary_state(self):
+        dialog = ExportSettingsDialog(self.num_rows, self, formats=BINARY_FORMATS, default_format="rgb565")
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        start_row, end_row, fmt = dialog.getValues()
+        if start_row > end_row:
+            start_row, end_row = end_row, start_row
+        filename, _ = QFileDialog.getSaveFileName(self, "Export Binary Grid", "", "Binary Grid Files (*.bin)")
         if not filename:
             return
+        rows = slice(start_row, end_row + 1)
         try:
-            with open(filename, "r") as f:
-                lines = [line.rstrip("\r\n") for line in f]
-            export_mode = "Plain"
-            if lines and lines[0].startswith("#export_format:"):
-                export_mode = lines[0].split(":", 1)[1].strip()
-                lines = lines[1:]
-            if export_mode == "Colored":
-                imported_state = []
-                for line in lines:
-                    if not line.strip():
-                        continue
-                    parts = [p for p in line.split(",") if p != ""]
-                    row_state = [int(val) for val in parts]
-                    imported_state.append(row_state)
-                color_mapping = {
-                    0: QColor("black"),
-                    1: QColor("red"),
-                    2: QColor("green"),
-                    3: QColor("blue"),
-                    4: QColor("yellow"),
-                    5: QColor("cyan"),
-                    6: QColor("pink"),
-                    7: QColor("white")
-                }
-                current_state = self.get_grid_state()
-                new_state = []
-                for r in range(min(len(current_state), len(imported_state))):
-                    new_row = []
-                    for c in range(min(len(current_state[r]), len(imported_state[r]))):
-                        val = imported_state[r][c]
-                        new_row.append((True, (
-                            color_mapping.get(val, self.default_color).red(),
-                            color_mapping.get(val, self.default_color).green(),
-                            color_mapping.get(val, self.default_color).blue())))
-                    new_state.append(new_row)
-                self.record_undo()
-                self.set_grid_state(new_state)
-            elif export_mode == "Formatted":
-                imported_state = []
-                for line in lines:
-                    if not line.strip():
-                        continue
-                    groups = [grp.strip() for grp in line.split(",") if grp.strip()]
-                    row_str = ""
-                    for grp in groups:
-                        if grp.startswith("0b"):
-                            row_str += grp[2:]
-                    row_bool = [True if ch == "1" else False for ch in row_str]
-                    imported_state.append(row_bool)
-                current_state = self.get_grid_state()
-                new_state = []
-                for r in range(min(len(current_state), len(imported_state))):
-                    new_row = []
-                    for c in range(min(len(current_state[r]), len(imported_state[r]))):
-                        if imported_state[r][c]:
-                            new_row.append((True, (
-                                self.default_color.red(), self.default_color.green(), self.default_color.blue())))
-                        else:
-                            new_row.append(current_state[r][c])
-                    new_state.append(new_row)
-                self.record_undo()
-                self.set_grid_state(new_state)
-                if "#colors" in lines:
-                    index = lines.index("#colors")
-                    color_data = lines[index + 1:]
-                    for r in range(min(len(color_data), self.num_rows)):
-                        parts = color_data[r].split()
-                        for c in range(min(len(parts), self.num_cols)):
-                            rgb_parts = parts[c].split(",")
-                            if len(rgb_parts) >= 3:
-                                r_val = int(rgb_parts[0])
-                                g_val = int(rgb_parts[1])
-                                b_val = int(rgb_parts[2])
-                                btn = self.buttons[r][c]
-                                btn.cell_color = QColor(r_val, g_val, b_val)
-                                btn.colored = True
-                                btn.update()
-            else:
-                main_data = lines
-                color_data = []
-                if "#colors" in lines:
-                    index = lines.index("#colors")
-                    main_data = lines[:index]
-                    color_data = lines[index + 1:]
-                imported_state = []
-                for line in main_data:
-                    if not line.strip():
-                        continue
-                    row_bool = [True if val == "1" else False for val in line.split()]
-                    imported_state.append(row_bool)
-                current_state = self.get_grid_state()
-                new_state = []
-                for r in range(min(len(current_state), len(imported_state))):
-                    new_row = []
-                    for c in range(min(len(current_state[r]), len(imported_state[r]))):
-                        if imported_state[r][c]:
-                            if color_data and r < len(color_data):
-                                parts = color_data[r].split()
-                                if c < len(parts):
-                                    rgb_parts = parts[c].split(",")
-                                    if len(rgb_parts) >= 3:
-                                        r_val = int(rgb_parts[0])
-                                        g_val = int(rgb_parts[1])
-                                        b_val = int(rgb_parts[2])
-                                        new_row.append((True, (r_val, g_val, b_val)))
-                                    else:
-                                        new_row.append(current_state[r][c])
-                                else:
-                                    new_row.append(current_state[r][c])
-                            else:
-                                new_row.append((True, (
-                                    self.default_color.red(), self.default_color.green(), self.default_color.blue())))
-                        else:
-                            new_row.append(current_state[r][c])
-                    new_state.append(new_row)
-                self.record_undo()
-                self.set_grid_state(new_state)
+            colors = bake_colors(self.model.colors[rows], fmt, self.export_correction())
+            binary_format.save(filename, self.model.on[rows], colors, fmt, self.palette)
+        except Exception as e:
+            print(f"Error exporting binary grid: {e}")
+
+    def import_binary_state(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Import Binary Grid", "", "Binary Grid Files (*.bin)")
+        if not filename:
+            return
+        try:
+            grid = binary_format.load(filename, self.palette, qcolor_to_rgb(self.default_color))
+            if not len(grid):
+                raise ValueError("file has no frames")
+            on, colors = grid.frame(0)
+            self.record_undo()
+            self.model.paste(on, colors)
+            self.refresh_cells()
         except Exception as e:
-            print(f"Error merging imported grid state: {e}")
+            print(f"Error importing binary grid: {e}")
 
     def reset_grid(self):
         self.record_undo()
-        for row in self.buttons:
-            for btn in row:
-                btn.colored = False
-                btn.cell_color = None
-                btn.update()
+        self.model.clear()
+        self.refresh_cells()
 
     def copy_formatted_to_clipboard(self):
         max_rows = self.num_rows
@@ -1327,36 +2674,22 @@ class MainWindow(QMainWindow):
         start_row, end_row, mode = dialog.getValues()
         if start_row > end_row:
             start_row, end_row = end_row, start_row
-        output = ""
-        if mode == "Colored":
-            for row in self.buttons[start_row:end_row + 1]:
-                line = ",".join(
-                    str(self.map_color_to_index(btn.cell_color if (btn.colored and btn.cell_color is not None)
-                                                else QColor("black")))
-                    for btn in row
-                )
-                output += line + "\n"
-        elif mode == "Plain":
-            for row in self.buttons[start_row:end_row + 1]:
-                line = " ".join(
-                    "1" if (btn.colored and btn.cell_color is not None and btn.cell_color.name() != "#000000") else "0"
-                    for btn in row)
-                output += line + "\n"
-        else:
-            for row in self.buttons[start_row:end_row + 1]:
-                row_values = [
-                    "1" if (btn.colored and btn.cell_color is not None and btn.cell_color.name() != "#000000") else "0"
-                    for btn in row]
-                groups = []
-                group_size = 8
-                for i in range(0, len(row_values), group_size):
-                    group = "".join(row_values[i:i + group_size])
-                    groups.append("0b" + group)
-                line = ", ".join(groups) + ","
-                output += line + "\n"
+        output = export_grid(self.model, mode, start_row, end_row, header=False, color_section=False,
+                             palette=self.palette)
         clipboard = QApplication.clipboard()
         clipboard.setText(output)
 
+    def copy_code_to_clipboard(self):
+        dialog = CodeExportSettingsDialog(self.num_rows, self.code_settings, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        start_row, end_row, self.code_settings = dialog.getValues()
+        if start_row > end_row:
+            start_row, end_row = end_row, start_row
+        settings = dict(self.code_settings)
+        output = export_code(self.model, settings.pop("language"), start_row, end_row, **settings)
+        QApplication.clipboard().setText(output)
+
     def choose_global_paint_color(self):
         chosen = QColorDialog.getColor(self.default_color, self, "Select Paint Mode Color")
         if chosen.isValid():
@@ -1368,11 +2701,8 @@ class MainWindow(QMainWindow):
         if not chosen.isValid():
             return
         self.record_undo()
-        for row in self.buttons:
-            for btn in row:
-                if btn.colored:
-                    btn.cell_color = chosen
-                    btn.update()
+        self.model.recolor(self.model.on, qcolor_to_rgb(chosen))
+        self.refresh_cells()
 
     def change_all_picked_cells_color(self):
         if self.picked_color is None:
@@ -1380,31 +2710,32 @@ class MainWindow(QMainWindow):
         chosen = QColorDialog.getColor(self.default_color, self, "Select New Color for Picked Cells")
         if chosen.isValid():
             self.record_undo()
-            for row in self.buttons:
-                for btn in row:
-                    if btn.colored and btn.cell_color == self.picked_color:
-                        btn.cell_color = chosen
-                        btn.update()
+            self.model.recolor(self.model.color_mask(qcolor_to_rgb(self.picked_color)), qcolor_to_rgb(chosen))
+            self.refresh_cells()
+
+    def uncolor_all_cells_with_color(self, color):
+        self.model.turn_off(self.model.color_mask(qcolor_to_rgb(color)))
+        self.refresh_cells()
 
     def change_all_cells_to_allowed_colors(self):
         self.record_undo()
-        allowed_colors = {
-            0: QColor("black"),
-            1: QColor("red"),
-            2: QColor("green"),
-            3: QColor("blue"),
-            4: QColor("yellow"),
-            5: QColor("cyan"),
-            6: QColor("pink"),
-            7: QColor("white")
-        }
-        for row in self.buttons:
-            for btn in row:
-                if btn.colored and btn.cell_color is not None:
-                    index = self.map_color_to_index(btn.cell_color)
-                    btn.cell_color = allowed_colors[index]
-                    btn.update()
+        self.model.assign(self.model.on, self.palette.quantize(self.model.colors))
+        self.refresh_cells()
+
+    def load_palette(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Load Palette", "", "Palette Files (*.txt *.pal);;All Files (*)")
+        if not filename:
+            return
+        try:
+            self.palette = Palette.load(filename)
+        except Exception as e:
+            print(f"Error loading palette: {e}")
+            return
+        self.statusBar().showMessage(f"Palette: {len(self.palette)} colors")
 
+    def reset_palette(self):
+        self.palette = FIRMWARE_PALETTE
+        self.statusBar().showMessage(f"Palette: {len(self.palette)} colors")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
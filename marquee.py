@@ -0,0 +1,107 @@
+"""Scrolling text as one rendered strip plus a table of window offsets.
+
+The text is rasterized once, padded with a blank screen on both sides, and
+frame ``i`` is the grid-sized window of the strip starting at
+``offsets[i]`` -- a NumPy view, never a copy or a re-render.  The strip and
+the offset table are also what firmware stores, so the MCU only has to copy
+a window per frame (see ``iter_strip_code``).
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import codegen
+from text_render import render_text_strip
+
+DIRECTIONS = ("left", "right", "up", "down")
+
+
+class Marquee:
+    """A padded text strip scrolled across a ``rows`` x ``cols`` grid.
+
+    ``speed`` is the number of cells the text moves per frame.  One pass
+    runs from a blank screen until the text has fully left it again.
+    """
+
+    def __init__(self, on, colors, rows, cols, direction="left", speed=1):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        if speed < 1:
+            raise ValueError(f"Speed must be at least 1 cell per frame, got {speed}")
+        self.rows, self.cols = rows, cols
+        self.direction = direction
+        self.horizontal = direction in ("left", "right")
+        axis = 1 if self.horizontal else 0
+        pad = cols if self.horizontal else rows
+        padding = [(0, 0), (0, 0)]
+        padding[axis] = (pad, pad)
+        self.on = np.pad(np.asarray(on, dtype=bool), padding)
+        self.colors = np.pad(np.asarray(colors, dtype=np.uint8), padding + [(0, 0)])
+        period = np.asarray(on).shape[axis] + pad
+        if direction in ("left", "up"):
+            self.steps = slice(0, period, speed)
+        else:
+            self.steps = slice(period, 0, -speed)
+        self.offsets = np.arange(self.steps.start, self.steps.stop, self.steps.step)
+
+    @classmethod
+    def from_text(cls, text, rows=32, cols=64, direction="left", speed=1, **options):
+        """Render ``text`` once; ``options`` go to ``text_render.render_text_strip``."""
+        if direction in ("left", "right"):
+            on, colors = render_text_strip(text, rows=rows, **options)
+        else:
+            on, colors = render_text_strip(text, cols=cols, **options)
+        return cls(on, colors, rows, cols, direction, speed)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def frame(self, index):
+        """Frame ``index`` as ``(on, colors)`` views into the strip."""
+        offset = self.offsets[index]
+        if self.horizontal:
+            window = (slice(None), slice(offset, offset + self.cols))
+        else:
+            window = (slice(offset, offset + self.rows), slice(None))
+        return self.on[window], self.colors[window]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.frame(index)
+
+    def stack(self):
+        """Every frame as ``bool[F, H, W]``/``uint8[F, H, W, 3]`` views of the strip."""
+        if self.horizontal:
+            on = sliding_window_view(self.on, self.cols, axis=1)[:, self.steps]
+            colors = sliding_window_view(self.colors, self.cols, axis=1)[:, self.steps]
+            return on.transpose(1, 0, 2), colors.transpose(1, 0, 3, 2)
+        on = sliding_window_view(self.on, self.rows, axis=0)[self.steps]
+        colors = sliding_window_view(self.colors, self.rows, axis=0)[self.steps]
+        return on.transpose(0, 2, 1), colors.transpose(0, 3, 1, 2)
+
+
+def iter_strip_code(marquee, language="C", name="marquee", word_bits=8, order=None, bit_order="msb",
+                    progmem=True):
+    """Yield the strip's lit mask and its offset table as source code.
+
+    Frame ``i`` is the window of the strip starting at line
+    ``<name>_offsets[i]``.  ``order`` defaults to ``column`` for horizontal
+    scrolling and ``row`` for vertical, so a window is a run of whole lines.
+    """
+    if order is None:
+        order = "column" if marquee.horizontal else "row"
+    size, unit = (marquee.cols, "columns") if marquee.horizontal else (marquee.rows, "rows")
+    comment = "#" if language == "MicroPython" else "//"
+    table = codegen.c_identifier(name + "_offsets")
+    if language != "C":
+        table = table.upper()
+    yield (f"{comment} {marquee.direction} marquee, {len(marquee)} frames: frame i shows the {size} {unit} "
+           f"of the strip starting at {unit[:-1]} {table}[i]\n")
+    yield from codegen.iter_code(marquee.on, language, name, word_bits, order, bit_order, progmem)
+    yield "\n"
+    yield from codegen.iter_table(marquee.offsets, language, name + "_offsets", progmem, includes=False)
+
+
+def write_strip_code(writer, marquee, language="C", name="marquee", **options):
+    """Stream ``iter_strip_code`` to anything with a ``write(str)`` method."""
+    for chunk in iter_strip_code(marquee, language, name, **options):
+        writer.write(chunk)
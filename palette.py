@@ -0,0 +1,100 @@
+"""Color palettes with a precomputed RGB -> palette-index lookup table.
+
+The table has one entry per RGB555 bucket (32768 entries).  A bucket whose
+eight corner colors all map to the same palette entry maps every color in
+it to that entry, because nearest-color regions are convex; only pixels in
+the few buckets that straddle a boundary are resolved exactly.  Results are
+therefore identical to a full nearest-color search.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from imaging import DEFAULT_PALETTE, nearest_palette_index
+
+
+@lru_cache(maxsize=16)
+def _build_tables(colors):
+    """Return ``(index, ambiguous)`` tables over the RGB555 buckets for ``colors``."""
+    low = np.arange(32, dtype=np.int32) << 3
+    r, g, b = np.meshgrid(low, low, low, indexing="ij")
+    base = np.stack([r, g, b], axis=-1).reshape(-1, 1, 3)
+    corners = np.array([[dr, dg, db] for dr in (0, 7) for dg in (0, 7) for db in (0, 7)], dtype=np.int32)
+    # 262144 corner colors; the search runs in bounded blocks, so large palettes stay cheap.
+    corner_index = nearest_palette_index(base + corners, colors)
+    index = corner_index[:, 0]
+    ambiguous = np.any(corner_index != index[:, None], axis=1)
+    dtype = np.uint8 if len(colors) <= 256 else np.uint16
+    return index.astype(dtype), ambiguous
+
+
+class Palette:
+    """An ordered list of RGB colors; indices are what Colored exports store."""
+
+    def __init__(self, colors, name=""):
+        self.colors = tuple(tuple(int(v) for v in rgb) for rgb in colors)
+        if not self.colors:
+            raise ValueError("A palette needs at least one color")
+        if any(len(rgb) != 3 or not all(0 <= v <= 255 for v in rgb) for rgb in self.colors):
+            raise ValueError("Palette colors must be (r, g, b) triples in 0-255")
+        self.name = name
+        self.array = np.array(self.colors, dtype=np.uint8)
+
+    @classmethod
+    def load(cls, filename):
+        """Read a palette file: one ``r,g,b`` or ``#rrggbb`` color per line, ``#``/``;`` comments."""
+        colors = []
+        with open(filename, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith(";") or (line.startswith("#") and len(line) != 7):
+                    continue
+                if line.startswith("#"):
+                    colors.append(tuple(int(line[i:i + 2], 16) for i in (1, 3, 5)))
+                else:
+                    colors.append(tuple(int(v) for v in line.replace(",", " ").split()[:3]))
+        return cls(colors, name=filename)
+
+    def save(self, filename):
+        with open(filename, "w") as f:
+            for r, g, b in self.colors:
+                f.write(f"{r},{g},{b}\n")
+
+    def __len__(self):
+        return len(self.colors)
+
+    def __iter__(self):
+        return iter(self.colors)
+
+    def __getitem__(self, index):
+        return self.colors[index]
+
+    def __eq__(self, other):
+        return isinstance(other, Palette) and self.colors == other.colors
+
+    def __hash__(self):
+        return hash(self.colors)
+
+    def index(self, rgb):
+        """Map a ``uint8[..., 3]`` array to palette indices with one table gather."""
+        rgb = np.asarray(rgb, dtype=np.uint8)
+        table, ambiguous = _build_tables(self.colors)
+        bucket = rgb.astype(np.uint16) >> 3
+        key = (bucket[..., 0] << 10) | (bucket[..., 1] << 5) | bucket[..., 2]
+        index = table[key]
+        exact = ambiguous[key]
+        if exact.any():
+            index[exact] = nearest_palette_index(rgb[exact], self.colors)
+        return index
+
+    def quantize(self, rgb):
+        """Replace every color in ``rgb`` with its nearest palette color."""
+        return self.array[self.index(rgb)]
+
+
+FIRMWARE_PALETTE = Palette(DEFAULT_PALETTE, name="firmware")
+
+
+def as_palette(palette):
+    """Accept a ``Palette`` or any sequence of RGB triples."""
+    return palette if isinstance(palette, Palette) else Palette(palette)
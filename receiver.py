@@ -0,0 +1,213 @@
+"""Virtual display: receive frames from firmware running on the host.
+
+Frames are ``rows * cols * 3`` RGB bytes of the row-major frame buffer --
+the ``rgb888`` binary layout without a header -- in one of two protocols:
+
+    Raw  over UDP every datagram is one whole frame; over TCP or a Unix
+         socket frames follow each other back to back.
+    DDP  the packets ``streaming.FrameStreamer`` sends: each writes its
+         payload at its byte offset and the push flag completes the frame.
+         Over TCP or a Unix socket every packet starts with the serial
+         sync bytes ``A5 5A``, exactly as on a serial link.
+
+``FrameReceiver`` reads on a background thread into a back buffer and
+publishes each completed frame to ``frame``, bumping ``sequence``.  A
+reader that polls slower than frames arrive simply sees the newest one;
+nothing queues up behind it.
+"""
+import os
+import socket
+import threading
+
+import numpy as np
+
+from streaming import DDP_HEADER, DDP_PORT, DDP_PUSH, DDP_VERSION, SERIAL_SYNC
+
+RECEIVE_TRANSPORTS = ("UDP", "TCP", "Unix")
+PROTOCOLS = ("Raw", "DDP")
+
+# How often a blocked receive wakes up to check whether it should stop.
+POLL_INTERVAL = 0.2
+
+
+class FrameReceiver:
+    """Listens on ``address`` for frames of a ``rows`` x ``cols`` grid.
+
+    ``address`` is ``(host, port)`` for UDP and TCP and a socket path for
+    Unix; port 0 picks a free port, reported in ``address`` afterwards.
+    TCP and Unix sockets serve one sender at a time.  ``frames_received``,
+    ``bytes_received`` and ``frames_invalid`` count what arrived so far;
+    ``connections_dropped`` counts senders lost to an error, the last of
+    which is kept in ``connection_error``.
+    """
+
+    def __init__(self, rows, cols, transport="UDP", address=("127.0.0.1", DDP_PORT), protocol="Raw"):
+        if transport not in RECEIVE_TRANSPORTS:
+            raise ValueError(f"Unknown transport: {transport}")
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.transport = transport
+        self.protocol = protocol
+        self.frame = np.zeros((rows, cols, 3), dtype=np.uint8)
+        self.frame_size = self.frame.size
+        self.sequence = 0
+        self.frames_received = 0
+        self.frames_invalid = 0
+        self.bytes_received = 0
+        self.connections_dropped = 0
+        self.connection_error = None
+        self.error = None
+        self._back = np.zeros(self.frame_size, dtype=np.uint8)
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+
+        if transport == "Unix":
+            if os.path.exists(address):
+                os.unlink(address)
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        elif transport == "TCP":
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Room for a burst of frames while the thread is descheduled.
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        try:
+            self.sock.bind(address)
+            if transport != "UDP":
+                self.sock.listen(1)
+        except OSError:
+            self.sock.close()
+            raise
+        self.sock.settimeout(POLL_INTERVAL)
+        self.address = self.sock.getsockname()
+        target = self._receive_datagrams if transport == "UDP" else self._serve
+        self._thread = threading.Thread(target=target, name="FrameReceiver", daemon=True)
+        self._thread.start()
+
+    def copy_to(self, colors):
+        """Copy the newest frame into ``uint8[rows, cols, 3]`` ``colors``; returns its sequence."""
+        with self._lock:
+            np.copyto(colors, self.frame)
+            return self.sequence
+
+    def close(self):
+        self._closing.set()
+        self._thread.join()
+        self.sock.close()
+        if self.transport == "Unix":
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+    def _publish(self):
+        with self._lock:
+            self.frame.reshape(-1)[:] = self._back
+            self.sequence += 1
+        self.frames_received += 1
+
+    def _apply_ddp(self, packet):
+        """Write one DDP packet into the back buffer; publish on push."""
+        if len(packet) < DDP_HEADER.size:
+            self.frames_invalid += 1
+            return
+        flags, _, _, _, offset, length = DDP_HEADER.unpack_from(packet)
+        payload = packet[DDP_HEADER.size:DDP_HEADER.size + length]
+        if flags & 0xC0 != DDP_VERSION or len(payload) != length or offset + length > self.frame_size:
+            self.frames_invalid += 1
+            return
+        self._back[offset:offset + length] = np.frombuffer(payload, dtype=np.uint8)
+        if flags & DDP_PUSH:
+            self._publish()
+
+    def _receive_datagrams(self):
+        data = bytearray(65536)
+        while not self._closing.is_set():
+            try:
+                size = self.sock.recv_into(data)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                self.error = e
+                return
+            self.bytes_received += size
+            if self.protocol == "DDP":
+                self._apply_ddp(memoryview(data)[:size])
+            elif size == self.frame_size:
+                self._back[:] = np.frombuffer(data, dtype=np.uint8, count=size)
+                self._publish()
+            else:
+                self.frames_invalid += 1
+
+    def _serve(self):
+        while not self._closing.is_set():
+            try:
+                connection, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError as e:
+                self.error = e
+                return
+            with connection:
+                connection.settimeout(POLL_INTERVAL)
+                try:
+                    if self.protocol == "DDP":
+                        self._receive_ddp_stream(connection)
+                    else:
+                        self._receive_raw_stream(connection)
+                except OSError as e:
+                    # A sender going away is routine; wait for the next one.
+                    self.connections_dropped += 1
+                    self.connection_error = e
+
+    def _receive_raw_stream(self, connection):
+        view = memoryview(self._back)
+        filled = 0
+        while not self._closing.is_set():
+            try:
+                size = connection.recv_into(view[filled:])
+            except socket.timeout:
+                continue
+            if not size:
+                return
+            self.bytes_received += size
+            filled += size
+            if filled == self.frame_size:
+                self._publish()
+                filled = 0
+
+    def _receive_ddp_stream(self, connection):
+        pending = bytearray()
+        while not self._closing.is_set():
+            try:
+                data = connection.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                return
+            self.bytes_received += len(data)
+            pending += data
+            start = 0
+            while True:
+                sync = pending.find(SERIAL_SYNC, start)
+                if sync < 0:
+                    # Keep a trailing A5 that may start the next sync.
+                    start = max(len(pending) - 1, start)
+                    break
+                header = sync + len(SERIAL_SYNC)
+                if len(pending) < header + DDP_HEADER.size:
+                    start = sync
+                    break
+                if pending[header] & 0xC0 != DDP_VERSION:
+                    # Sync bytes inside a payload; resynchronize past them.
+                    self.frames_invalid += 1
+                    start = sync + 1
+                    continue
+                end = header + DDP_HEADER.size + DDP_HEADER.unpack_from(pending, header)[5]
+                if len(pending) < end:
+                    start = sync
+                    break
+                self._apply_ddp(bytes(pending[header:end]))
+                start = end
+            del pending[:start]
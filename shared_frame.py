@@ -0,0 +1,129 @@
+"""Shared-memory frame buffer: a mapped file other processes draw into.
+
+The file (on Linux, ``/dev/shm/<name>`` is the POSIX shared-memory object
+``shm_open("/<name>")``) is laid out little-endian as::
+
+    offset 0   4s   magic ``LEDF``
+    offset 4   u16  version (1)
+    offset 6   u16  rows
+    offset 8   u16  cols
+    offset 16  u64  sequence
+    offset 64  u8   pixels[rows][cols][3], RGB, row-major
+
+``sequence`` is a seqlock: a writer makes it odd before touching the
+pixels and even again, two higher, once the frame is complete.  A reader
+that sees an odd value, or a different value after copying, has caught a
+frame mid-write and skips it.  ``sequence // 2`` is the number of frames
+written since the file was created.
+"""
+import mmap
+import os
+import struct
+
+import numpy as np
+
+HEADER = struct.Struct("<4sHHH6xQ")
+MAGIC = b"LEDF"
+VERSION = 1
+SEQUENCE_OFFSET = 16
+PIXELS_OFFSET = 64
+
+
+def shm_path(name):
+    """``name`` as a file path; a bare name lives in ``/dev/shm``."""
+    if os.sep in name:
+        return name
+    return os.path.join("/dev/shm", name)
+
+
+def file_shape(fd):
+    """``(rows, cols)`` of the frame buffer in open file ``fd``, or ``None`` if it is not a whole one."""
+    header = os.pread(fd, HEADER.size, 0)
+    if len(header) < HEADER.size:
+        return None
+    magic, version, rows, cols, _ = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or os.fstat(fd).st_size < PIXELS_OFFSET + rows * cols * 3:
+        return None
+    return rows, cols
+
+
+class SharedFrameBuffer:
+    """A mapped frame buffer of a ``rows`` x ``cols`` grid.
+
+    ``frame`` is a ``uint8[rows, cols, 3]`` view of the mapping itself.
+    With ``create`` a missing or empty file is made; an existing file that
+    is not a frame buffer of that shape raises ``ValueError`` and is left
+    alone, since truncating a file other processes map crashes them.
+    """
+
+    def __init__(self, path, rows=None, cols=None, create=False):
+        self.path = shm_path(path)
+        fd = os.open(self.path, os.O_RDWR | (os.O_CREAT if create else 0), 0o666)
+        try:
+            if create and rows is not None and os.fstat(fd).st_size == 0:
+                os.ftruncate(fd, PIXELS_OFFSET + rows * cols * 3)
+                os.pwrite(fd, HEADER.pack(MAGIC, VERSION, rows, cols, 0), 0)
+            shape = file_shape(fd)
+            if shape is None:
+                raise ValueError(f"Not a frame buffer: {self.path}")
+            if rows is not None and shape != (rows, cols):
+                raise ValueError(f"{self.path} is a {shape[0]}x{shape[1]} frame buffer, not {rows}x{cols}")
+            self.rows, self.cols = shape
+            self.map = mmap.mmap(fd, PIXELS_OFFSET + self.rows * self.cols * 3)
+        except Exception:
+            os.close(fd)
+            raise
+        self.fd = fd
+        self._sequence = np.frombuffer(self.map, dtype="<u8", count=1, offset=SEQUENCE_OFFSET)
+        self.frame = np.frombuffer(self.map, dtype=np.uint8, offset=PIXELS_OFFSET).reshape(self.rows, self.cols, 3)
+        self.error = None
+        self._last = -1
+
+    @property
+    def sequence(self):
+        return int(self._sequence[0])
+
+    @property
+    def frames_received(self):
+        return self.sequence // 2
+
+    def begin_write(self):
+        """Mark the frame as being written; draw into ``frame``, then ``end_write``."""
+        self._sequence[0] = self.sequence | 1
+
+    def end_write(self):
+        self._sequence[0] = (self.sequence | 1) + 1
+
+    def write(self, colors):
+        """Copy ``uint8[rows, cols, 3]`` colors in as one complete frame."""
+        self.begin_write()
+        np.copyto(self.frame, colors)
+        self.end_write()
+
+    def copy_to(self, colors):
+        """Copy the newest complete frame into ``colors``; returns its sequence.
+
+        A frame caught mid-write is not copied and the previous sequence is
+        returned, so the caller simply tries again later.  If another
+        process shrank or reshaped the file, ``error`` is set instead of
+        touching the mapping.
+        """
+        if file_shape(self.fd) != (self.rows, self.cols):
+            self.error = ValueError(f"{self.path} is no longer a {self.rows}x{self.cols} frame buffer")
+            return self._last
+        before = self.sequence
+        if before != self._last and not before & 1:
+            np.copyto(colors, self.frame)
+            if self.sequence == before:
+                self._last = before
+        return self._last
+
+    def unlink(self):
+        """Remove the file; processes that still map it keep their pages."""
+        os.unlink(self.path)
+
+    def close(self):
+        # Views into the mapping must go before it can be closed.
+        self.frame = self._sequence = None
+        self.map.close()
+        os.close(self.fd)
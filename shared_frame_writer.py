@@ -0,0 +1,62 @@
+"""Reference writer for the shared-memory frame buffer.
+
+    python shared_frame_writer.py led-grid --rows 32 --cols 64 --fps 120
+
+Draws a moving color gradient straight into the mapped frame buffer.  To
+see it, pick "Shared Memory" under Listen On in Options > Virtual Display
+Settings, with the same name and grid size, and turn on Options > Virtual
+Display (Ctrl+Shift+V).  The same protocol in C::
+
+    volatile uint64_t *sequence = (uint64_t *)(base + 16);
+    uint8_t *pixels = base + 64;
+    *sequence |= 1;                       // frame is being written
+    __sync_synchronize();
+    memcpy(pixels, frame, rows * cols * 3);
+    __sync_synchronize();
+    *sequence += 1;                       // even again: frame complete
+"""
+import argparse
+import time
+
+import numpy as np
+
+from shared_frame import SharedFrameBuffer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Animate a shared-memory LED frame buffer.")
+    parser.add_argument("path", help="file path, or a name in /dev/shm")
+    parser.add_argument("--rows", type=int, default=32)
+    parser.add_argument("--cols", type=int, default=64)
+    parser.add_argument("--fps", type=float, default=60.0)
+    parser.add_argument("--frames", type=int, default=0, help="stop after this many frames (0: run until Ctrl+C)")
+    args = parser.parse_args(argv)
+
+    try:
+        buffer = SharedFrameBuffer(args.path, args.rows, args.cols, create=True)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    y, x = np.mgrid[0:args.rows, 0:args.cols]
+    phase = (x / args.cols + y / args.rows / 2)[..., None] + np.array([0.0, 1 / 3, 2 / 3])
+    start = time.perf_counter()
+    count = 0
+    try:
+        while not args.frames or count < args.frames:
+            t = count / args.fps
+            buffer.begin_write()
+            # Draw in place: the mapping is the frame buffer.
+            buffer.frame[...] = 127.5 + 127.5 * np.sin(2 * np.pi * (phase + t / 2))
+            buffer.end_write()
+            count += 1
+            delay = start + count / args.fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        buffer.close()
+    print(f"Wrote {count} frames to {buffer.path}")
+
+
+if __name__ == "__main__":
+    main()
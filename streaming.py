@@ -0,0 +1,222 @@
+"""Live output: push frames to a panel over UDP or a serial port.
+
+Frames are sent as DDP (Distributed Display Protocol) packets, a 10-byte
+big-endian header followed by RGB bytes of the row-major frame buffer::
+
+    u8   flags      0x40 (version 1), plus 0x01 (push) on a frame's last packet
+    u8   sequence   1-15, one per packet
+    u8   data type  0x0B (RGB, 8 bits per channel)
+    u8   id         1 (default output)
+    u32  offset     byte offset of the payload in the frame buffer
+    u16  length     payload bytes
+
+Because packets are addressed by byte offset, each run of changed pixels
+is sent on its own and unchanged pixels are never sent.  Over a serial
+link every packet is preceded by the sync bytes ``A5 5A``.
+
+``FrameStreamer`` sends from a background thread at no more than
+``max_fps``.  A frame submitted while another is waiting replaces it, so a
+slow link always catches up to the newest frame instead of queueing.
+A failed send is retried, as a whole frame, after a delay that doubles
+from ``RETRY_DELAY`` up to ``MAX_RETRY_DELAY`` seconds.
+"""
+import os
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+DDP_HEADER = struct.Struct(">BBBBIH")
+DDP_VERSION = 0x40
+DDP_PUSH = 0x01
+DDP_RGB = 0x0B
+DDP_ID = 1
+DDP_PORT = 4048
+
+# 480 pixels, so a packet fits an Ethernet MTU and never splits a pixel.
+MAX_PAYLOAD = 1440
+
+SERIAL_SYNC = b"\xa5\x5a"
+
+# Unchanged pixels between two changed runs are sent anyway when that is
+# cheaper than another packet header.
+MERGE_GAP = (DDP_HEADER.size + len(SERIAL_SYNC)) // 3
+
+TRANSPORTS = ("UDP", "Serial")
+
+# Seconds before retrying a failed send; doubles while sends keep failing.
+RETRY_DELAY = 0.25
+MAX_RETRY_DELAY = 8.0
+
+
+def changed_spans(old, new, merge_gap=MERGE_GAP):
+    """Byte ``[start, stop)`` spans of ``new`` that differ from ``old``.
+
+    Both are ``uint8[H, W, 3]``; ``old=None`` yields the whole frame.  Runs
+    of changed pixels closer than ``merge_gap`` pixels are joined.  Returns
+    an ``int[N, 2]`` array.
+    """
+    if old is None or old.shape != new.shape:
+        return np.array([[0, new.size]])
+    changed = np.flatnonzero(np.any(old != new, axis=-1).ravel())
+    if not changed.size:
+        return np.empty((0, 2), dtype=np.intp)
+    breaks = np.flatnonzero(np.diff(changed) > merge_gap + 1)
+    starts = changed[np.concatenate(([0], breaks + 1))]
+    stops = changed[np.concatenate((breaks, [changed.size - 1]))] + 1
+    return np.stack([starts, stops], axis=1) * 3
+
+
+def ddp_packets(frame, spans, sequence=1):
+    """DDP packets carrying ``spans`` of ``frame``; the last one has the push flag.
+
+    Returns ``(packets, next_sequence)``.
+    """
+    data = np.ascontiguousarray(frame, dtype=np.uint8).reshape(-1)
+    chunks = [(offset, min(stop, offset + MAX_PAYLOAD))
+              for start, stop in spans.tolist() for offset in range(start, stop, MAX_PAYLOAD)]
+    packets = []
+    for number, (start, stop) in enumerate(chunks, 1):
+        flags = DDP_VERSION | (DDP_PUSH if number == len(chunks) else 0)
+        header = DDP_HEADER.pack(flags, sequence, DDP_RGB, DDP_ID, start, stop - start)
+        packets.append(header + data[start:stop].tobytes())
+        sequence = sequence % 15 + 1
+    return packets, sequence
+
+
+class UdpTransport:
+    def __init__(self, host="127.0.0.1", port=DDP_PORT):
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, packet):
+        return self.sock.sendto(packet, self.address)
+
+    def close(self):
+        self.sock.close()
+
+
+class SerialTransport:
+    """A serial port (or pty) opened in raw mode at ``baud``; POSIX only."""
+
+    def __init__(self, path, baud=115200):
+        import termios
+        import tty
+
+        speed = getattr(termios, f"B{baud}", None)
+        if speed is None:
+            raise ValueError(f"Unsupported baud rate: {baud}")
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        try:
+            tty.setraw(self.fd)
+            attrs = termios.tcgetattr(self.fd)
+            attrs[4] = attrs[5] = speed
+            termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def send(self, packet):
+        data = SERIAL_SYNC + packet
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+        return len(data)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FrameStreamer:
+    """Sends the newest submitted frame from a background thread.
+
+    At most ``max_fps`` frames go out per second, each as the spans that
+    changed since the last frame sent.  With ``keyframe_interval`` (in
+    seconds) the whole frame is resent at least that often, so a receiver
+    that lost UDP packets recovers.  ``frames_sent``, ``frames_dropped`` and
+    ``bytes_sent`` count what happened so far; ``error`` is the ``OSError``
+    of the last send, cleared once a send succeeds again.
+    """
+
+    def __init__(self, transport, max_fps=30, keyframe_interval=None):
+        self.transport = transport
+        self.interval = 1.0 / max_fps
+        self.keyframe_interval = keyframe_interval
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.bytes_sent = 0
+        self.error = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._pending = None
+        self._sent = None
+        self._sequence = 1
+        self._last_keyframe = 0.0
+        self._retry_delay = RETRY_DELAY
+        self._thread = threading.Thread(target=self._run, name="FrameStreamer", daemon=True)
+        self._thread.start()
+
+    def submit(self, colors):
+        """Queue ``uint8[H, W, 3]`` colors, replacing a frame that has not gone out yet."""
+        frame = np.array(colors, dtype=np.uint8)
+        with self._lock:
+            if self._pending is not None:
+                self.frames_dropped += 1
+            self._pending = frame
+        self._wake.set()
+
+    def close(self):
+        self._closing.set()
+        self._wake.set()
+        self._thread.join()
+        self.transport.close()
+
+    def _run(self):
+        next_send = 0.0
+        while not self._closing.is_set():
+            woken = self._wake.wait(self.keyframe_interval)
+            delay = next_send - time.monotonic()
+            if delay > 0 and self._closing.wait(delay):
+                break
+            with self._lock:
+                frame, self._pending = self._pending, None
+                self._wake.clear()
+            if frame is None:
+                if woken or self._sent is None:
+                    continue
+                # Idle for a whole keyframe interval: repeat the last frame.
+                frame = self._sent
+            try:
+                self._send(frame)
+            except OSError as e:
+                self.error = e
+                # What the receiver holds is unknown now: retry with the whole frame.
+                self._sent = None
+                with self._lock:
+                    if self._pending is None:
+                        self._pending = frame
+                        self._wake.set()
+                next_send = time.monotonic() + self._retry_delay
+                self._retry_delay = min(self._retry_delay * 2, MAX_RETRY_DELAY)
+                continue
+            self.error = None
+            self._retry_delay = RETRY_DELAY
+            next_send = time.monotonic() + self.interval
+
+    def _send(self, frame):
+        now = time.monotonic()
+        keyframe = (self.keyframe_interval is not None
+                    and now - self._last_keyframe >= self.keyframe_interval)
+        spans = changed_spans(None if keyframe else self._sent, frame)
+        if keyframe or self._sent is None or self._sent.shape != frame.shape:
+            self._last_keyframe = now
+        self._sent = frame
+        if not len(spans):
+            return
+        packets, self._sequence = ddp_packets(frame, spans, self._sequence)
+        for packet in packets:
+            self.bytes_sent += self.transport.send(packet)
+        self.frames_sent += 1
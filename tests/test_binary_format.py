@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+import binary_format
+from binary_format import FORMATS, HEADER, MAGIC, VERSION
+from palette import FIRMWARE_PALETTE
+
+SHAPES = [(1, 1), (5, 7), (3, 13), (4, 64)]
+
+
+def random_frames(frames, rows, cols, seed=0):
+    rng = np.random.default_rng(seed)
+    on = rng.random((frames, rows, cols)) < 0.6
+    colors = rng.integers(0, 256, (frames, rows, cols, 3), dtype=np.uint8)
+    return on, colors
+
+
+def write_header(path, magic=MAGIC, version=VERSION, code=FORMATS["rgb888"], rows=2, cols=3, frames=1,
+                 payload=None):
+    if payload is None:
+        payload = bytes(binary_format.frame_size("rgb888", rows, cols) * frames)
+    path.write_bytes(HEADER.pack(magic, version, code, rows, cols, 0, frames) + payload)
+    return path
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+@pytest.mark.parametrize("frames", [1, 3])
+@pytest.mark.parametrize("rows, cols", SHAPES)
+def test_round_trip_is_byte_identical(tmp_path, fmt, frames, rows, cols):
+    on, colors = random_frames(frames, rows, cols)
+    payload = binary_format.encode_frames(on, colors, fmt)
+    assert len(payload) == frames * binary_format.frame_size(fmt, rows, cols)
+
+    path = tmp_path / f"grid.{fmt}"
+    binary_format.save(path, on, colors, fmt)
+    assert path.read_bytes() == HEADER.pack(MAGIC, VERSION, FORMATS[fmt], rows, cols, 0, frames) + payload
+
+    grid = binary_format.load(path)
+    assert (grid.format, grid.rows, grid.cols, len(grid)) == (fmt, rows, cols, frames)
+    assert isinstance(grid.data, np.memmap)
+    assert grid.raw().tobytes() == payload
+
+    decoded_on, decoded_colors = grid.read()
+    assert decoded_on.shape == (frames, rows, cols)
+    assert decoded_colors.shape == (frames, rows, cols, 3)
+    assert binary_format.encode_frames(decoded_on, decoded_colors, fmt) == payload
+
+    again = tmp_path / f"again.{fmt}"
+    binary_format.save(again, decoded_on, decoded_colors, fmt)
+    assert again.read_bytes() == path.read_bytes()
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_single_frame_matches_stack(tmp_path, fmt):
+    on, colors = random_frames(3, 5, 13, seed=1)
+    binary_format.save(tmp_path / "stack", on, colors, fmt)
+    grid = binary_format.load(tmp_path / "stack")
+    for index, (frame_on, frame_colors) in enumerate(grid):
+        single = binary_format.encode_frames(on[index], colors[index], fmt)
+        assert binary_format.encode_frames(frame_on, frame_colors, fmt) == single
+        assert grid.raw(index, index + 1).tobytes() == single
+
+
+def test_lossless_formats_keep_cells(tmp_path):
+    on, colors = random_frames(2, 3, 13, seed=2)
+    colors[on] |= 1
+    binary_format.save(tmp_path / "grid", on, colors, "rgb888")
+    decoded_on, decoded_colors = binary_format.load(tmp_path / "grid").read()
+    np.testing.assert_array_equal(decoded_on, on)
+    np.testing.assert_array_equal(decoded_colors, np.where(on[..., None], colors, 0))
+
+    binary_format.save(tmp_path / "mono", on, colors, "mono")
+    decoded_on, decoded_colors = binary_format.load(tmp_path / "mono").read()
+    np.testing.assert_array_equal(decoded_on, on)
+    assert (decoded_colors[decoded_on] == binary_format.DEFAULT_COLOR).all()
+
+
+def test_pal3_keeps_palette_colors(tmp_path):
+    palette = FIRMWARE_PALETTE.array[:8]
+    rng = np.random.default_rng(3)
+    colors = palette[rng.integers(0, len(palette), (2, 5, 7))]
+    on = colors.any(axis=-1)
+    binary_format.save(tmp_path / "grid", on, colors, "pal3")
+    decoded_on, decoded_colors = binary_format.load(tmp_path / "grid").read()
+    np.testing.assert_array_equal(decoded_colors, colors)
+    np.testing.assert_array_equal(decoded_on, on)
+
+
+def test_zero_frames(tmp_path):
+    path = write_header(tmp_path / "empty", frames=0)
+    grid = binary_format.load(path)
+    assert len(grid) == 0
+    assert list(grid) == []
+    on, colors = grid.read()
+    assert on.shape == (0, 2, 3) and colors.shape == (0, 2, 3, 3)
+
+
+@pytest.mark.parametrize("size", [0, 1, HEADER.size - 1])
+def test_short_header(tmp_path, size):
+    path = tmp_path / "short"
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, 4, 2, 3, 0, 0)[:size])
+    with pytest.raises(ValueError, match="too short"):
+        binary_format.load(path)
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({"magic": b"LEDF"}, "not a binary grid file"),
+    ({"version": VERSION + 1}, "unsupported version"),
+    ({"code": 0}, "unknown format code 0"),
+    ({"code": 9}, "unknown format code 9"),
+    ({"rows": 0}, "empty 0x3 grid"),
+    ({"cols": 0}, "empty 2x0 grid"),
+    ({"rows": 0, "cols": 0, "payload": b""}, "empty 0x0 grid"),
+])
+def test_bad_header(tmp_path, fields, message):
+    path = write_header(tmp_path / "bad", **fields)
+    with pytest.raises(ValueError, match=message):
+        binary_format.load(path)
+
+
+def test_truncated_payload(tmp_path):
+    path = write_header(tmp_path / "truncated", frames=2, payload=bytes(2 * 18 - 1))
+    with pytest.raises(ValueError, match="truncated"):
+        binary_format.load(path)
+
+
+@pytest.mark.parametrize("rows, cols", [(0, 3), (2, 0), (0, 0)])
+def test_decode_rejects_empty_grid(rows, cols):
+    with pytest.raises(ValueError, match="Grid size"):
+        binary_format.decode_frames(np.zeros(0, dtype=np.uint8), "rgb888", rows, cols)
+
+
+def test_decode_rejects_partial_frame():
+    with pytest.raises(ValueError, match="whole number"):
+        binary_format.decode_frames(np.zeros(19, dtype=np.uint8), "rgb888", 2, 3)
+
+
+@pytest.mark.parametrize("shape", [(0, 3), (2, 0), (1, 0x10000)])
+def test_save_rejects_sizes_the_header_cannot_hold(tmp_path, shape):
+    on = np.zeros(shape, dtype=bool)
+    colors = np.zeros(shape + (3,), dtype=np.uint8)
+    with pytest.raises(ValueError, match="Grid size"):
+        binary_format.save(tmp_path / "bad", on, colors, "rgb888")
+    assert not (tmp_path / "bad").exists()
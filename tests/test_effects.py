@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+import effects
+from effects import Effect, FrameScheduler
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; only ``sleep`` and rendering move it on."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Timed(Effect):
+    """Renders black frames, each taking the next of ``costs`` seconds on ``clock``."""
+
+    def __init__(self, clock, costs, **params):
+        super().__init__(2, 2, **params)
+        self.clock = clock
+        self.costs = list(costs)
+        self.rendered = []
+
+    def render(self, t, dt):
+        self.rendered.append((t, dt))
+        self.clock.now += self.costs[len(self.rendered) - 1]
+        return np.zeros(self.shape + (3,), dtype=np.uint8)
+
+
+def scheduler(step=1, adaptive=True):
+    effect = Timed(FakeClock(), [])
+    effect.set_step(step)
+    # With nothing rendered yet, render_time is simply the last elapsed time.
+    return FrameScheduler(effect, fps=100, adaptive=adaptive)
+
+
+def test_slow_frames_step_up():
+    s = scheduler()
+    s._adapt(0.9 * s.interval, now=0.0)
+    assert s.effect.step == 2
+    assert s.render_time == pytest.approx(0.9 * s.interval / 4)
+    s._adapt(0.9 * s.interval, now=0.1)
+    assert s.effect.step == 4
+    s._adapt(0.9 * s.interval, now=0.2)
+    assert s.effect.step == 4
+
+
+def test_steps_back_after_a_second_of_fast_frames():
+    s = scheduler(step=4)
+    fast = 0.1 * s.low * s.interval / 4
+    for now in (10.0, 10.5, 10.99):
+        s._adapt(fast, now)
+        assert s.effect.step == 4
+    s._adapt(fast, now=11.0)
+    assert s.effect.step == 2
+    assert s.render_time == pytest.approx(4 * fast)
+    # The second starts over at the new step.
+    s._adapt(fast, now=11.5)
+    assert s.effect.step == 2
+    s._adapt(fast, now=12.5)
+    assert s.effect.step == 1
+
+
+def test_a_slower_frame_restarts_the_second():
+    s = scheduler(step=2)
+    fast = 0.1 * s.low * s.interval / 4
+    s._adapt(fast, now=0.0)
+    s._adapt(0.5 * s.interval, now=0.6)
+    s._adapt(fast, now=0.8)
+    s._adapt(fast, now=1.5)
+    assert s.effect.step == 2
+    s._adapt(fast, now=1.8)
+    assert s.effect.step == 1
+
+
+def test_fixed_step_when_not_adaptive():
+    s = scheduler(step=2, adaptive=False)
+    s._adapt(10 * s.interval, now=0.0)
+    s._adapt(0.0, now=5.0)
+    s._adapt(0.0, now=10.0)
+    assert s.effect.step == 2
+
+
+def test_late_frames_are_skipped(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(effects, "time", clock)
+    effect = Timed(clock, [0.05, 0.25, 0.05, 0.35, 0.05])
+    s = FrameScheduler(effect, fps=10, adaptive=False)
+    shown = []
+    s.run(shown.append, lambda: len(shown) < 5)
+    times, dts = zip(*effect.rendered)
+    # Frame 1 renders on time after a sleep, frame 2 misses slot 2 and frame 4 misses slots 5 and 6.
+    assert times == pytest.approx((0.0, 0.1, 0.3, 0.4, 0.7))
+    assert dts == pytest.approx((0.0, 0.1, 0.2, 0.1, 0.3))
+    assert (s.frames_rendered, s.frames_skipped) == (5, 3)
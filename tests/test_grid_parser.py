@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from exporter import EXPORT_MODES, iter_export
+from grid_parser import ParseError, detect_format, parse_frames, parse_grid
+from palette import FIRMWARE_PALETTE
+
+
+def random_grid(rows, cols, seed=0):
+    """Lit cells with colors from the firmware palette, unlit cells black."""
+    rng = np.random.default_rng(seed)
+    colors = FIRMWARE_PALETTE.array[rng.integers(1, len(FIRMWARE_PALETTE), (rows, cols))]
+    lit = rng.random((rows, cols)) < 0.4
+    colors[~lit] = 0
+    return lit, colors
+
+
+def export(lit, colors, mode):
+    return "".join(iter_export(lit, colors, mode))
+
+
+def reexport(text, mode):
+    # The same lit rule as led_core.write_grid.
+    return "".join(export(frame.on & frame.colors.any(axis=-1), frame.colors, mode)
+                   for frame in parse_frames(text))
+
+
+@pytest.mark.parametrize("mode", EXPORT_MODES)
+@pytest.mark.parametrize("rows, cols", [(1, 1), (3, 7), (32, 64)])
+@pytest.mark.parametrize("frames", [1, 4])
+def test_round_trip(mode, rows, cols, frames):
+    grids = [random_grid(rows, cols, seed) for seed in range(frames)]
+    text = "".join(export(lit, colors, mode) for lit, colors in grids)
+    parsed = parse_frames(text)
+    assert len(parsed) == frames
+    for frame, (lit, colors) in zip(parsed, grids):
+        assert frame.mode == mode
+        assert frame.shape == (rows, cols)
+        assert frame.defined.all()
+        np.testing.assert_array_equal(frame.on & frame.colors.any(axis=-1), lit)
+        np.testing.assert_array_equal(frame.colors, colors)
+    assert reexport(text, mode) == text
+
+
+@pytest.mark.parametrize("mode", ["Plain", "Formatted"])
+def test_without_colors_section_uses_default_color(mode):
+    lit, colors = random_grid(3, 5)
+    text = "".join(iter_export(lit, colors, mode, color_section=False))
+    frame = parse_grid(text, default_rgb=(1, 2, 3))
+    np.testing.assert_array_equal(frame.on, lit)
+    assert (frame.colors[lit] == (1, 2, 3)).all()
+    assert not frame.colors[~lit].any()
+
+
+def test_frames_of_different_shapes_and_modes():
+    grids = [(random_grid(2, 3, 0), "Plain"), (random_grid(4, 5, 1), "Colored"), (random_grid(3, 9, 2), "Formatted")]
+    text = "".join(export(lit, colors, mode) for (lit, colors), mode in grids)
+    parsed = parse_frames(text)
+    assert [(frame.mode, frame.shape) for frame in parsed] == [(mode, lit.shape) for (lit, _), mode in grids]
+    for frame, ((lit, colors), _) in zip(parsed, grids):
+        np.testing.assert_array_equal(frame.colors, colors)
+
+
+def test_ragged_rows_are_partly_defined():
+    frame = parse_grid("1 1 1\n1\n")
+    np.testing.assert_array_equal(frame.defined, [[True, True, True], [True, False, False]])
+    np.testing.assert_array_equal(frame.on, frame.defined)
+
+
+@pytest.mark.parametrize("line, header, mode", [
+    ("0 1 1 0", None, "Plain"),
+    ("0b0110,", None, "Formatted"),
+    ("  0b1, 0b0", "Plain", "Formatted"),
+    ("1,0,7", None, "Colored"),
+    ("1", None, "Plain"),
+    ("1", "Plain", "Plain"),
+    ("1", "Colored", "Colored"),
+])
+def test_detect_format(line, header, mode):
+    assert detect_format(line, header) == mode
+
+
+def test_each_frame_detects_its_format():
+    text = "#export_format:Plain\n0b01,\n#export_format:Formatted\n1,2\n0,3\n#export_format:Colored\n7\n"
+    frames = parse_frames(text)
+    assert [frame.mode for frame in frames] == ["Formatted", "Colored", "Colored"]
+    assert [frame.shape for frame in frames] == [(1, 2), (2, 2), (1, 1)]
+
+
+def test_blank_text():
+    frame = parse_grid("")
+    assert frame.shape == (0, 0)
+
+
+@pytest.mark.parametrize("text, line, message", [
+    ("0 1\n0 2\n", 2, "unexpected '2' in Plain data"),
+    ("0 1\n01\n", 2, "separated by spaces"),
+    ("0b01,\n0b0x,\n", 2, "unexpected 'x' in Formatted data"),
+    ("0b01,\n01,\n", 2, "must follow a 0b prefix"),
+    ("0b01,\n0b1b0,\n", 2, "malformed 0b prefix"),
+    ("1,2\n1,,2\n", 2, "comma-separated palette indices"),
+    ("1,2\n3,4\n1,2 3\n", 3, "comma-separated palette indices"),
+    ("#export_format:Colored\n1234567890\n", 2, "number too long"),
+    ("0 1\n\n#colors\n1,2,3 4,5\n", 4, "r,g,b colors"),
+    ("0 1\n#colors\n1,2,3 4,5,300\n", 3, "above 255"),
+    ("0 1\n#colors\n1,2,3 4,5,6\n#colors\n", 4, "second #colors section"),
+    ("0 1\n# note\n", 2, "unexpected line"),
+    ("#export_format:Plain\n0 1\n\n#export_format:Plain\n1 1\n1 3\n", 6, "unexpected '3'"),
+])
+def test_parse_error_line_numbers(text, line, message):
+    with pytest.raises(ParseError, match=message) as raised:
+        parse_frames(text)
+    assert raised.value.line == line
+    assert str(raised.value).startswith(f"line {line}: ")
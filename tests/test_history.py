@@ -0,0 +1,100 @@
+import numpy as np
+
+from grid_model import GridModel
+from history import History
+from timeline import Timeline
+
+
+def stored_bytes(history):
+    """``history.nbytes`` worked out from scratch."""
+    total = sum(entry.nbytes for entry in history.undo_entries + history.redo_entries)
+    total += sum(nbytes for _, nbytes in history.undo_contexts + history.redo_contexts)
+    if history.can_undo():
+        total += history._top[0].nbytes + history._top[1].nbytes
+    return total
+
+
+def frame_context(timeline):
+    return timeline, timeline.snapshot()
+
+
+def context_nbytes(older, newer):
+    return Timeline.dropped_nbytes(older[1], newer[1])
+
+
+def random_timeline(frames, seed):
+    rng = np.random.default_rng(seed)
+    timeline = Timeline(8, 16)
+    timeline.extend((rng.random((8, 16)) < 0.5, rng.integers(0, 256, (8, 16, 3), dtype=np.uint8))
+                    for _ in range(frames))
+    return timeline
+
+
+def test_undo_and_redo_restore_contexts():
+    model = GridModel(4, 4)
+    history = History()
+    for step in range(3):
+        history.record(model, context=step)
+        model.set_cell(0, step, True, (255, 0, 0))
+    history.undo(model, context="live")
+    assert history.context == 2 and model.on.sum() == 2
+    history.undo(model, context=2)
+    assert history.context == 1 and model.on.sum() == 1
+    history.redo(model, context=1)
+    assert history.context == 2 and model.on.sum() == 2
+    history.redo(model, context=2)
+    assert history.context == "live" and model.on.sum() == 3
+
+
+def test_replaced_timeline_counts_towards_budget():
+    model = GridModel(8, 16)
+    history = History(context_nbytes=context_nbytes)
+    old = random_timeline(40, seed=0)
+    history.record(model, context=frame_context(old))
+    new = random_timeline(2, seed=1)
+    history.record(model, context=frame_context(new))
+    assert history.undo_contexts[-1][1] == old.nbytes
+    assert history.nbytes == stored_bytes(history)
+
+    # Squeezing the budget drops the step that alone holds the old timeline.
+    history.max_bytes = history.nbytes - 1
+    history.record(model, context=frame_context(new))
+    assert all(context[0] is not old for context, _ in history.undo_contexts)
+
+
+def test_edits_charge_only_the_frames_they_replace():
+    model = GridModel(8, 16)
+    history = History(context_nbytes=context_nbytes)
+    timeline = random_timeline(40, seed=2)
+    history.record(model, context=frame_context(timeline))
+    before = timeline.snapshot()
+    timeline.set_frame(35, np.ones((8, 16), dtype=bool), np.full((8, 16, 3), 7, dtype=np.uint8))
+    history.record(model, context=frame_context(timeline))
+    charged = history.undo_contexts[-1][1]
+    assert 0 < charged == Timeline.dropped_nbytes(before, timeline.snapshot()) < timeline.nbytes
+
+
+def test_nbytes_stays_exact():
+    rng = np.random.default_rng(3)
+    model = GridModel(8, 16)
+    history = History(max_bytes=40_000, keyframe_interval=4, context_nbytes=context_nbytes)
+    timeline = random_timeline(10, seed=4)
+    for _ in range(400):
+        action = rng.integers(0, 10)
+        if action < 5:
+            history.record(model, context=frame_context(timeline))
+            model.set_cell(int(rng.integers(0, 8)), int(rng.integers(0, 16)), True, (1, 2, 3))
+            if action == 0:
+                timeline = random_timeline(int(rng.integers(1, 12)), seed=int(rng.integers(1 << 30)))
+            elif action == 1:
+                timeline.set_frame(int(rng.integers(0, len(timeline))), model.on, model.colors)
+        elif action < 8 and history.can_undo():
+            history.undo(model, frame_context(timeline))
+            timeline = history.context[0]
+            timeline.restore(history.context[1])
+        elif history.can_redo():
+            history.redo(model, frame_context(timeline))
+            timeline = history.context[0]
+            timeline.restore(history.context[1])
+        assert history.nbytes == stored_bytes(history)
+        assert history.nbytes <= history.max_bytes or len(history.undo_entries) == 0
@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+import pytest
+
+from shared_frame import PIXELS_OFFSET, SharedFrameBuffer
+
+
+def test_mismatched_file_is_refused_not_truncated(tmp_path):
+    path = str(tmp_path / "frame")
+    reader = SharedFrameBuffer(path, 4, 6, create=True)
+    with pytest.raises(ValueError, match="4x6 frame buffer, not 8x8"):
+        SharedFrameBuffer(path, 8, 8, create=True)
+    assert os.path.getsize(path) == PIXELS_OFFSET + 4 * 6 * 3
+
+    writer = SharedFrameBuffer(path, 4, 6)
+    colors = np.full((4, 6, 3), 9, dtype=np.uint8)
+    writer.write(colors)
+    received = np.zeros_like(colors)
+    assert reader.copy_to(received) == 2
+    np.testing.assert_array_equal(received, colors)
+    writer.close()
+    reader.close()
+
+
+def test_shrunk_file_sets_error(tmp_path):
+    path = str(tmp_path / "frame")
+    reader = SharedFrameBuffer(path, 4, 6, create=True)
+    os.truncate(path, PIXELS_OFFSET)
+    received = np.zeros((4, 6, 3), dtype=np.uint8)
+    assert reader.copy_to(received) == -1
+    assert "no longer a 4x6 frame buffer" in str(reader.error)
+    reader.close()
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / "frame"
+    path.write_bytes(b"not a frame buffer" * 10)
+    with pytest.raises(ValueError, match="Not a frame buffer"):
+        SharedFrameBuffer(str(path), 4, 6, create=True)
+    assert path.read_bytes() == b"not a frame buffer" * 10
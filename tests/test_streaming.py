@@ -0,0 +1,176 @@
+import os
+import pty
+import socket
+import threading
+import time
+
+import numpy as np
+
+import streaming
+from streaming import (DDP_HEADER, DDP_ID, DDP_PUSH, DDP_RGB, DDP_VERSION, MAX_PAYLOAD, SERIAL_SYNC,
+                       FrameStreamer, SerialTransport, UdpTransport)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def unpack(packet):
+    """``(flags, sequence, offset, payload)`` of a DDP packet, checking the fixed fields."""
+    flags, sequence, data_type, output, offset, length = DDP_HEADER.unpack_from(packet)
+    assert flags & ~DDP_PUSH == DDP_VERSION
+    assert (data_type, output) == (DDP_RGB, DDP_ID)
+    assert len(packet) == DDP_HEADER.size + length
+    return flags, sequence, offset, packet[DDP_HEADER.size:]
+
+
+def apply(buffer, packets):
+    """Write ``packets`` into the flat ``buffer``; returns the offsets and push flags."""
+    received = []
+    for packet in packets:
+        flags, _, offset, payload = unpack(packet)
+        buffer[offset:offset + len(payload)] = np.frombuffer(payload, dtype=np.uint8)
+        received.append((offset, len(payload), bool(flags & DDP_PUSH)))
+    return received
+
+
+class Recorder:
+    """A transport that keeps the packets and the time each send started."""
+
+    def __init__(self):
+        self.packets = []
+        self.times = []
+
+    def send(self, packet):
+        self.times.append(time.monotonic())
+        self.packets.append(packet)
+        return len(packet)
+
+    def close(self):
+        pass
+
+
+def test_udp_sends_the_whole_frame_then_changed_spans():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(2.0)
+    streamer = FrameStreamer(UdpTransport(*receiver.getsockname()), max_fps=1000)
+    first = np.random.default_rng(0).integers(0, 256, (20, 40, 3), dtype=np.uint8)
+    second = first.copy()
+    second[3, 5:9] = 0
+    second[12, 30] += 1
+    try:
+        streamer.submit(first)
+        wait_for(lambda: streamer.frames_sent == 1)
+        streamer.submit(second)
+        wait_for(lambda: streamer.frames_sent == 2)
+    finally:
+        streamer.close()
+    packets = [receiver.recv(2048) for _ in range(4)]
+    receiver.close()
+
+    buffer = np.zeros(first.size, dtype=np.uint8)
+    full = apply(buffer, packets[:2])
+    assert full == [(0, MAX_PAYLOAD, False), (MAX_PAYLOAD, first.size - MAX_PAYLOAD, True)]
+    np.testing.assert_array_equal(buffer.reshape(first.shape), first)
+    delta = apply(buffer, packets[2:])
+    assert delta == [((3 * 40 + 5) * 3, 12, False), ((12 * 40 + 30) * 3, 3, True)]
+    np.testing.assert_array_equal(buffer.reshape(second.shape), second)
+    assert [unpack(packet)[1] for packet in packets] == [1, 2, 3, 4]
+    assert streamer.bytes_sent == sum(map(len, packets))
+
+
+def test_serial_prefixes_each_packet_with_sync_bytes():
+    master, slave = pty.openpty()
+    streamer = FrameStreamer(SerialTransport(os.ttyname(slave), 115200))
+    frame = np.arange(4 * 8 * 3, dtype=np.uint8).reshape(4, 8, 3)
+    try:
+        streamer.submit(frame)
+        wait_for(lambda: streamer.frames_sent == 1)
+    finally:
+        streamer.close()
+    data = os.read(master, 4096)
+    os.close(master)
+    os.close(slave)
+    assert data[:len(SERIAL_SYNC)] == SERIAL_SYNC
+    assert len(data) == streamer.bytes_sent == len(SERIAL_SYNC) + DDP_HEADER.size + frame.size
+    buffer = np.zeros(frame.size, dtype=np.uint8)
+    assert apply(buffer, [data[len(SERIAL_SYNC):]]) == [(0, frame.size, True)]
+    np.testing.assert_array_equal(buffer.reshape(frame.shape), frame)
+
+
+def test_newest_frame_wins_while_a_send_is_in_progress():
+    class Blocking(Recorder):
+        def __init__(self):
+            super().__init__()
+            self.sending = threading.Event()
+            self.release = threading.Event()
+
+        def send(self, packet):
+            self.sending.set()
+            assert self.release.wait(5.0)
+            return super().send(packet)
+
+    transport = Blocking()
+    streamer = FrameStreamer(transport, max_fps=1000)
+    frames = [np.full((2, 3, 3), value, dtype=np.uint8) for value in range(1, 5)]
+    try:
+        streamer.submit(frames[0])
+        assert transport.sending.wait(5.0)
+        for frame in frames[1:]:
+            streamer.submit(frame)
+        transport.release.set()
+        wait_for(lambda: streamer.frames_sent == 2)
+    finally:
+        streamer.close()
+    assert streamer.frames_dropped == 2
+    assert [unpack(packet)[3] for packet in transport.packets] == [frames[0].tobytes(), frames[3].tobytes()]
+
+
+def test_frame_rate_is_capped():
+    transport = Recorder()
+    streamer = FrameStreamer(transport, max_fps=20)
+    try:
+        for value in range(1, 6):
+            streamer.submit(np.full((2, 3, 3), value, dtype=np.uint8))
+            wait_for(lambda: streamer.frames_sent == value)
+    finally:
+        streamer.close()
+    assert len(transport.times) == 5
+    assert min(np.diff(transport.times)) >= streamer.interval
+
+
+def test_failed_sends_back_off_and_resend_the_whole_frame(monkeypatch):
+    monkeypatch.setattr(streaming, "RETRY_DELAY", 0.02)
+    monkeypatch.setattr(streaming, "MAX_RETRY_DELAY", 0.08)
+
+    class Flaky(Recorder):
+        failures = 5
+
+        def send(self, packet):
+            self.times.append(time.monotonic())
+            if len(self.times) <= self.failures:
+                raise OSError("Network is unreachable")
+            self.packets.append(packet)
+            return len(packet)
+
+    transport = Flaky()
+    streamer = FrameStreamer(transport, max_fps=1000)
+    first = np.zeros((2, 3, 3), dtype=np.uint8)
+    second = first.copy()
+    second[1, 2] = 9
+    try:
+        streamer.submit(first)
+        wait_for(lambda: streamer.error is not None)
+        streamer.submit(second)
+        wait_for(lambda: streamer.frames_sent == 1)
+        assert streamer.error is None
+    finally:
+        streamer.close()
+    gaps = np.diff(transport.times)
+    assert (gaps >= [0.02, 0.04, 0.08, 0.08, 0.08]).all()
+    # The receiver's state is unknown after a failure, so the newest frame goes out whole.
+    assert [unpack(packet)[2:] for packet in transport.packets] == [(0, second.tobytes())]
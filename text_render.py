@@ -0,0 +1,63 @@
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+# TrueType files per family as (regular, bold, italic, bold italic).
+FONT_FILES = {
+    "arial": ("arial.ttf", "arialbd.ttf", "ariali.ttf", "arialbi.ttf"),
+    "times new roman": ("times.ttf", "timesbd.ttf", "timesi.ttf", "timesbi.ttf"),
+    "courier new": ("cour.ttf", "courbd.ttf", "couri.ttf", "courbi.ttf"),
+}
+
+
+def font_path(font_family, bold=False, italic=False):
+    files = FONT_FILES.get(font_family.lower(), FONT_FILES["arial"])
+    return files[bold + 2 * italic]
+
+
+@lru_cache(maxsize=64)
+def load_font(path, size):
+    """Load a TrueType font once per ``(path, size)``; falls back to PIL's default font."""
+    try:
+        return ImageFont.truetype(path, size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+def render_text(text, rows, cols, bold=False, italic=False, font_family="Arial",
+                resize_factor=1.0, text_color=(255, 0, 0), font_size=20):
+    """Rasterize ``text`` at (0, 0) into ``(on, colors)`` planes for a ``rows`` x ``cols`` grid.
+
+    The text is drawn on a white canvas ``resize_factor`` times the grid
+    size and scaled down with nearest-neighbour sampling; every non-white
+    cell is lit.
+    """
+    width = max(1, int(cols * resize_factor))
+    height = max(1, int(rows * resize_factor))
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    font = load_font(font_path(font_family, bold, italic), int(font_size * resize_factor))
+    draw.text((0, 0), text, fill=tuple(text_color), font=font)
+    pixels = np.asarray(img.resize((cols, rows), Image.Resampling.NEAREST))
+    on = ~np.all(pixels == 255, axis=-1)
+    return on, np.where(on[..., None], pixels, np.uint8(0))
+
+
+def render_text_strip(text, rows=None, cols=None, bold=False, italic=False, font_family="Arial",
+                      resize_factor=1.0, text_color=(255, 0, 0), font_size=20):
+    """Rasterize all of ``text`` into planes as long as the text needs.
+
+    Give ``rows`` for a horizontal strip whose width follows the text, or
+    ``cols`` for a vertical strip whose height does.  Otherwise this draws
+    like ``render_text``.
+    """
+    font = load_font(font_path(font_family, bold, italic), int(font_size * resize_factor))
+    measure = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    _, _, right, bottom = measure.multiline_textbbox((0, 0), text, font=font)
+    if rows is None:
+        rows = max(1, -int(-bottom // resize_factor))
+    if cols is None:
+        cols = max(1, -int(-right // resize_factor))
+    return render_text(text, rows, cols, bold, italic, font_family, resize_factor, text_color, font_size)
@@ -0,0 +1,202 @@
+"""Animation frames stored as periodic keyframes plus sparse deltas.
+
+Every ``keyframe_interval``-th frame is a full ``Keyframe``; the frames in
+between are ``CellDiff``s against the keyframe that starts their segment,
+so reading any frame is one copy plus one scatter.  A frame whose diff
+would be larger than a full copy is stored as a keyframe instead.  Edits
+re-encode only the segment they touch.
+"""
+import numpy as np
+
+from history import CellDiff, Keyframe
+
+DEFAULT_FPS = 10
+
+
+class Timeline:
+    """An ordered list of same-sized frames with per-frame durations in ms."""
+
+    def __init__(self, rows=32, cols=64, fps=DEFAULT_FPS, keyframe_interval=32):
+        self.shape = (rows, cols)
+        self.fps = fps
+        self.keyframe_interval = keyframe_interval
+        self.entries = []
+        self.durations = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def default_duration(self):
+        return round(1000 / self.fps)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the stored frames."""
+        return sum(entry.nbytes for entry in self.entries)
+
+    @property
+    def snapshot_nbytes(self):
+        """Bytes the same frames would need as full snapshots."""
+        rows, cols = self.shape
+        return len(self.entries) * rows * cols * 4
+
+    def _keyframe_before(self, index):
+        """Index of the keyframe that frame ``index`` is stored against."""
+        while not isinstance(self.entries[index], Keyframe):
+            index -= 1
+        return index
+
+    def _keyframe_from(self, index):
+        """First keyframe at or after ``index`` (``len(self)`` if none)."""
+        while index < len(self.entries) and not isinstance(self.entries[index], Keyframe):
+            index += 1
+        return index
+
+    def _decode(self, start, stop):
+        if start >= stop:
+            return []
+        base = self.entries[self._keyframe_before(start)]
+        frames = []
+        for entry in self.entries[start:stop]:
+            if isinstance(entry, Keyframe):
+                base = entry
+                frames.append((entry.on.copy(), entry.colors.copy()))
+            else:
+                frames.append(entry.apply(base.on.copy(), base.colors.copy()))
+        return frames
+
+    def _encode(self, frames):
+        """Entries for ``frames``, starting a new segment at the first one."""
+        entries = []
+        base = None
+        for count, (on, colors) in enumerate(frames):
+            if base is not None and count % self.keyframe_interval:
+                diff = CellDiff.between((on, colors), (base.on, base.colors))
+                if diff.nbytes < on.nbytes + colors.nbytes:
+                    entries.append(diff)
+                    continue
+            base = Keyframe(on, colors)
+            entries.append(base)
+        return entries
+
+    def _check(self, on, colors):
+        on = np.asarray(on, dtype=bool)
+        colors = np.asarray(colors, dtype=np.uint8)
+        if on.shape != self.shape or colors.shape != self.shape + (3,):
+            raise ValueError(f"Frame shape {on.shape} does not match the timeline's {self.shape}")
+        return on, np.where(on[..., None], colors, np.uint8(0))
+
+    def frame(self, index):
+        """Return frame ``index`` as fresh ``(on, colors)`` arrays."""
+        if index < 0:
+            index += len(self.entries)
+        return self._decode(index, index + 1)[0]
+
+    def __iter__(self):
+        for start in range(0, len(self.entries), self.keyframe_interval):
+            yield from self._decode(start, min(start + self.keyframe_interval, len(self.entries)))
+
+    def _replace(self, start, stop, frames):
+        """Replace frames ``start..stop`` with ``frames``, re-encoding the segments involved."""
+        seg_start = self._keyframe_before(start - 1) if start > 0 else 0
+        seg_stop = self._keyframe_from(stop)
+        frames = self._decode(seg_start, start) + list(frames) + self._decode(stop, seg_stop)
+        self.entries[seg_start:seg_stop] = self._encode(frames)
+
+    def insert(self, index, on, colors, duration=None):
+        """Insert a frame before ``index``; ``duration`` defaults to one tick at ``fps``."""
+        frame = self._check(on, colors)
+        self._replace(index, index, [frame])
+        self.durations.insert(index, self.default_duration if duration is None else int(duration))
+
+    def append(self, on, colors, duration=None):
+        self.insert(len(self.entries), on, colors, duration)
+
+    def extend(self, frames, durations=None):
+        """Append many ``(on, colors)`` frames, encoding them in one pass.
+
+        ``durations`` is one duration for every frame or a per-frame list;
+        ``None`` in either place means one tick at ``fps``.
+        """
+        frames = [self._check(on, colors) for on, colors in frames]
+        if durations is None or np.isscalar(durations):
+            durations = [durations] * len(frames)
+        self._replace(len(self.entries), len(self.entries), frames)
+        self.durations.extend(self.default_duration if duration is None else int(duration)
+                              for duration in durations)
+
+    def set_frame(self, index, on, colors):
+        """Replace the contents of frame ``index``; returns False if nothing changed."""
+        on, colors = self._check(on, colors)
+        old_on, old_colors = self.frame(index)
+        if np.array_equal(on, old_on) and np.array_equal(colors, old_colors):
+            return False
+        self._replace(index, index + 1, [(on, colors)])
+        return True
+
+    def remove(self, index):
+        self._replace(index, index + 1, [])
+        del self.durations[index]
+
+    def clear(self):
+        self.entries.clear()
+        self.durations.clear()
+
+    def snapshot(self):
+        """The frames as they are now, for ``restore``.
+
+        Entries are never modified once stored, so this copies only the lists.
+        """
+        return self.shape, list(self.entries), list(self.durations)
+
+    @staticmethod
+    def dropped_nbytes(older, newer):
+        """Bytes of the entries snapshot ``older`` holds that snapshot ``newer`` does not."""
+        kept = {id(entry) for entry in newer[1]}
+        return sum(entry.nbytes for entry in older[1] if id(entry) not in kept)
+
+    def restore(self, snapshot):
+        shape, entries, durations = snapshot
+        self.shape = shape
+        self.entries = list(entries)
+        self.durations = list(durations)
+
+    def resize(self, rows, cols):
+        """Crop or pad every frame at the top-left to ``rows`` x ``cols``."""
+        frames = list(self)
+        self.shape = (rows, cols)
+        resized = []
+        for on, colors in frames:
+            new_on = np.zeros((rows, cols), dtype=bool)
+            new_colors = np.zeros((rows, cols, 3), dtype=np.uint8)
+            h, w = min(rows, on.shape[0]), min(cols, on.shape[1])
+            new_on[:h, :w] = on[:h, :w]
+            new_colors[:h, :w] = colors[:h, :w]
+            resized.append((new_on, new_colors))
+        self.entries = self._encode(resized)
+
+    def frame_at(self, elapsed_ms, loop=True):
+        """Index of the frame showing ``elapsed_ms`` after playback started.
+
+        Returns ``None`` once a non-looping animation has ended.
+        """
+        if not self.durations:
+            return None
+        ends = np.cumsum(self.durations)
+        total = int(ends[-1])
+        if loop and total > 0:
+            elapsed_ms %= total
+        elif elapsed_ms >= total:
+            return None
+        return int(np.searchsorted(ends, elapsed_ms, side="right"))
+
+    def stack(self, start_row=0, end_row=None):
+        """All frames (rows ``start_row..end_row``) as ``bool[F, H, W]``/``uint8[F, H, W, 3]``."""
+        rows = slice(start_row, None if end_row is None else end_row + 1)
+        frame_count = len(self.entries)
+        on = np.zeros((frame_count,) + self.shape, dtype=bool)
+        colors = np.zeros((frame_count,) + self.shape + (3,), dtype=np.uint8)
+        for index, (frame_on, frame_colors) in enumerate(self):
+            on[index], colors[index] = frame_on, frame_colors
+        return on[:, rows], colors[:, rows]